@@ -13,9 +13,11 @@ This file contains a CalcJob that represents FLEUR calculation.
 """
 import os
 import io
+from fnmatch import fnmatch
 
 from aiida.engine import CalcJob
-from aiida.orm import Dict
+from aiida.orm import Dict, ArrayData, List
+from aiida.orm import PortableCode
 from aiida.orm import RemoteData
 from aiida.common.datastructures import CalcInfo, CodeInfo
 from aiida.common.utils import classproperty
@@ -186,13 +188,43 @@ class FleurCalculation(CalcJob):
 
     _copy_filelist_spex = ['basis.hdf', 'pot.hdf', 'ecore']
 
+    # files compressed on the remote machine before retrieval with the gzip_outputs setting
+    _gzip_filelist = [_OUTXML_FILE_NAME, _RELAX_FILE_NAME]
+
+    # retrieval profiles (retrieve_profile setting)
+    # minimal: only the outputs needed for the parsing and restarts from the remote folder
+    # restart: minimal and the charge density
+    # analysis: minimal and the files of the fleur modes (DOS, bands, greensf, ...)
+    # full: everything (default)
+    _retrieve_profiles = ('minimal', 'restart', 'analysis', 'full')
+
+    # files only read by the parser, retrieved temporarily unless the full profile is used
+    _parser_only_filelist = [_ERROR_FILE_NAME, _USAGE_FILE_NAME]
+
+    # files which are never skipped by the max_retrieve_size setting
+    _essential_retrieve_filelist = [
+        _OUTXML_FILE_NAME, _INPXML_FILE_NAME, _SHELLOUTPUT_FILE_NAME, _ERROR_FILE_NAME, _USAGE_FILE_NAME,
+        _RELAX_FILE_NAME, _NMMPMAT_FILE_NAME, _NMMPMAT_HDF5_FILE_NAME
+    ]
+
+    # files larger than max_retrieve_size are moved into this folder before the retrieval
+    _SKIPPED_RETRIEVE_FOLDER = 'not_retrieved'
+
+    # files fleur modifies in place, these are never symlinked from the parent folder
+    # with the symlink_remote_files setting, since this would change the files of the parent
+    _rewritten_filelist = [
+        _MIX_HISTORY_FILE_NAME, _CDN1_FILE_NAME, _CDN_HDF5_FILE_NAME, _CDN_LAST_HDF5_FILE_NAME, _NMMPMAT_FILE_NAME,
+        _RELAX_FILE_NAME, _INPXML_FILE_NAME
+    ]
+
     _copy_filelist_hybrid = []
     _copy_filelist_jij = []
 
     # possible settings_dict keys
     _settings_keys = [
         'additional_retrieve_list', 'remove_from_retrieve_list', 'additional_remotecopy_list',
-        'remove_from_remotecopy_list', 'cmdline', 'fleurinp_nmmpmat_priority'
+        'remove_from_remotecopy_list', 'cmdline', 'fleurinp_nmmpmat_priority', 'parser_options', 'gzip_outputs',
+        'symlink_remote_files', 'retrieve_profile', 'max_retrieve_size'
     ]
 
     @classmethod
@@ -220,6 +252,12 @@ class FleurCalculation(CalcJob):
                    '(also for restarts and similar). It should contain all the '
                    'needed files for a Fleur calc, only edited files should be '
                    'uploaded from the repository.')
+        spec.input('steps',
+                   valid_type=List,
+                   required=False,
+                   help='Follow-up FLEUR runs executed in the same job after the main run. '
+                   'List of dicts with the keys label, task_list (FleurinpModifier task list '
+                   'applied to the fleurinp) and optionally cmdline.')
         spec.input('settings',
                    valid_type=Dict,
                    required=False,
@@ -232,7 +270,20 @@ class FleurCalculation(CalcJob):
         spec.output('output_parameters', valid_type=Dict, required=False)
         spec.output('output_params_complex', valid_type=Dict, required=False)
         spec.output('relax_parameters', valid_type=Dict, required=False)
+        spec.output('output_convergence',
+                    valid_type=ArrayData,
+                    required=False,
+                    help='Energies, distances, forces and torques of all iterations')
+        spec.output('output_arrays',
+                    valid_type=ArrayData,
+                    required=False,
+                    help='Array valued entries of output_parameters if the slim output mode is used')
         spec.output('error_params', valid_type=Dict, required=False)
+        spec.output_namespace('steps',
+                              valid_type=Dict,
+                              required=False,
+                              dynamic=True,
+                              help='output_parameters of the follow-up steps by their label')
         spec.default_output_node = 'output_parameters'
 
         # exit codes
@@ -257,11 +308,213 @@ class FleurCalculation(CalcJob):
         spec.exit_code(318,
                        'ERROR_MISSING_DEPENDENCY',
                        message='Calculation failed due to missing dependency ({name}) for given calculation.')
+        spec.exit_code(319, 'ERROR_FLEUR_STEP_FAILED', message='The follow-up FLEUR step {label} failed.')
 
     @classproperty
     def _get_output_folder(self):
         return './'
 
+    @classmethod
+    def _get_remote_density_folder(cls, calculation):
+        """
+        Returns the folder relative to the remote folder of the given calculation,
+        which contains the charge density, if it was not retrieved on purpose
+        (``retrieve_profile`` or ``max_retrieve_size`` settings)
+
+        :param calculation: CalcJobNode of the FleurCalculation
+
+        :returns: str of the relative folder or None if the charge density should have been retrieved
+        """
+        settings = {}
+        if 'settings' in calculation.inputs:
+            settings = calculation.inputs.settings.get_dict()
+
+        if settings.get('retrieve_profile', 'full') in ('minimal', 'analysis'):
+            return ''
+        if settings.get('max_retrieve_size') is not None:
+            return cls._SKIPPED_RETRIEVE_FOLDER
+        return None
+
+    def _use_remote_symlink(self, filename, symlink_files):
+        """
+        Decide whether the given file from the parent folder is symlinked instead of copied
+
+        :param filename: name (or pattern) of the file in the parent folder
+        :param symlink_files: value of the ``symlink_remote_files`` setting, either a bool
+                              or a list of file names (patterns), which should be symlinked
+
+        :returns: bool, True if the file should be symlinked
+        """
+        if not symlink_files:
+            return False
+        if symlink_files is not True and filename not in symlink_files:
+            return False
+
+        if any(fnmatch(filename, pattern) or fnmatch(pattern, filename) for pattern in self._rewritten_filelist):
+            if symlink_files is not True:
+                self.logger.warning(
+                    'The file %s is modified in place by fleur and is copied instead of symlinked,'
+                    ' since otherwise the files of the parent calculation would be changed', filename)
+            return False
+        return True
+
+    def _get_mode_retrieve_list(self, modes, with_hdf5):
+        """
+        Returns the files to retrieve for the given fleur modes
+
+        :param modes: dict with the fleur modes of the inp.xml (see
+                      :py:meth:`~aiida_fleur.data.fleurinp.FleurinpData.get_fleur_modes()`)
+        :param with_hdf5: bool, if True the code was compiled with HDF5
+
+        :returns: list of the filenames (patterns)
+        """
+        mode_retrieved_filelist = []
+        if with_hdf5 and (modes['band'] or modes['dos']):
+            mode_retrieved_filelist.append(self._BANDDOS_FILE_NAME)
+
+        if modes['band']:
+            mode_retrieved_filelist.append(self._BAND_FILE_NAME)
+            mode_retrieved_filelist.append(self._BAND_GNU_FILE_NAME)  #Should this be removed
+        if modes['dos']:
+            mode_retrieved_filelist.append(self._DOS_FILE_NAME)
+            mode_retrieved_filelist.append(self._DOS_MAX5_FILE_NAME)
+        if modes['relax']:
+            # if l_f="T" retrieve relax.xml
+            mode_retrieved_filelist.append(self._RELAX_FILE_NAME)
+        if modes['ldau']:
+            if with_hdf5:
+                mode_retrieved_filelist.append(self._NMMPMAT_HDF5_FILE_NAME)
+            else:
+                mode_retrieved_filelist.append(self._NMMPMAT_FILE_NAME)
+        if with_hdf5 and modes['greensf']:
+            mode_retrieved_filelist.append(self._GREENSF_HDF5_FILE_NAME)
+        if modes['cf_coeff']:
+            if with_hdf5:
+                mode_retrieved_filelist.append(self._CFDATA_HDF5_FILE_NAME)
+            else:
+                self.logger.warning('CF calculation without HDF5 not supported for automatic file retrieval.')
+        return mode_retrieved_filelist
+
+    def _get_step_run_line(self, cmdline_params):
+        """
+        Returns the line running the code in the job script for a follow-up step.
+        The MPI launcher and the prepend parameters of the code are constructed in the
+        same way as for the main run by AiiDA
+
+        :param cmdline_params: list of the command line parameters for fleur
+
+        :returns: str of the command
+        """
+        from aiida.common.escaping import escape_for_bash
+
+        code = self.inputs.code
+        computer = self.node.computer
+
+        if self.node.base.attributes.get('withmpi'):
+            scheduler = computer.get_scheduler()
+            resources = dict(self.node.get_option('resources'))
+            scheduler.preprocess_resources(resources, computer.get_default_mpiprocs_per_machine())
+            job_resource = scheduler.create_job_resource(**resources)
+            subst_dict = {'tot_num_mpiprocs': job_resource.get_tot_num_mpiprocs(), **dict(job_resource.items())}
+            mpi_args = [arg.format(**subst_dict) for arg in computer.get_mpirun_command()]
+            prepend_params = code.get_prepend_cmdline_params(mpi_args, self.node.get_option('mpirun_extra_params'))
+        else:
+            prepend_params = code.get_prepend_cmdline_params()
+
+        prepend_string = ' '.join(
+            escape_for_bash(arg, use_double_quotes=computer.get_use_double_quotes()) for arg in prepend_params)
+        cmdline_string = ' '.join(
+            escape_for_bash(arg, use_double_quotes=code.use_double_quotes)
+            for arg in code.get_executable_cmdline_params(cmdline_params))
+        cmdline_string = f'{cmdline_string} > {self._SHELLOUTPUT_FILE_NAME} 2> {self._ERROR_FILE_NAME}'
+        if code.wrap_cmdline_params:
+            cmdline_string = escape_for_bash(cmdline_string, use_double_quotes=True)
+
+        return f'{prepend_string} {cmdline_string}'.strip()
+
+    def _prepare_steps(self, folder, fleurinp, with_hdf5, retrieve_profile, cmdline_params):
+        """
+        Prepare the follow-up FLEUR runs given in the ``steps`` input. Each step runs
+        in its own subfolder, starting from the charge density of the main run, with
+        the ``inp.xml`` modified by the task list of the step
+
+        :param folder: folder of the calculation, where the inp.xml files of the steps are written
+        :param fleurinp: FleurinpData of the main run
+        :param with_hdf5: bool, if True the code was compiled with HDF5
+        :param retrieve_profile: str of the retrieval profile used for the calculation
+        :param cmdline_params: list of the command line parameters of the main run
+
+        :returns: tuple of the additional retrieve list and the lines for the job script
+        """
+        from masci_tools.util.xml.xml_getters import get_fleur_modes
+        from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+        if isinstance(self.inputs.code, PortableCode):
+            raise InputValidationError('Follow-up steps (steps input) are not supported for portable codes')
+
+        density_file = self._CDN_HDF5_FILE_NAME if with_hdf5 else self._CDN1_FILE_NAME
+        _, schema_dict = fleurinp.load_inpxml()
+
+        retrieve_list = []
+        script_lines = []
+        labels = set()
+        for step in self.inputs.steps.get_list():
+            if not isinstance(step, dict) or 'label' not in step or 'task_list' not in step:
+                raise InputValidationError(f'Invalid step {step}: Each step has to be a dict with the keys '
+                                           "'label' and 'task_list'")
+            unknown_keys = set(step.keys()) - {'label', 'task_list', 'cmdline'}
+            if unknown_keys:
+                raise InputValidationError(f'Unknown keys {unknown_keys} for the step {step["label"]}')
+
+            label = step['label']
+            if not isinstance(label, str) or not label.isidentifier() or label == self._SKIPPED_RETRIEVE_FOLDER:
+                raise InputValidationError(f"Invalid label '{label}' for a step. Has to be a valid python identifier")
+            if label in labels:
+                raise InputValidationError(f"The label '{label}' is used for more than one step")
+            labels.add(label)
+
+            fm = FleurinpModifier(fleurinp)
+            try:
+                fm.add_task_list(step['task_list'])
+            except (ValueError, TypeError) as exc:
+                raise InputValidationError(f'Invalid task_list for the step {label}: {exc}') from exc
+            for task in fm.changes():
+                if task.name in ('set_file', 'del_file') or task.name in fm.nmmpmat_functions:
+                    raise InputValidationError(f"The modification '{task.name}' of the step {label} is not supported."
+                                               ' Only the inp.xml can be modified for follow-up steps')
+            try:
+                xmltree = fm.show(display=False, validate=True)
+            except ValueError as exc:
+                raise InputValidationError(f'The modifications of the step {label} are not valid: {exc}') from exc
+
+            folder.get_subfolder(label, create=True)
+            with folder.open(os.path.join(label, self._INPXML_FILE_NAME), 'wb') as handle:
+                xmltree.write(handle, encoding='utf-8', pretty_print=True)
+
+            # outputs of the step are retrieved into the subfolder
+            step_files = [self._OUTXML_FILE_NAME, self._SHELLOUTPUT_FILE_NAME, self._ERROR_FILE_NAME]
+            for mode_file in self._get_mode_retrieve_list(get_fleur_modes(xmltree, schema_dict), with_hdf5):
+                if retrieve_profile in ('minimal', 'restart') and mode_file not in self._essential_retrieve_filelist:
+                    continue
+                if mode_file not in step_files:
+                    step_files.append(mode_file)
+            retrieve_list.extend((f'{label}/{file1}', '.', 2) for file1 in step_files)
+
+            # the step is only run if the main run finished successfully
+            copy_files = [density_file, self._NMMPMAT_FILE_NAME, self._JUDFT_WARN_ONLY_INFO_FILE_NAME]
+            copy_files.extend(file1 for file1 in fleurinp.files if file1 not in copy_files + [self._INPXML_FILE_NAME])
+            step_cmdline = cmdline_params + list(step.get('cmdline', []))
+            script_lines.extend([
+                f'# follow-up step {label}',
+                f'if [ -f {self._OUTXML_FILE_NAME} ] && {{ [ ! -s {self._ERROR_FILE_NAME} ] || '
+                f"grep -q 'Run finished successfully' {self._ERROR_FILE_NAME}; }}; then",
+                f'    for file in {" ".join(copy_files)}; do if [ -f "$file" ]; then cp "$file" {label}/; fi; done',
+                f'    (cd {label} && {self._get_step_run_line(step_cmdline)})',
+                'fi',
+            ])
+
+        return retrieve_list, script_lines
+
     def prepare_for_submission(self, folder):
         """
         This is the routine to be called when you make a FLEUR calculation.
@@ -345,6 +598,9 @@ class FleurCalculation(CalcJob):
                                            f" a 'fleur calculation'. Got {parent_calc.process_class}")
             fleurinpgen = parent_calc.process_class is FleurinputgenCalculation
 
+        if 'steps' in self.inputs and not has_fleurinp:
+            raise InputValidationError('The fleurinp input is needed for follow-up steps (steps input)')
+
         # check existence of settings (optional)
         if 'settings' in self.inputs:
             settings_dict = self.inputs.settings.get_dict()
@@ -368,33 +624,10 @@ class FleurCalculation(CalcJob):
             # add files belonging to fleurinp into local_copy_list
             for file in fleurinp.files:
                 local_copy_list.append((fleurinp.uuid, file, file))
-            modes = fleurinp.get_fleur_modes()
+            modes = fleurinp.fleur_modes
 
             # add files to mode_retrieved_filelist
-            if with_hdf5 and (modes['band'] or modes['dos']):
-                mode_retrieved_filelist.append(self._BANDDOS_FILE_NAME)
-
-            if modes['band']:
-                mode_retrieved_filelist.append(self._BAND_FILE_NAME)
-                mode_retrieved_filelist.append(self._BAND_GNU_FILE_NAME)  #Should this be removed
-            if modes['dos']:
-                mode_retrieved_filelist.append(self._DOS_FILE_NAME)
-                mode_retrieved_filelist.append(self._DOS_MAX5_FILE_NAME)
-            if modes['relax']:
-                # if l_f="T" retrieve relax.xml
-                mode_retrieved_filelist.append(self._RELAX_FILE_NAME)
-            if modes['ldau']:
-                if with_hdf5:
-                    mode_retrieved_filelist.append(self._NMMPMAT_HDF5_FILE_NAME)
-                else:
-                    mode_retrieved_filelist.append(self._NMMPMAT_FILE_NAME)
-            if with_hdf5 and modes['greensf']:
-                mode_retrieved_filelist.append(self._GREENSF_HDF5_FILE_NAME)
-            if modes['cf_coeff']:
-                if with_hdf5:
-                    mode_retrieved_filelist.append(self._CFDATA_HDF5_FILE_NAME)
-                else:
-                    self.logger.warning('CF calculation without HDF5 not supported for automatic file retrieval.')
+            mode_retrieved_filelist.extend(self._get_mode_retrieve_list(modes, with_hdf5))
             if modes['force_theorem'] or modes['cf_coeff']:
                 cdn_file = self._CDN_LAST_HDF5_FILE_NAME if with_hdf5 else self._CDN1_FILE_NAME
                 settings_dict.setdefault('remove_from_retrieve_list', []).append(cdn_file)
@@ -437,32 +670,34 @@ class FleurCalculation(CalcJob):
                         raise InputValidationError(
                             f'File {file1} not found in parent folder but needed to start calculation')
                     local_copy_list.append((outfolder_uuid, file1, file1))
-            elif not fleurinpgen and (not has_fleurinp):  # fleurCalc
-                # need to copy inp.xml from the parent calc
-                if with_hdf5:
-                    copylist = self._copy_scf_hdf
-                elif has_nmmpmat_file:
-                    copylist = self._copy_scf_ldau_nohdf
-                else:
-                    copylist = self._copy_scf
-                for file_orig, file_dest in copylist:
-                    if file_orig not in outfolder_filenames:
-                        message = f'File {file_orig} not found in parent folder but needed to start calculation.\n'
-                        if file_orig in (self._CDN1_FILE_NAME, self._CDN_LAST_HDF5_FILE_NAME):
-                            message += 'Make sure that the given Fleur code is correctly labelled with/without HDF5'
-                        raise InputValidationError(message)
-                    local_copy_list.append((outfolder_uuid, file_orig, file_dest))
-                # TODO: get inp.xml from parent FleurinpData; otherwise it will be doubled in rep
-            elif not fleurinpgen and has_fleurinp:
-                # inp.xml will be copied from fleurinp
-                if with_hdf5:
-                    copylist = self._copy_scf_noinp_hdf
-                elif has_nmmpmat_file:
-                    copylist = self._copy_scf_ldau_noinp_nohdf
+            elif not fleurinpgen:  # fleurCalc
+                if not has_fleurinp:
+                    # need to copy inp.xml from the parent calc
+                    # TODO: get inp.xml from parent FleurinpData; otherwise it will be doubled in rep
+                    if with_hdf5:
+                        copylist = self._copy_scf_hdf
+                    elif has_nmmpmat_file:
+                        copylist = self._copy_scf_ldau_nohdf
+                    else:
+                        copylist = self._copy_scf
                 else:
-                    copylist = self._copy_scf_noinp
+                    # inp.xml will be copied from fleurinp
+                    if with_hdf5:
+                        copylist = self._copy_scf_noinp_hdf
+                    elif has_nmmpmat_file:
+                        copylist = self._copy_scf_ldau_noinp_nohdf
+                    else:
+                        copylist = self._copy_scf_noinp
                 for file_orig, file_dest in copylist:
                     if file_orig not in outfolder_filenames:
+                        if file_orig in (self._CDN1_FILE_NAME, self._CDN_LAST_HDF5_FILE_NAME) and copy_remotely:
+                            # charge density was not retrieved (retrieve_profile or max_retrieve_size)
+                            density_folder = self._get_remote_density_folder(parent_calc)
+                            if density_folder is not None:
+                                remote_copy_list.append((parent_calc_folder.computer.uuid,
+                                                         os.path.join(parent_calc_folder.get_remote_path(),
+                                                                      density_folder, file_orig), file_dest))
+                                continue
                         message = f'File {file_orig} not found in parent folder but needed to start calculation.\n'
                         if file_orig in (self._CDN1_FILE_NAME, self._CDN_LAST_HDF5_FILE_NAME):
                             message += 'Make sure that the given Fleur code is correctly labelled with/without HDF5'
@@ -482,12 +717,19 @@ class FleurCalculation(CalcJob):
                     if file1 in filelist_tocopy_remote:
                         filelist_tocopy_remote.remove(file1)
 
+                symlink_files = settings_dict.get('symlink_remote_files', False)
                 for file1 in filelist_tocopy_remote:
-                    remote_copy_list.append(
-                        (parent_calc_folder.computer.uuid, os.path.join(parent_calc_folder.get_remote_path(),
-                                                                        file1), self._get_output_folder))
+                    remote_path = os.path.join(parent_calc_folder.get_remote_path(), file1)
+                    if self._use_remote_symlink(file1, symlink_files):
+                        #Files with wildcards are linked into the folder with their own name
+                        dest = self._get_output_folder if any(char in file1 for char in '*?[') else file1
+                        remote_symlink_list.append((parent_calc_folder.computer.uuid, remote_path, dest))
+                    else:
+                        remote_copy_list.append(
+                            (parent_calc_folder.computer.uuid, remote_path, self._get_output_folder))
 
                 self.logger.info('remote copy file list %s', str(remote_copy_list))
+                self.logger.info('remote symlink file list %s', str(remote_symlink_list))
 
         # create a JUDFT_WARN_ONLY file in the calculation folder
         with io.StringIO('/n') as handle:
@@ -510,6 +752,11 @@ class FleurCalculation(CalcJob):
         calcinfo.remote_copy_list = remote_copy_list
         calcinfo.remote_symlink_list = remote_symlink_list
 
+        retrieve_profile = settings_dict.get('retrieve_profile', 'full')
+        if retrieve_profile not in self._retrieve_profiles:
+            raise InputValidationError(f"Unknown retrieve_profile '{retrieve_profile}'. "
+                                       f'Use one of {self._retrieve_profiles}')
+
         # Retrieve by default the output file and the xml file
         retrieve_list = []
         retrieve_list.append(self._OUTXML_FILE_NAME)
@@ -524,14 +771,22 @@ class FleurCalculation(CalcJob):
         retrieve_list.append(self._USAGE_FILE_NAME)
         # retrieve_list.append(self._TIME_INFO_FILE_NAME)
         # retrieve_list.append(self._OUT_FILE_NAME)
-        if with_hdf5:
-            retrieve_list.append(self._CDN_LAST_HDF5_FILE_NAME)
-        else:
-            retrieve_list.append(self._CDN1_FILE_NAME)
+        if retrieve_profile in ('restart', 'full'):
+            if with_hdf5:
+                retrieve_list.append(self._CDN_LAST_HDF5_FILE_NAME)
+            else:
+                retrieve_list.append(self._CDN1_FILE_NAME)
 
         for mode_file in mode_retrieved_filelist:
+            if retrieve_profile in ('minimal', 'restart') and mode_file not in self._essential_retrieve_filelist:
+                continue
             if mode_file not in retrieve_list:
                 retrieve_list.append(mode_file)
+
+        retrieve_temporary_list = []
+        if retrieve_profile != 'full':
+            retrieve_temporary_list = [file1 for file1 in retrieve_list if file1 in self._parser_only_filelist]
+            retrieve_list = [file1 for file1 in retrieve_list if file1 not in self._parser_only_filelist]
         self.logger.info('retrieve_list: %s', str(retrieve_list))
 
         # user specific retrieve
@@ -544,10 +799,41 @@ class FleurCalculation(CalcJob):
         for file1 in remove_retrieve:
             if file1 in retrieve_list:
                 retrieve_list.remove(file1)
+            if file1 in retrieve_temporary_list:
+                retrieve_temporary_list.remove(file1)
+
+        # move files larger than the given size out of the way before the retrieval
+        append_text = []
+        max_retrieve_size = settings_dict.get('max_retrieve_size')
+        if max_retrieve_size is not None:
+            fleurinp_files = fleurinp.files if has_fleurinp else []
+            # only plain file names in the working directory are guarded,
+            # entries of the form (remote_pattern, local_folder, depth) are always retrieved
+            guarded_files = [
+                file1 for file1 in retrieve_list + retrieve_temporary_list if isinstance(file1, str) and
+                file1 not in self._essential_retrieve_filelist and file1 not in fleurinp_files
+            ]
+            if guarded_files:
+                name_filter = ' -o '.join(f"-name '{file1}'" for file1 in guarded_files)
+                append_text.append(f'mkdir -p {self._SKIPPED_RETRIEVE_FOLDER}')
+                append_text.append(f'find . -maxdepth 1 -type f \\( {name_filter} \\) -size +{int(max_retrieve_size)}c '
+                                   f'-exec mv {{}} {self._SKIPPED_RETRIEVE_FOLDER}/ \\;')
+
+        # compress large text outputs on the remote machine before retrieval
+        gzip_files = settings_dict.get('gzip_outputs', False)
+        if gzip_files is True:
+            gzip_files = self._gzip_filelist
+        elif not gzip_files:
+            gzip_files = []
+        gzip_files = [file1 for file1 in gzip_files if file1 in retrieve_list]
+        if gzip_files:
+            append_text.extend(f'if [ -f {file1} ]; then gzip -f {file1}; fi' for file1 in gzip_files)
+            retrieve_list = [f'{file1}.gz' if file1 in gzip_files else file1 for file1 in retrieve_list]
 
         calcinfo.retrieve_list = []
         for file1 in retrieve_list:
             calcinfo.retrieve_list.append(file1)
+        calcinfo.retrieve_temporary_list = retrieve_temporary_list
 
         codeinfo = CodeInfo()
         # should look like: codepath -xmlInput < inp.xml > shell.out 2>&1
@@ -570,6 +856,15 @@ class FleurCalculation(CalcJob):
             cmdline_params.append(command)
 
         codeinfo.cmdline_params = list(cmdline_params)
+
+        # follow-up runs in the same job, executed before the files are prepared for the retrieval
+        if 'steps' in self.inputs:
+            steps_retrieve_list, steps_script = self._prepare_steps(folder, fleurinp, with_hdf5, retrieve_profile,
+                                                                    cmdline_params)
+            calcinfo.retrieve_list.extend(steps_retrieve_list)
+            append_text = steps_script + append_text
+        if append_text:
+            calcinfo.append_text = '\n'.join(append_text)
         # + ["<", self._INPXML_FILE_NAME,
         # ">", self._SHELLOUTPUT_FILE_NAME, "2>&1"]
         codeinfo.code_uuid = code.uuid
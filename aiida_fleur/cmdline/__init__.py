@@ -28,6 +28,7 @@ except ImportError:
 from .launch import cmd_launch
 from .data import cmd_data
 from .workflows import cmd_workflow
+from .calculation import cmd_calculation
 from .visualization import cmd_plot
 from .util import options as options_af
 
@@ -58,4 +59,5 @@ def cmd_root(profile):  # pylint: disable=unused-argument
 cmd_root.add_command(cmd_launch)
 cmd_root.add_command(cmd_data)
 cmd_root.add_command(cmd_workflow)
+cmd_root.add_command(cmd_calculation)
 cmd_root.add_command(cmd_plot)
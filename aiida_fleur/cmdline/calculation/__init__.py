@@ -0,0 +1,93 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+"""
+Module with CLI commands to post-process existing aiida-fleur calculations.
+"""
+import json
+
+import click
+from aiida.cmdline.params import options
+from aiida.cmdline.utils import decorators, echo
+
+
+@click.group('calculation')
+def cmd_calculation():
+    """Commands to post-process FLEUR calculations."""
+
+
+@cmd_calculation.command('reparse')
+@options.GROUP(help='Only re-parse calculations in this group.')
+@click.option('-f',
+              '--filters',
+              type=str,
+              default=None,
+              help='Additional QueryBuilder filters for the calculation nodes as JSON string, '
+              'e.g. \'{"attributes.exit_status": 0}\'')
+@click.option('-n',
+              '--num-processes',
+              type=int,
+              default=None,
+              help='Number of worker processes. Defaults to the number of CPUs.')
+@click.option('-o',
+              '--output-file',
+              type=click.Path(dir_okay=False),
+              default=None,
+              help='JSON lines file the results are appended to.')
+@click.option('--store/--no-store',
+              default=False,
+              show_default=True,
+              help='Store the results as new Dict/ArrayData nodes referenced in the extras of the calculations.')
+@click.option('--result-group',
+              type=str,
+              default=None,
+              help='Label of the group the stored nodes are added to (created if not existent).')
+@click.option('--streaming/--no-streaming',
+              default=None,
+              help='Read the out.xml files in the streaming mode of the parser. '
+              'By default the parser options of each calculation are used.')
+@options.FORCE(help='Re-parse also calculations that were already re-parsed.')
+@decorators.with_dbenv()
+def reparse(group, filters, num_processes, output_file, store, result_group, streaming, force):
+    """
+    Re-parse the out.xml files of existing FleurCalculations in parallel.
+
+    Already successfully re-parsed calculations are skipped, so an interrupted run can be
+    continued by running the same command again. Failed calculations are retried.
+    """
+    from aiida_fleur.tools.reparse import reparse_calculations
+
+    if output_file is None and not store:
+        echo.echo_critical('Either --output-file or --store has to be given')
+
+    if filters is not None:
+        try:
+            filters = json.loads(filters)
+        except ValueError as exc:
+            echo.echo_critical(f'Could not read the filters: {exc}')
+
+    def report_progress(summary):
+        done = summary['skipped'] + summary['parsed'] + summary['failed']
+        echo.echo_report(f"{done}/{summary['total']} calculations processed ({summary['failed']} failed)")
+
+    summary = reparse_calculations(filters=filters,
+                                   group=group,
+                                   num_processes=num_processes,
+                                   output_file=output_file,
+                                   store=store,
+                                   result_group=result_group,
+                                   streaming=streaming,
+                                   force=force,
+                                   progress_callback=report_progress)
+
+    for pk, error in summary['errors'].items():
+        echo.echo_warning(f'Calculation<{pk}>: {error}')
+    echo.echo_success(f"Re-parsed {summary['parsed']} calculations, {summary['failed']} failed, "
+                      f"{summary['skipped']} skipped (already re-parsed)")
@@ -39,7 +39,7 @@ cmd_data.add_command(cmd_fleurinp)
 @click.option('--strucinfo/--no-strucinfo',
               default=False,
               show_default=True,
-              help='Perpare additional information on the crystal structure to show. This slows down the query.')
+              help='Show additional information on the crystal structure (formula, number of atoms and kpoints).')
 @decorators.with_dbenv()
 def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, extras):
     """
@@ -57,7 +57,10 @@ def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, ext
         'Label': 'label',
         'Description': 'description',
         'Files': 'attributes.files',
-        'Extras': 'attributes.extras'
+        'Extras': 'attributes.extras',
+        'Formula': 'attributes.inp_summary.formula',
+        'Natoms': 'attributes.inp_summary.natoms',
+        'Nkpts': 'attributes.inp_summary.nkpts'
     }
 
     if uuid:
@@ -66,6 +69,9 @@ def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, ext
         list_project_headers.append('Ctime')
     if extras:
         list_project_headers.append('Extras')
+    if strucinfo:
+        # stored as attributes when the inp.xml is added, so no file has to be parsed
+        list_project_headers.extend(['Formula', 'Natoms', 'Nkpts'])
 
     project = [columns_dict[k] for k in list_project_headers]
     group_pks = None
@@ -73,11 +79,6 @@ def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, ext
         group_pks = [g.pk for g in groups]
 
     data_fleurinp = query(FleurinpData, project, past_days, group_pks, all_users)
-    if strucinfo:  # second query
-        # we get the whole node to get some extra information
-        project2 = '*'
-        fleurinps = query(FleurinpData, project2, past_days, group_pks, all_users)
-        list_project_headers.append('Formula')
     counter = 0
     fleurinp_list_data = []
 
@@ -85,7 +86,7 @@ def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, ext
     # It is fastest for list commands to only display content from a query
     if not raw:
         fleurinp_list_data.append(list_project_headers)
-    for j, entry in enumerate(data_fleurinp):
+    for entry in data_fleurinp:
         #print(entry)
         for i, value in enumerate(entry):
             if isinstance(value, list):
@@ -96,10 +97,9 @@ def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, ext
                     else:
                         new_entry.append(elm)
                 entry[i] = ','.join(new_entry)
-        if strucinfo:
-            structure = fleurinps[j][0].get_structuredata_ncf()
-            formula = structure.get_formula()
-            entry.append(formula)
+        if strucinfo and entry[list_project_headers.index('Formula')] is None:
+            # nodes created before the summary attribute was introduced
+            entry[list_project_headers.index('Formula')] = _get_formula_fallback(entry[0])
         for i in range(len(entry), len(list_project_headers)):
             entry.append(None)
         counter += 1
@@ -111,6 +111,17 @@ def list_fleurinp(raw, past_days, groups, all_users, strucinfo, uuid, ctime, ext
         echo.echo(f'\nTotal results: {counter}\n')
 
 
+def _get_formula_fallback(pk):
+    """
+    Get the formula of a FleurinpData without the ``inp_summary`` attribute by parsing the inp.xml
+    """
+    from aiida.orm import load_node
+    try:
+        return load_node(pk).get_structuredata_ncf().get_formula()
+    except ValueError:
+        return None
+
+
 @cmd_fleurinp.command('cat')
 @arguments.NODE('node', type=DataParamType(sub_classes=('aiida.data:fleur.fleurinp',)))
 @click.option('-f',
@@ -20,19 +20,21 @@ input manipulation plus methods for extration of AiiDA data structures.
 # because otherwise return this node instead of creating a new one!
 from __future__ import annotations
 import os
-import io
 import re
 import warnings
 import pathlib
+import weakref
 
 from aiida import orm
 from aiida.engine import calcfunction as cf
 from aiida.common.exceptions import InputValidationError, ValidationError
 
-from typing import Any, cast, Iterator, BinaryIO, TextIO, ContextManager, Dict, List
+from typing import Any, cast, Iterable, Iterator, BinaryIO, TextIO, ContextManager, Dict, List
 
 from lxml import etree
 from masci_tools.io.parsers.fleur_schema import InputSchemaDict
+from aiida_fleur.tools.io_routines import COMPRESSED_SUFFIX, open_output_file
+from aiida_fleur.data.inpxml_cache import INPXML_CACHE, VALIDATION_CACHE
 
 __all__ = ('FleurinpData', 'get_fleurinp_from_folder_data', 'get_fleurinp_from_remote_data', 'get_structuredata',
            'get_kpointsdata', 'get_parameterdata', 'convert_inpxml', 'get_fleurinp_from_folder_data_cf',
@@ -93,8 +95,18 @@ def get_fleurinp_from_folder_data(folder_node: orm.FolderData,
         additional_files = additional_files.get_list()
 
     input_xml_files = [file for file in folder_node.list_object_names() if file.endswith('.xml') and 'out' not in file]
+    #The relax.xml might be retrieved compressed (gzip_outputs setting of the FleurCalculation)
+    compressed_xml_files = [
+        file[:-len(COMPRESSED_SUFFIX)]
+        for file in folder_node.list_object_names()
+        if file.endswith(f'.xml{COMPRESSED_SUFFIX}') and 'out' not in file
+    ]
+    compressed_xml_files = [file for file in compressed_xml_files if file not in input_xml_files]
 
     fleurinp = FleurinpData(files=input_xml_files + additional_files, node=folder_node)
+    for file in compressed_xml_files:
+        with open_output_file(folder_node, file, 'rb') as handle:
+            fleurinp.set_file(handle, dst_filename=file)
     if store:
         fleurinp.store()
 
@@ -124,6 +136,48 @@ def get_fleurinp_from_remote_data(remote_node: orm.RemoteData,
                                          additional_files=additional_files)
 
 
+#Properties available in FleurinpData.get_summary
+_SUMMARY_PROPERTIES = ('structure', 'kpoints', 'parameters', 'fleur_modes', 'nkpts')
+
+#URL scheme of the base_url of inp.xml files parsed from a FleurinpData
+#Included files are requested by the parser under <scheme>://<uuid>/<filename>
+_INCLUDE_URL_SCHEME = 'fleurinp'
+
+
+class _RepositoryResolver(etree.Resolver):
+    """
+    Resolver for the XML parser serving the files included in the ``inp.xml``
+    (e.g. ``kpts.xml``, ``sym.xml``, ``relax.xml``) from the repository of a FleurinpData
+
+    :param fleurinp: FleurinpData containing the files
+    """
+
+    def __init__(self, fleurinp: FleurinpData) -> None:
+        super().__init__()
+        #The parser (and therefore the resolver) lives as long as the parsed trees
+        #so no strong reference to the node is kept
+        self._fleurinp = weakref.ref(fleurinp)
+        self._files = set(fleurinp.files)
+        self._url_prefix = f'{_INCLUDE_URL_SCHEME}://{fleurinp.uuid}/'
+
+    def resolve(self, system_url, public_id, context):  #pylint: disable=unused-argument
+        """
+        Return the content of the requested file, if it is a file of the FleurinpData.
+        Otherwise None is returned, so that the default resolution (and the fallback
+        of the xi:include) is used
+        """
+        fleurinp = self._fleurinp()
+        if fleurinp is None or not system_url or not system_url.startswith(self._url_prefix):
+            return None
+
+        filename = system_url[len(self._url_prefix):]
+        if filename not in self._files:
+            return None
+
+        with fleurinp.open(path=filename, mode='rb') as file:
+            return self.resolve_string(file.read(), context)
+
+
 class FleurinpData(orm.Data):
     """
     AiiDA data object representing everything a FLEUR calculation needs.
@@ -250,6 +304,7 @@ class FleurinpData(orm.Data):
         :param filename: name of the file to be removed from FleurinpData instance
         """
         # remove from files attr list
+        INPXML_CACHE.invalidate(self.uuid)
         filelist_attribute = self.base.attributes.get('files', [])
         if filename in filelist_attribute:
             filelist_attribute.remove(filename)
@@ -280,6 +335,7 @@ class FleurinpData(orm.Data):
         # contra: has to be maintained, also these files can be inputed from byte strings...
         #_list_of_allowed_files = ['inp.xml', 'enpara', 'cdn1', 'sym.out', 'kpts']
 
+        source_node: orm.Node | None = None
         if node is not None:
             if not isinstance(node, orm.Node):
                 node = orm.load_node(node)
@@ -292,13 +348,7 @@ class FleurinpData(orm.Data):
 
             is_filelike = True
             final_filename = path_or_handle
-
-            # Get bytestring of file
-            # since we have to use 'with', and node has no method to copy files
-            # we read the whole file and write it again later
-            # this is not so nice, but we assume that input files are rather small...
-            with node.base.repository.open(path_or_handle, mode='rb') as file:
-                path_or_handle = io.BytesIO(file.read())  #type: ignore[arg-type]
+            source_node = node
 
         elif isinstance(path_or_handle, (str, pathlib.Path)):
             is_filelike = False
@@ -325,13 +375,20 @@ class FleurinpData(orm.Data):
         if final_filename == 'UNKNOWN':
             raise ValueError('Provided an anonymous file handle without a filename')
 
+        INPXML_CACHE.invalidate(self.uuid)
+
         old_files_list = self.base.attributes.get('files', [])
 
         # remove file from folder first if it exists
         if final_filename not in old_files_list:
             old_files_list.append(final_filename)
 
-        if is_filelike:
+        if source_node is not None:
+            # The content is copied in chunks from the repository of the node,
+            # so the memory does not grow with the size of the file (e.g. cdn1, cdn.hdf)
+            with source_node.base.repository.open(cast(str, path_or_handle), mode='rb') as file:
+                self.put_object_from_filelike(file, final_filename)
+        elif is_filelike:
             self.put_object_from_filelike(path_or_handle, final_filename)
         else:
             self.put_object_from_file(path_or_handle, final_filename)
@@ -343,15 +400,11 @@ class FleurinpData(orm.Data):
 
         if final_filename == 'inp.xml':
             # get input file version number
-            inp_version_number = None
-            lines = self.get_content(filename=final_filename).split('\n')
-            for line in lines:
-                if re.search('fleurInputVersion', str(line)):
-                    inp_version_number = re.findall(r'\d+.\d+', str(line))[0]
-                    break
+            with self.open(path=final_filename, mode='rb') as inpxmlfile:
+                inp_version_number = _read_inp_version(inpxmlfile)
             if inp_version_number is None:
                 raise InputValidationError('No fleurInputVersion number found '
-                                           f'in given input file: {path_or_handle}. {lines}'
+                                           f'in given input file: {path_or_handle}. '
                                            'Please check if this is a valid fleur input file. '
                                            'It can not be validated and I can not use it. ')
 
@@ -366,12 +419,11 @@ class FleurinpData(orm.Data):
         1. load ``inp.xml`` file
         2. insert all files to include into the etree
         3. call masci-tools input file parser (Validation happens inside here)
-        4. set inputxml_dict
+        4. set inputxml_dict and the queryable summary (see :py:attr:`inp_summary`)
         """
         from masci_tools.io.parsers.fleur import inpxml_parser
 
-        #The schema_dict is not needed outside the inpxml_parser so we ignore it with the underscore
-        xmltree, _ = self.load_inpxml()  #type: ignore[misc]
+        xmltree, schema_dict = self.load_inpxml()  #type: ignore[misc]
 
         parser_info: dict[str, Any] = {}
         try:
@@ -384,27 +436,49 @@ class FleurinpData(orm.Data):
 
         # set inpxml_dict attribute
         self.base.attributes.set('inp_dict', inpxml_dict)
+        self.base.attributes.set('inp_summary', _inp_summary_from_xml(xmltree, schema_dict, inpxml_dict))
 
     def load_inpxml(
         self,
         validate_xml_schema: bool = True,
         return_included_tags: bool = False,
+        force_validation: bool = False,
         **kwargs: Any
     ) -> tuple[etree._ElementTree, InputSchemaDict] | tuple[etree._ElementTree, InputSchemaDict, set[str]]:
         """
         Returns the lxml etree and the schema dictionary corresponding to the version. If validate_xml_schema=True
         the file will also be validated against the schema
 
+        The validated trees are cached per process (see :py:mod:`aiida_fleur.data.inpxml_cache`)
+        for the UUID of the node and the hash of its files. The returned tree is always
+        a copy and can be modified. The validation itself is skipped if the same (canonical)
+        content was validated before in any process, unless ``force_validation=True`` is given
+
         Keyword arguments are passed on to the parser
         """
         from masci_tools.io.fleur_xml import load_inpxml
 
         self._validate()
 
+        cache_key = None
+        if INPXML_CACHE.enabled:
+            cache_key = INPXML_CACHE.make_key(self.uuid, self._get_cache_hash(), **kwargs)
+        if cache_key is not None and not force_validation:
+            cached = INPXML_CACHE.get(cache_key)
+            if cached is not None:
+                if return_included_tags:
+                    return cached
+                return cached[0], cached[1]
+
+        #The files included via xi:include are served directly from the repository
+        #of this node by the resolver of the parser
+        parser = etree.XMLParser(attribute_defaults=True, encoding='utf-8', **kwargs)
+        parser.resolvers.add(_RepositoryResolver(self))
         with self.open(path='inp.xml', mode='rb') as inpxmlfile:
             try:
-                xmltree, schema_dict = load_inpxml(inpxmlfile, **kwargs)
-            except ValueError as exc:
+                xmltree = etree.parse(inpxmlfile, parser, base_url=f'{_INCLUDE_URL_SCHEME}://{self.uuid}/inp.xml')
+                xmltree, schema_dict = load_inpxml(xmltree)
+            except (ValueError, etree.XMLSyntaxError) as exc:
                 # prob inp.xml file broken
                 err_msg = ('The inp.xml file is probably broken, could not parse it to an xml etree.')
                 raise InputValidationError(err_msg) from exc
@@ -418,7 +492,7 @@ class FleurinpData(orm.Data):
 
         if validate_xml_schema and not develop_version:
             try:
-                schema_dict.validate(xmltree)
+                VALIDATION_CACHE.validate(xmltree, schema_dict, force=force_validation)
             except ValueError as err:
                 raise InputValidationError(err) from err
         elif develop_version and self.logger is not None:
@@ -427,51 +501,50 @@ class FleurinpData(orm.Data):
                                 'Unexpected Errors can occur. If that is the case you can try to add the '
                                 'XML Schema for this file version to masci-tools')
 
+        if cache_key is not None and validate_xml_schema:
+            INPXML_CACHE.put(cache_key, xmltree, schema_dict, included_tags)
+
         if return_included_tags:
             return xmltree, schema_dict, included_tags
         return xmltree, schema_dict
 
-    def _include_files(self, xmltree: etree._ElementTree) -> tuple[etree._ElementTree, set[str]]:
+    def _get_content_hash(self) -> str:
+        """
+        Returns a hash of the content of all files in the repository of the node
         """
-        Tries to insert all .xml, which are not inp.xml file into the etree since they are
-        not naturally available for the parser (open vs self.open)
+        from aiida.common.hashing import make_hash
 
-        Creates a NamedTemporaryFile for each one with their content
-        and replaces the name in the `href` attributes of the `xi:include` tags.
-        Then these are expanded with `xmltree.xinclude()`
+        if self.is_stored:
+            #The keys of the objects in the repository metadata are the
+            #hashes of the file contents, so no file has to be read
+            return make_hash(self.base.repository.metadata)
+        return self.base.repository.hash()
+
+    def _get_cache_hash(self) -> str:
         """
-        from masci_tools.util.xml.common_functions import clear_xml, eval_xpath
-        import tempfile
+        Returns the content part of the key for the :py:data:`INPXML_CACHE`
 
-        temp_files = []
-        for file in self.files:
-            #Check if the filename appears in a xi:include tag
-            nodes = eval_xpath(xmltree,
-                               '//xi:include[@href=$filename]',
-                               namespaces={'xi': 'http://www.w3.org/2001/XInclude'},
-                               filename=file,
-                               list_return=True)
-            if not nodes:
-                continue
-
-            #Get file content from node
-            include_content = self.get_content(file)
-
-            #Write content into temporary file
-            with tempfile.NamedTemporaryFile(mode='w', delete=False) as fo:
-                fo.write(include_content)
-                temp_files.append(fo.name)
-                for node in nodes:
-                    node.set('href', fo.name)
+        For unstored nodes the entries are keyed on the UUID only, since hashing
+        the repository would read all files on each call. These entries are
+        removed when files are added or removed with :py:meth:`set_file()`
+        or :py:meth:`del_file()`
+        """
+        if self.is_stored:
+            return self._get_content_hash()
+        return 'unstored'
 
-        #Performs the inclusions and remove comments
-        cleared_tree, included_tags = clear_xml(xmltree)
+    def _include_files(self, xmltree: etree._ElementTree) -> tuple[etree._ElementTree, set[str]]:
+        """
+        Inserts all files included via `xi:include` tags into the etree and removes the comments
 
-        #Remove created temporary files
-        for file in temp_files:
-            os.remove(file)
+        The xmltree has to be parsed with a parser using the :py:class:`_RepositoryResolver`
+        for this node (see :py:meth:`load_inpxml()`). Then the included files are read directly
+        from the repository of the node without writing them to the file system
+        """
+        from masci_tools.util.xml.common_functions import clear_xml
 
-        return cleared_tree, included_tags
+        #Performs the inclusions and remove comments
+        return clear_xml(xmltree)
 
     # dict with inp paramters parsed from inp.xml
     @property
@@ -482,6 +555,35 @@ class FleurinpData(orm.Data):
         """
         return self.base.attributes.get('inp_dict', {})
 
+    @property
+    def inp_summary(self) -> dict[str, Any]:
+        """
+        Returns the dictionary with the queryable summary of the ``inp.xml`` file, i.e. the
+        number of atoms (``natoms``), the chemical formula (``formula``), the number of kpoints
+        (``nkpts``), the plane wave cutoff (``kmax``), the number of spins (``jspins``),
+        the ``noco`` and ``soc`` flags and the ``fleur_modes``. Entries, which could not
+        be determined are None.
+
+        The attribute is set when the ``inp.xml`` is added, so it can be used in
+        QueryBuilder filters and projections without accessing the files, e.g.
+        ``qb.append(FleurinpData, filters={'attributes.inp_summary.natoms': {'<': 10}})``.
+        For nodes created with older versions of aiida-fleur it is empty
+        """
+        return self.base.attributes.get('inp_summary', {})
+
+    @property
+    def fleur_modes(self) -> dict[str, Any]:
+        """
+        Returns the calculation modes of the ``inp.xml`` file (see :py:meth:`get_fleur_modes()`).
+        The modes are determined once, when the ``inp.xml`` is added, and stored in the
+        :py:attr:`inp_summary` attribute. Only for nodes created with older versions of
+        aiida-fleur the ``inp.xml`` is parsed
+        """
+        modes = self.inp_summary.get('fleur_modes')
+        if modes is None:
+            modes = self.get_fleur_modes()
+        return modes
+
     # version of the inp.xml file
     @property
     def inp_version(self) -> str | None:
@@ -539,22 +641,13 @@ class FleurinpData(orm.Data):
         :param self: a FleurinpData instance to be parsed into a StructureData
         :returns: StructureData node, or None
         """
-        from masci_tools.util.xml.xml_getters import get_structuredata as get_structuredata_xml
-
         xmltree, schema_dict = self.load_inpxml()  #type: ignore[misc]
 
-        atoms, cell, pbc = get_structuredata_xml(xmltree, schema_dict, normalize_kind_name=normalize_kind_name)
-
-        struc = orm.StructureData(cell=cell, pbc=pbc)
-
-        for atom in atoms:
-            struc.append_atom(position=atom.position, symbols=atom.symbol, name=atom.kind)
-
         # TODO DATA-DATA links are not wanted, you might want to use a cf instead
         #struc.add_link_from(self, label='self.structure', link_type=LinkType.CREATE)
         # label='self.structure'
         # return {label : struc}
-        return struc
+        return _structuredata_from_xml(xmltree, schema_dict, normalize_kind_name=normalize_kind_name)
 
     def get_structuredata(self, normalize_kind_name: orm.Bool | None = None) -> orm.StructureData:
         """
@@ -583,8 +676,6 @@ class FleurinpData(orm.Data):
 
         :returns: :class:`~aiida.orm.KpointsData` node
         """
-        from masci_tools.util.xml.xml_getters import get_kpointsdata as get_kpointsdata_xml
-
         # HINT, TODO:? in this routine, the 'cell' you might get in an other way
         # exp: StructureData.cell, but for this you have to make a structureData Node,
         # which might take more time for structures with lots of atoms.
@@ -593,41 +684,7 @@ class FleurinpData(orm.Data):
 
         xmltree, schema_dict = self.load_inpxml()  #type: ignore[misc]
 
-        if name is None and index is None:
-            kpoints, weights, cell, pbc = get_kpointsdata_xml(xmltree, schema_dict, only_used=only_used)
-        else:
-            kpoints, weights, cell, pbc = get_kpointsdata_xml(xmltree,
-                                                              schema_dict,
-                                                              name=name,
-                                                              index=index,
-                                                              only_used=only_used)
-
-        if isinstance(kpoints, dict):
-            weights = cast(Dict[str, List[float]], weights)
-            kpoints_data = {}
-            for (label, kpoints_set), weights_set in zip(kpoints.items(), weights.values()):
-                kps = orm.KpointsData()
-                kps.set_cell(cell)
-                kps.pbc = pbc
-                kps.set_kpoints(kpoints_set, cartesian=False, weights=weights_set)
-                #kpoints_data.add_link_from(self, label='fleurinp.kpts', link_type=LinkType.CREATE)
-                pattern = re.compile(r'\W', re.UNICODE)
-                kpoint_identifier = re.sub(pattern, '', label.replace('-', '_'))
-                if kpoint_identifier != label.replace('-', '_'):
-                    warnings.warn(
-                        f'Normed the name of the kpoint set {label} to {kpoint_identifier}'
-                        ' to be able to use it as a link label', UserWarning)
-                kps.label = f'fleurinp.kpts.{kpoint_identifier}'
-                kpoints_data[kpoint_identifier] = kps
-            return kpoints_data
-
-        kps = orm.KpointsData()
-        kps.set_cell(cell)
-        kps.pbc = pbc
-        kps.set_kpoints(kpoints, cartesian=False, weights=weights)
-        #kps.add_link_from(self, label='fleurinp.kpts', link_type=LinkType.CREATE)
-        kps.label = 'fleurinp.kpts'
-        return kps
+        return _kpointsdata_from_xml(xmltree, schema_dict, name=name, index=index, only_used=only_used)
 
     def get_kpointsdata(self,
                         name: orm.Str | None = None,
@@ -658,6 +715,79 @@ class FleurinpData(orm.Data):
 
         return orm.Dict(parameter_data)
 
+    def get_summary(self,
+                    properties: Iterable[str] | None = None,
+                    normalize_kind_name: bool = True,
+                    inpgen_ready: bool = True,
+                    write_ids: bool = True,
+                    only_used_kpoints: bool = False) -> dict[str, Any]:
+        """
+        Returns the most commonly used information from the ``inp.xml`` file, which is parsed
+        and validated only once. None of the created nodes keeps the provenance.
+
+        The following properties are available:
+
+            * ``structure``: :class:`~aiida.orm.StructureData` (see :py:meth:`get_structuredata_ncf()`)
+            * ``kpoints``: :class:`~aiida.orm.KpointsData` or dict of them (see :py:meth:`get_kpointsdata_ncf()`)
+            * ``parameters``: :class:`~aiida.orm.Dict` with the LAPW parameters (see :py:meth:`get_parameterdata_ncf()`)
+            * ``fleur_modes``: dict with the calculation modes (see :py:meth:`get_fleur_modes()`)
+            * ``nkpts``: int with the number of kpoints (see :py:meth:`get_nkpts()`)
+
+        :param properties: list of the properties to extract, by default all are extracted.
+                           In this case ``structure``, ``kpoints`` and ``nkpts`` are None if they cannot be
+                           extracted (e.g. the kpoints are not listed in the ``inp.xml``),
+                           explicitly requested properties raise the error
+        :param normalize_kind_name: passed on to the extraction of the structure
+        :param inpgen_ready: passed on to the extraction of the parameters
+        :param write_ids: passed on to the extraction of the parameters
+        :param only_used_kpoints: if True only the used kpoint set is extracted
+
+        :returns: dict with the requested properties
+        """
+        from masci_tools.util.xml.xml_getters import get_fleur_modes, get_nkpts
+        from masci_tools.util.xml.xml_getters import get_parameterdata as get_parameterdata_xml
+
+        extract_all = properties is None
+        if properties is None:
+            properties = _SUMMARY_PROPERTIES
+        unknown = set(properties).difference(_SUMMARY_PROPERTIES)
+        if unknown:
+            raise ValueError(f'Unknown properties: {sorted(unknown)}. Available are: {_SUMMARY_PROPERTIES}')
+
+        xmltree, schema_dict = self.load_inpxml()  #type: ignore[misc]
+
+        summary: dict[str, Any] = {}
+        if 'structure' in properties:
+            try:
+                summary['structure'] = _structuredata_from_xml(xmltree,
+                                                               schema_dict,
+                                                               normalize_kind_name=normalize_kind_name)
+            except ValueError:
+                if not extract_all:
+                    raise
+                summary['structure'] = None
+        if 'kpoints' in properties:
+            try:
+                summary['kpoints'] = _kpointsdata_from_xml(xmltree, schema_dict, only_used=only_used_kpoints)
+            except ValueError:
+                if not extract_all:
+                    raise
+                summary['kpoints'] = None
+        if 'parameters' in properties:
+            summary['parameters'] = orm.Dict(
+                get_parameterdata_xml(xmltree, schema_dict, inpgen_ready=inpgen_ready, write_ids=write_ids))
+        if 'fleur_modes' in properties:
+            summary['fleur_modes'] = get_fleur_modes(xmltree, schema_dict)
+        if 'nkpts' in properties:
+            try:
+                summary['nkpts'] = get_nkpts(xmltree, schema_dict)
+            except ValueError:
+                if not extract_all:
+                    raise
+                summary['nkpts'] = None
+
+        return summary
+
     def get_parameterdata(self, inpgen_ready: orm.Bool | None = None, write_ids: orm.Bool | None = None) -> orm.Dict:
         """
         This routine returns an AiiDA :class:`~aiida.orm.Dict` type produced from the ``inp.xml``
@@ -714,6 +844,154 @@ class FleurinpData(orm.Data):
         return clone
 
 
+def _read_inp_version(inpxmlfile: BinaryIO) -> str | None:
+    """
+    Read the ``fleurInputVersion`` from the root element of an ``inp.xml`` file.
+
+    The file is parsed incrementally and the parsing stops after the first start tag,
+    so only the header of the file is read independent of its size
+
+    :param inpxmlfile: file handle opened in binary mode
+
+    :returns: str of the version number or None if it could not be determined
+    """
+    try:
+        for _, root in etree.iterparse(inpxmlfile, events=('start',)):
+            version = re.findall(r'\d+.\d+', root.get('fleurInputVersion', ''))
+            return version[0] if version else None
+    except etree.XMLSyntaxError:
+        pass
+    return None
+
+
+def _inp_summary_from_xml(xmltree: etree._ElementTree, schema_dict: InputSchemaDict,
+                          inp_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Create the queryable summary attribute of a FleurinpData (see :py:attr:`FleurinpData.inp_summary`)
+
+    The atoms are counted from the already parsed ``inp_dict``, so that the formula is also
+    available for inputs, where no StructureData can be constructed (e.g. ``latnam`` definitions)
+
+    :param xmltree: xmltree of the inp.xml
+    :param schema_dict: InputSchemaDict corresponding to the xmltree
+    :param inp_dict: dict produced by the inpxml_parser for the xmltree
+
+    :returns: dict with the summary
+    """
+    from aiida.orm.nodes.data.structure import get_formula
+    from masci_tools.util.xml.xml_getters import get_fleur_modes, get_nkpts
+
+    summary: dict[str, Any] = {'natoms': None, 'formula': None, 'nkpts': None, 'kmax': None}
+
+    elements = {species.get('name'): species.get('element') for species in inp_dict.get('atomSpecies', [])}
+    symbols = []
+    for group in inp_dict.get('atomGroups', []):
+        for key in ('relPos', 'absPos', 'filmPos'):
+            positions = group.get(key, [])
+            if positions and not isinstance(positions[0], list):
+                positions = [positions]
+            symbols.extend([elements.get(group.get('species'))] * len(positions))
+    if symbols and all(symbol is not None for symbol in symbols):
+        summary['natoms'] = len(symbols)
+        summary['formula'] = get_formula(symbols)
+
+    summary['kmax'] = inp_dict.get('calculationSetup', {}).get('cutoffs', {}).get('Kmax')
+
+    try:
+        summary['nkpts'] = get_nkpts(xmltree, schema_dict)
+    except ValueError:
+        pass
+
+    fleur_modes = get_fleur_modes(xmltree, schema_dict)
+    summary['jspins'] = fleur_modes['jspin']
+    summary['noco'] = fleur_modes['noco']
+    summary['soc'] = fleur_modes['soc']
+    summary['fleur_modes'] = fleur_modes
+
+    return summary
+
+
+def _structuredata_from_xml(xmltree: etree._ElementTree,
+                            schema_dict: InputSchemaDict,
+                            normalize_kind_name: bool = True) -> orm.StructureData:
+    """
+    Create a StructureData from the given parsed ``inp.xml``
+
+    :param xmltree: xmltree of the inp.xml
+    :param schema_dict: InputSchemaDict corresponding to the xmltree
+    :param normalize_kind_name: bool, passed on to the xml getter
+
+    :returns: StructureData node
+    """
+    from masci_tools.util.xml.xml_getters import get_structuredata as get_structuredata_xml
+
+    atoms, cell, pbc = get_structuredata_xml(xmltree, schema_dict, normalize_kind_name=normalize_kind_name)
+
+    struc = orm.StructureData(cell=cell, pbc=pbc)
+
+    for atom in atoms:
+        struc.append_atom(position=atom.position, symbols=atom.symbol, name=atom.kind)
+
+    return struc
+
+
+def _kpointsdata_from_xml(xmltree: etree._ElementTree,
+                          schema_dict: InputSchemaDict,
+                          name: str | None = None,
+                          index: int | None = None,
+                          only_used: bool = False) -> orm.KpointsData | dict[str, orm.KpointsData]:
+    """
+    Create KpointsData from the given parsed ``inp.xml``
+
+    :param xmltree: xmltree of the inp.xml
+    :param schema_dict: InputSchemaDict corresponding to the xmltree
+    :param name: str, optional, if given only the kpoint set with the given name
+                 is returned
+    :param index: int, optional, if given only the kpoint set with the given index
+                  is returned
+    :param only_used: bool, if True only the used kpoint set is returned
+
+    :returns: KpointsData node or dict of KpointsData nodes for multiple kpoint sets
+    """
+    from masci_tools.util.xml.xml_getters import get_kpointsdata as get_kpointsdata_xml
+
+    if name is None and index is None:
+        kpoints, weights, cell, pbc = get_kpointsdata_xml(xmltree, schema_dict, only_used=only_used)
+    else:
+        kpoints, weights, cell, pbc = get_kpointsdata_xml(xmltree,
+                                                          schema_dict,
+                                                          name=name,
+                                                          index=index,
+                                                          only_used=only_used)
+
+    if isinstance(kpoints, dict):
+        weights = cast(Dict[str, List[float]], weights)
+        kpoints_data = {}
+        for (label, kpoints_set), weights_set in zip(kpoints.items(), weights.values()):
+            kps = orm.KpointsData()
+            kps.set_cell(cell)
+            kps.pbc = pbc
+            kps.set_kpoints(kpoints_set, cartesian=False, weights=weights_set)
+            #kpoints_data.add_link_from(self, label='fleurinp.kpts', link_type=LinkType.CREATE)
+            pattern = re.compile(r'\W', re.UNICODE)
+            kpoint_identifier = re.sub(pattern, '', label.replace('-', '_'))
+            if kpoint_identifier != label.replace('-', '_'):
+                warnings.warn(
+                    f'Normed the name of the kpoint set {label} to {kpoint_identifier}'
+                    ' to be able to use it as a link label', UserWarning)
+            kps.label = f'fleurinp.kpts.{kpoint_identifier}'
+            kpoints_data[kpoint_identifier] = kps
+        return kpoints_data
+
+    kps = orm.KpointsData()
+    kps.set_cell(cell)
+    kps.pbc = pbc
+    kps.set_kpoints(kpoints, cartesian=False, weights=weights)
+    #kps.add_link_from(self, label='fleurinp.kpts', link_type=LinkType.CREATE)
+    kps.label = 'fleurinp.kpts'
+    return kps
+
+
 @cf
 def get_kpointsdata(fleurinp: FleurinpData,
                     name: orm.Str | None = None,
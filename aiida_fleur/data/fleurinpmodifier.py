@@ -16,6 +16,9 @@ FleurinpData objects in a way which keeps the provernance.
 from __future__ import annotations
 from contextlib import contextmanager
 
+import copy
+import hashlib
+import json
 import os
 from lxml import etree
 import warnings
@@ -26,13 +29,100 @@ from aiida.common import AttributeDict
 from aiida import orm
 
 from aiida_fleur.data.fleurinp import FleurinpData
+from aiida_fleur.data.inpxml_cache import VALIDATION_CACHE
 from aiida_fleur.tools.xml_aiida_modifiers import set_kpointsdata_f
 
 from masci_tools.io.fleurxmlmodifier import ModifierTask, FleurXMLModifier
+from masci_tools.io.parsers.fleur_schema import InputSchemaDict
 from masci_tools.util.xml.common_functions import serialize_xml_objects
 from typing import Any, Generator, Callable
 
-__all__ = ('FleurinpModifier', 'inpxml_changes', 'modify_fleurinpdata')
+__all__ = ('FleurinpModifier', 'inpxml_changes', 'modify_fleurinpdata', 'modify_fleurinpdata_batch',
+           'get_modification_fingerprint', 'FINGERPRINT_EXTRA_KEY')
+
+#: Extra of the FleurinpData created by :py:func:`modify_fleurinpdata` and :py:func:`modify_fleurinpdata_batch`
+#: containing the fingerprint of the original content and the modifications
+#: (see :py:func:`get_modification_fingerprint`)
+FINGERPRINT_EXTRA_KEY = 'fleurinp_modifier_fingerprint'
+
+
+class _ModifierSession:
+    """
+    State of a persistent :py:class:`FleurinpModifier`, i.e. the clone of the original
+    FleurinpData with all file modifications and the modified xmltree and n_mmp_mat file
+
+    :param fleurinp: clone of the original FleurinpData with the file modifications applied
+    """
+
+    def __init__(self, fleurinp: FleurinpData) -> None:
+        self.fleurinp = fleurinp
+        self.tasks: list[ModifierTask] = []
+        self.xmltree, self.schema_dict, self.included_tags = fleurinp.load_inpxml(
+            remove_blank_text=True, return_included_tags=True)  #type: ignore[misc]
+        try:
+            with fleurinp.open(path='n_mmp_mat', mode='r') as n_mmp_file:
+                self.nmmp_lines: list[str] | None = n_mmp_file.read().split('\n')
+        except FileNotFoundError:
+            self.nmmp_lines = None
+        self.validated = False
+
+
+#Sessions of persistent FleurinpModifier instances handed over to modify_fleurinpdata
+#keyed by the UUID of the modifications Dict passed to the calcfunction
+_FROZEN_SESSIONS: dict[str, _ModifierSession] = {}
+
+
+def get_modification_fingerprint(original: FleurinpData, tasks: list[ModifierTask]) -> str:
+    """
+    Create the fingerprint of modifying the given FleurinpData with the given tasks.
+    It is the sha256 hash of the hash of the file contents of the original and the canonical
+    JSON serialization of the tasks. The masci-tools version is included, since the
+    result of the modifications may change with it
+
+    :param original: stored FleurinpData, which is modified
+    :param tasks: list of the tasks applied to the original
+
+    :returns: str of the fingerprint
+    """
+    import masci_tools
+    from aiida.orm.implementation.utils import clean_value
+
+    if not original.is_stored:
+        raise ValueError('The fingerprint can only be created for a stored FleurinpData')
+
+    serialized_tasks = [[task[0], task[1], task[2]] for task in tasks]
+    sha = hashlib.sha256(original._get_content_hash().encode())
+    sha.update(json.dumps(clean_value(serialized_tasks), sort_keys=True).encode())
+    sha.update(masci_tools.__version__.encode())
+    return sha.hexdigest()
+
+
+def _find_frozen_fleurinp(fingerprint: str) -> FleurinpData | None:
+    """
+    Find a FleurinpData created by :py:func:`modify_fleurinpdata` or :py:func:`modify_fleurinpdata_batch`
+    with the given fingerprint
+
+    :param fingerprint: str of the fingerprint (see :py:func:`get_modification_fingerprint`)
+
+    :returns: the first created FleurinpData with this fingerprint or None if there is none
+    """
+    qb = orm.QueryBuilder()
+    qb.append(orm.CalcFunctionNode,
+              filters={'attributes.function_name': {
+                  'in': ['modify_fleurinpdata', 'modify_fleurinpdata_batch']
+              }},
+              tag='modifier')
+    qb.append(FleurinpData,
+              with_incoming='modifier',
+              filters={f'extras.{FINGERPRINT_EXTRA_KEY}': fingerprint},
+              project='*',
+              tag='fleurinp')
+    qb.order_by({'fleurinp': {'id': 'asc'}})
+    qb.limit(1)
+    result = qb.first()
+    if result is None:
+        return None
+    return result[0]
 
 
 @contextmanager
@@ -120,7 +210,10 @@ class FleurinpModifier(FleurXMLModifier):
 
     _extra_functions = {'schema_dict': {'set_kpointsdata': set_kpointsdata_f}}
 
-    def __init__(self, original: FleurinpData | None = None) -> None:
+    def __new__(cls, original: FleurinpData | None = None, persistent: bool = False) -> FleurinpModifier:  #pylint: disable=unused-argument
+        return super().__new__(cls)
+
+    def __init__(self, original: FleurinpData | None = None, persistent: bool = False) -> None:
         """
         Initiation of FleurinpModifier.
 
@@ -130,6 +223,10 @@ class FleurinpModifier(FleurXMLModifier):
             property is accessible in this case
 
         :param original: FleurinpData to modify
+        :param persistent: bool, if True the parsed ``inp.xml`` (and ``n_mmp_mat``) are kept in memory.
+                           :py:meth:`show()`, :py:meth:`validate()` and :py:meth:`freeze()` only apply
+                           the tasks added since the last call to this tree, the result is validated
+                           only once and :py:meth:`freeze()` stores the already modified tree
         """
 
         if original is not None:
@@ -140,6 +237,8 @@ class FleurinpModifier(FleurXMLModifier):
 
         self._original = original
         self._other_nodes: dict[str, orm.Node] = {}
+        self._persistent = persistent
+        self._session: _ModifierSession | None = None
 
         super().__init__()
 
@@ -359,18 +458,138 @@ class FleurinpModifier(FleurXMLModifier):
         """
         self._tasks.append(ModifierTask('del_file', args=(filename,), kwargs={}))
 
-    def validate(self) -> etree._ElementTree:
+    @classmethod
+    def _apply_xml_tasks(cls, xmltree: etree._ElementTree, nmmp_lines: list[str] | None, schema_dict: InputSchemaDict,
+                         modification_tasks: list[ModifierTask]) -> tuple[etree._ElementTree, list[str] | None]:
+        """
+        Apply the given XML and n_mmp_mat modifications to the already loaded and cleared xmltree.
+        Same as the loop in :py:meth:`~masci_tools.io.fleurxmlmodifier.FleurXMLModifier.apply_modifications()`
+        without reloading and copying the xmltree
+
+        :param xmltree: xmltree to modify (IS MODIFIED INPLACE)
+        :param nmmp_lines: n_mmp_mat file to modify
+        :param schema_dict: schema dictionary corresponding to the xmltree
+        :param modification_tasks: list of the tasks to apply
+
+        :returns: the modified xmltree and n_mmp_mat file
+        """
+        for task in modification_tasks:
+            if task.name in cls.xpath_functions:
+                xmltree = cls.xpath_functions[task.name](xmltree, *task.args, **task.kwargs)
+            elif task.name in cls.schema_dict_functions:
+                xmltree = cls.schema_dict_functions[task.name](xmltree, schema_dict, *task.args, **task.kwargs)
+            elif task.name in cls.nmmpmat_functions:
+                nmmp_lines = cls.nmmpmat_functions[task.name](xmltree, nmmp_lines, schema_dict, *task.args,
+                                                              **task.kwargs)
+            else:
+                raise ValueError(f'Unknown task {task.name}')
+        return xmltree, nmmp_lines
+
+    def _update_session(self) -> _ModifierSession:
+        """
+        Bring the in-memory tree of a persistent FleurinpModifier up to date with the task list.
+
+        Only the tasks added since the last update are applied. If tasks were removed
+        (e.g. :py:meth:`undo()`) or files are added/removed the session is rebuilt
+        from the original FleurinpData
+
+        :returns: the updated session
+        """
+        if self._original is None:
+            raise ValueError('The persistent mode can only be used if a original FleurinpData'
+                             ' was given on initialization')
+
+        session = self._session
+        tasks = self._tasks
+        if session is not None:
+            new_tasks = tasks[len(session.tasks):]
+            if tasks[:len(session.tasks)] != session.tasks or \
+               any(task.name in ('set_file', 'del_file') for task in new_tasks):
+                session = None
+
+        if session is None:
+            new_fleurinp = self._original.clone()
+            new_tasks = tasks.copy()
+            self.apply_fleurinp_modifications(new_fleurinp, new_tasks)
+            session = _ModifierSession(new_fleurinp)
+
+        if new_tasks:
+            #If a task fails the session has to be rebuilt, since the tree may be partially modified
+            self._session = None
+            session.xmltree, session.nmmp_lines = self._apply_xml_tasks(session.xmltree, session.nmmp_lines,
+                                                                        session.schema_dict, new_tasks)
+            session.validated = False
+        session.tasks = tasks.copy()
+        self._session = session
+        return session
+
+    @staticmethod
+    def _validate_changes(xmltree: etree._ElementTree,
+                          nmmp_lines: list[str] | None,
+                          schema_dict: InputSchemaDict,
+                          force_validation: bool = False) -> None:
+        """
+        Check the modified xmltree and n_mmp_mat file for consistency in the same way as
+        :py:meth:`~masci_tools.io.fleurxmlmodifier.FleurXMLModifier.apply_modifications()`.
+        The schema validation is skipped if the same content was already validated
+        (see :py:class:`~aiida_fleur.data.inpxml_cache.InpxmlValidationCache`)
+
+        :param xmltree: the modified xmltree
+        :param nmmp_lines: the modified n_mmp_mat file
+        :param schema_dict: schema dictionary corresponding to the xmltree
+        :param force_validation: bool, if True the xmltree is always validated against the schema
+        """
+        from masci_tools.util.xml.xml_setters_nmmpmat import validate_nmmpmat
+
+        root = xmltree.getroot()
+        file_version = root.get('fleurInputVersion')
+        if file_version != schema_dict['inp_version']:
+            #Development version, temporarily use the version of the schema
+            root.set('fleurInputVersion', schema_dict['inp_version'])
+            try:
+                VALIDATION_CACHE.validate(xmltree, schema_dict, header='Changes were not valid', force=force_validation)
+            finally:
+                root.set('fleurInputVersion', file_version)
+        else:
+            VALIDATION_CACHE.validate(xmltree, schema_dict, header='Changes were not valid', force=force_validation)
+
+        try:
+            validate_nmmpmat(xmltree, nmmp_lines, schema_dict)
+        except ValueError as exc:
+            raise ValueError('Changes were not valid (n_mmp_mat file is not compatible)') from exc
+
+    def validate(self, force_validation: bool = False) -> etree._ElementTree:
         """
         Extracts the schema-file.
         Makes a test if all the changes lead to an inp.xml file that is validated against the
         schema.
 
+        :param force_validation: bool, if True the schema validation is done even if the same
+                                 content was already validated before
+
         :return: a lxml tree representing inp.xml with applied changes
         """
         if self._original is None:
             raise ValueError('The validate() method can only be used if a original FleurinpData'
                              ' was given on initialization')
 
+        if self._persistent:
+            session = self._update_session()
+            if not session.validated or force_validation:
+                develop_version = session.fleurinp.inp_version != session.schema_dict['inp_version']
+                try:
+                    self._validate_changes(session.xmltree,
+                                           session.nmmp_lines,
+                                           session.schema_dict,
+                                           force_validation=force_validation)
+                except etree.DocumentInvalid as exc:
+                    if not develop_version:
+                        raise
+                    session.fleurinp.logger.warning(
+                        f'Ignoring validation errors for modifications of develop version: \n{exc}')
+                session.validated = True
+            return copy.deepcopy(session.xmltree)
+
         new_fleurinp = self._original.clone()
         tasks = self._tasks.copy()
         self.apply_fleurinp_modifications(new_fleurinp, tasks)
@@ -385,7 +604,8 @@ class FleurinpModifier(FleurXMLModifier):
             nmmplines = None
 
         try:
-            xmltree, nmmp = super().apply_modifications(xmltree, nmmplines, tasks)
+            xmltree, nmmp = super().apply_modifications(xmltree, nmmplines, tasks, validate_changes=False)
+            self._validate_changes(xmltree, nmmp, schema_dict, force_validation=force_validation)
         except etree.DocumentInvalid as exc:
             if not develop_version:
                 raise
@@ -410,6 +630,8 @@ class FleurinpModifier(FleurXMLModifier):
 
         if validate:
             xmltree = self.validate()
+        elif self._persistent:
+            xmltree = copy.deepcopy(self._update_session().xmltree)
         else:
             new_fleurinp = self._original.clone()
             tasks = self._tasks.copy()
@@ -430,16 +652,28 @@ class FleurinpModifier(FleurXMLModifier):
             print(xmltreestring)
         return xmltree
 
-    def freeze(self) -> FleurinpData:
+    def freeze(self, deduplicate: bool = False) -> FleurinpData:
         """
         This method applies all the modifications to the input and
         returns a new stored fleurinpData object.
 
+        :param deduplicate: bool, if True and the same modifications were already applied to a
+                            FleurinpData with the same content before, the existing result
+                            is returned instead of running the calcfunction again.
+                            The results are found by their fingerprint stored in the extra
+                            ``fleurinp_modifier_fingerprint`` (see :py:func:`get_modification_fingerprint`)
+
         :return: stored :class:`~aiida_fleur.data.fleurinp.FleurinpData` with applied changes
         """
         if self._original is None:
             raise ValueError('The freeze() method can only be used if a original FleurinpData'
                              ' was given on initialization')
+
+        if deduplicate and self._original.is_stored:
+            existing = _find_frozen_fleurinp(get_modification_fingerprint(self._original, self._tasks))
+            if existing is not None:
+                return existing
+
         from aiida.orm import Dict
         modifications = Dict({'tasks': self._tasks})
         modifications.description = 'Fleurinpmodifier Tasks and inputs of these.'
@@ -454,8 +688,96 @@ class FleurinpModifier(FleurXMLModifier):
             },
             **self._other_nodes
         }
-        out = modify_fleurinpdata(**inputs)  #type: ignore[arg-type]
-        return out
+        if self._persistent:
+            #The already modified tree is handed over to the calcfunction, the provenance
+            #only contains the task list, which is checked against the session before it is used
+            _FROZEN_SESSIONS[modifications.uuid] = self._update_session()
+        try:
+            return modify_fleurinpdata(**inputs)  #type: ignore[arg-type]
+        finally:
+            _FROZEN_SESSIONS.pop(modifications.uuid, None)
+
+    @classmethod
+    def freeze_batch(cls,
+                     original: FleurinpData,
+                     variants: list[FleurinpModifier | list[tuple[str, dict[str, Any]]]],
+                     deduplicate: bool = False) -> list[FleurinpData]:
+        """
+        Create many modified versions of the same original FleurinpData in one
+        calcfunction (:py:func:`modify_fleurinpdata_batch()`). The ``inp.xml`` of
+        the original is parsed only once and each variant works on a copy of this tree.
+
+        Usage::
+
+            variants = []
+            for angle in [0.0, np.pi/4, np.pi/2]:
+                fm = FleurinpModifier()
+                fm.set_inpchanges({'theta': angle})
+                variants.append(fm)
+
+            new_fleurinps = FleurinpModifier.freeze_batch(fleurinp, variants)
+
+        :param original: FleurinpData to modify
+        :param variants: list of FleurinpModifier instances (constructed with the same
+                         or without an original) or task lists in the format of
+                         :py:attr:`~masci_tools.io.fleurxmlmodifier.FleurXMLModifier.task_list`
+        :param deduplicate: bool, if True variants, which were already created before
+                            (see :py:meth:`freeze()`), are not created again
+
+        :return: list of stored :class:`~aiida_fleur.data.fleurinp.FleurinpData` with applied changes
+                 in the order of the given variants
+        """
+        from aiida.orm import Dict
+
+        if not isinstance(original, FleurinpData):
+            raise TypeError(f'Wrong Type for {cls.__name__}.freeze_batch. Expected {FleurinpData.__name__}. '
+                            f'Got: {original.__class__.__name__}')
+        if not variants:
+            raise ValueError('No variants given')
+
+        tasks = []
+        other_nodes: dict[str, orm.Node] = {}
+        results: dict[int, FleurinpData] = {}
+        for index, variant in enumerate(variants):
+            if not isinstance(variant, FleurinpModifier):
+                task_list = variant
+                variant = cls()
+                variant.add_task_list(task_list)
+            elif variant._original is not None and variant._original.uuid != original.uuid:
+                raise ValueError('All FleurinpModifier variants have to be based on the given original')
+
+            if deduplicate and original.is_stored:
+                existing = _find_frozen_fleurinp(get_modification_fingerprint(original, variant._tasks))
+                if existing is not None:
+                    results[index] = existing
+                    continue
+
+            #The labels are only used for the provenance, the tasks reference the nodes by their UUID
+            known = {node.uuid for node in other_nodes.values()}
+            for node in variant._other_nodes.values():
+                if node.uuid not in known:
+                    other_nodes[f'node_{len(other_nodes)+1}'] = node
+                    known.add(node.uuid)
+            tasks.append(variant._tasks)
+
+        if not tasks:
+            return [results[index] for index in range(len(variants))]
+
+        modifications = Dict({'variants': tasks})
+        modifications.description = 'Fleurinpmodifier Tasks and inputs of these for each variant.'
+        modifications.label = 'Fleurinpdata batch modifications'
+        inputs = {
+            'original': original,
+            'modifications': modifications,
+            'metadata': {
+                'label': 'fleurinp batch modifier',
+                'description': f'This calcfunction created {len(tasks)} modified Fleurinpdataobjects'
+            },
+            **other_nodes
+        }
+        out = modify_fleurinpdata_batch(**inputs)  #type: ignore[arg-type]
+        created = iter(out[f'variant_{index}'] for index in range(len(tasks)))
+        return [results[index] if index in results else next(created) for index in range(len(variants))]
 
     #Deactivate modify_xmlfile method from FleurXMLModifier (Only modify fleurinp)
     def modify_xmlfile(self, *args, **kwargs):  #pylint: disable=missing-function-docstring
@@ -480,35 +802,125 @@ def modify_fleurinpdata(original: FleurinpData, modifications: orm.Dict, **kwarg
     # validate
     # save inp.xml
     # store new fleurinp (copy)
-    import tempfile
-    from masci_tools.util.schema_dict_util import reverse_xinclude
+    from aiida.orm.implementation.utils import clean_value
 
     new_fleurinp = original.clone()
 
     modification_tasks = modifications.get_dict()['tasks']
 
+    #Persistent FleurinpModifier: the XML modifications were already applied to the tree of the session.
+    #It is only used if it was created from exactly the tasks in the inputs
+    session = _FROZEN_SESSIONS.pop(modifications.uuid, None)
+    if session is not None and clean_value([list(task) for task in session.tasks]) != modification_tasks:
+        session = None
+
     #We need to rebuild the namedtuples since the serialization for the calcufunction inputs
     #converts the namedtuples into lists
     modification_tasks = [ModifierTask(*task) for task in modification_tasks]
 
     FleurinpModifier.apply_fleurinp_modifications(new_fleurinp, modification_tasks)
 
-    xmltree, schema_dict, included_tags = new_fleurinp.load_inpxml(remove_blank_text=True, return_included_tags=True)
+    if session is not None:
+        _set_modified_files(new_fleurinp, session.xmltree, session.nmmp_lines, session.schema_dict,
+                            session.included_tags)
+    else:
+        xmltree, schema_dict, included_tags = new_fleurinp.load_inpxml(remove_blank_text=True,
+                                                                       return_included_tags=True)
+
+        try:
+            with new_fleurinp.open(path='n_mmp_mat', mode='r') as n_mmp_file:
+                nmmplines = n_mmp_file.read().split('\n')
+        except FileNotFoundError:
+            nmmplines = None
 
+        new_fleurtree, new_nmmplines = FleurinpModifier.apply_modifications(xmltree=xmltree,\
+                                                                            nmmp_lines=nmmplines,\
+                                                                            modification_tasks=modification_tasks,
+                                                                            validate_changes=False)
+
+        _set_modified_files(new_fleurinp, new_fleurtree, new_nmmplines, schema_dict, included_tags)
+
+    # default label and description
+    new_fleurinp.label = 'mod_fleurinp'
+    new_fleurinp.description = 'Fleurinpdata with modifications (see inputs of modify_fleurinpdata)'
+    new_fleurinp.base.extras.set(FINGERPRINT_EXTRA_KEY,
+                                 get_modification_fingerprint(original,
+                                                              modifications.get_dict()['tasks']))
+
+    return new_fleurinp
+
+
+@cf
+def modify_fleurinpdata_batch(original: FleurinpData, modifications: orm.Dict,
+                              **kwargs: orm.Node) -> dict[str, FleurinpData]:
+    """
+    A CalcFunction that creates many modified versions of the given FleurinpData
+    (see :py:meth:`FleurinpModifier.freeze_batch()`). The ``inp.xml`` of the original
+    is only parsed once, each variant is applied to a copy of the tree.
+
+    :param original: a FleurinpData to be modified
+    :param modifications: a python dictionary of the form {'variants': [[task, ...], ...]}
+    :param kwargs: dict of other aiida nodes to be linked to the modifications
+    :returns: dict with the modified FleurinpData for each variant under the
+              keys ``variant_0``, ``variant_1``, ...
+    """
+    xmltree, schema_dict, included_tags = original.load_inpxml(remove_blank_text=True, return_included_tags=True)
     try:
-        with new_fleurinp.open(path='n_mmp_mat', mode='r') as n_mmp_file:
-            nmmplines = n_mmp_file.read().split('\n')
+        with original.open(path='n_mmp_mat', mode='r') as n_mmp_file:
+            nmmplines: list[str] | None = n_mmp_file.read().split('\n')
     except FileNotFoundError:
         nmmplines = None
 
-    new_fleurtree, new_nmmplines = FleurinpModifier.apply_modifications(xmltree=xmltree,\
-                                                                        nmmp_lines=nmmplines,\
-                                                                        modification_tasks=modification_tasks,
-                                                                        validate_changes=False)
+    result = {}
+    for index, variant_tasks in enumerate(modifications.get_dict()['variants']):
+        modification_tasks = [ModifierTask(*task) for task in variant_tasks]
+        new_fleurinp = original.clone()
 
-    # To include object store storage this prob has to be done differently
+        if any(task.name in ('set_file', 'del_file') for task in modification_tasks):
+            #The files of this variant differ from the original, so the tree is loaded again
+            FleurinpModifier.apply_fleurinp_modifications(new_fleurinp, modification_tasks)
+            variant_tree, variant_schema_dict, variant_included_tags = new_fleurinp.load_inpxml(
+                remove_blank_text=True, return_included_tags=True)
+            try:
+                with new_fleurinp.open(path='n_mmp_mat', mode='r') as n_mmp_file:
+                    variant_nmmplines = n_mmp_file.read().split('\n')
+            except FileNotFoundError:
+                variant_nmmplines = None
+        else:
+            variant_tree = copy.deepcopy(xmltree)
+            variant_nmmplines = nmmplines.copy() if nmmplines is not None else None
+            variant_schema_dict, variant_included_tags = schema_dict, included_tags
+
+        variant_tree, variant_nmmplines = FleurinpModifier._apply_xml_tasks(variant_tree, variant_nmmplines,
+                                                                            variant_schema_dict, modification_tasks)
+        _set_modified_files(new_fleurinp, variant_tree, variant_nmmplines, variant_schema_dict, variant_included_tags)
+
+        new_fleurinp.label = 'mod_fleurinp'
+        new_fleurinp.description = (f'Fleurinpdata with modifications of variant {index} '
+                                    '(see inputs of modify_fleurinpdata_batch)')
+        new_fleurinp.base.extras.set(FINGERPRINT_EXTRA_KEY, get_modification_fingerprint(original, variant_tasks))
+        result[f'variant_{index}'] = new_fleurinp
 
-    inpxmltree, includedtrees = reverse_xinclude(new_fleurtree, schema_dict, included_tags)
+    return result
+
+
+def _set_modified_files(new_fleurinp: FleurinpData, xmltree: etree._ElementTree, nmmp_lines: list[str] | None,
+                        schema_dict: InputSchemaDict, included_tags: set[str]) -> None:
+    """
+    Replace the ``inp.xml`` (and included files) and the ``n_mmp_mat`` file of the given
+    FleurinpData with the modified versions
+
+    :param new_fleurinp: FleurinpData to modify (not stored)
+    :param xmltree: the modified xmltree with all included files inserted
+    :param nmmp_lines: the modified n_mmp_mat file
+    :param schema_dict: schema dictionary corresponding to the xmltree
+    :param included_tags: set of the tags, which were included from other files
+    """
+    import tempfile
+    from masci_tools.util.schema_dict_util import reverse_xinclude
+
+    # To include object store storage this prob has to be done differently
+    inpxmltree, includedtrees = reverse_xinclude(xmltree, schema_dict, included_tags)
 
     new_fleurinp.del_file('inp.xml')
     with tempfile.TemporaryDirectory() as td:
@@ -521,14 +933,8 @@ def modify_fleurinpdata(original: FleurinpData, modifications: orm.Dict, **kwarg
             tree.write(file_path, encoding='utf-8', pretty_print=True)
             new_fleurinp.set_file(file_path, file_name)
 
-        if new_nmmplines is not None:
+        if nmmp_lines is not None:
             n_mmp_path = os.path.join(td, 'n_mmp_mat')
             with open(n_mmp_path, 'w', encoding='utf-8') as n_mmp_file:
-                n_mmp_file.write('\n'.join(new_nmmplines))
+                n_mmp_file.write('\n'.join(nmmp_lines))
             new_fleurinp.set_file(n_mmp_path, 'n_mmp_mat')
-
-    # default label and description
-    new_fleurinp.label = 'mod_fleurinp'
-    new_fleurinp.description = 'Fleurinpdata with modifications (see inputs of modify_fleurinpdata)'
-
-    return new_fleurinp
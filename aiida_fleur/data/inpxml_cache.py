@@ -0,0 +1,296 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+"""
+This module contains a per-process LRU cache for the parsed (and validated)
+``inp.xml`` trees of :py:class:`~aiida_fleur.data.fleurinp.FleurinpData` nodes.
+
+The entries are keyed by the UUID of the node and the hash of the content of its
+repository, so that a changed file never returns an outdated tree. Callers
+always receive a copy of the cached tree, which can be modified freely.
+
+In addition it contains a persistent cache on disk of the canonical ``inp.xml``
+contents, which passed the validation against the XML schema, shared between
+all processes (e.g. daemon workers) of the same AiiDA installation.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import pathlib
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+from lxml import etree
+from masci_tools.io.parsers.fleur_schema import InputSchemaDict
+
+
+class CachedInpxml(NamedTuple):
+    """
+    Entry of the :py:class:`InpxmlTreeCache`
+    """
+    xmltree: etree._ElementTree
+    schema_dict: InputSchemaDict
+    included_tags: set[str]
+    nbytes: int
+
+
+class InpxmlTreeCache:
+    """
+    LRU cache for parsed ``inp.xml`` trees bounded by the number of entries and the
+    (estimated) memory of the cached trees
+
+    :param max_entries: maximum number of cached trees
+    :param max_memory: maximum memory of the cached trees in bytes. The memory is
+                       estimated from the size of the serialized tree
+    """
+
+    def __init__(self, max_entries: int = 128, max_memory: int = 64 * 1024**2) -> None:
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.enabled = True
+        self._entries: OrderedDict[tuple[str, str, str], CachedInpxml] = OrderedDict()
+        self._memory = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(uuid: str, content_hash: str, **kwargs: Any) -> tuple[str, str, str]:
+        """
+        Create the key for a cache entry
+
+        :param uuid: UUID of the FleurinpData
+        :param content_hash: hash of the content of the repository of the FleurinpData
+        :param kwargs: keyword arguments passed on to the parser of the tree
+        """
+        return uuid, content_hash, repr(sorted(kwargs.items()))
+
+    def get(self, key: tuple[str, str, str]) -> tuple[etree._ElementTree, InputSchemaDict, set[str]] | None:
+        """
+        Get a copy of the cached tree for the given key
+
+        :param key: key created with :py:meth:`make_key()`
+
+        :returns: tuple of a copy of the xmltree, the schema dictionary and the included tags
+                  or None if the key is not in the cache
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry.xmltree), entry.schema_dict, set(entry.included_tags)
+
+    def put(self, key: tuple[str, str, str], xmltree: etree._ElementTree, schema_dict: InputSchemaDict,
+            included_tags: set[str]) -> None:
+        """
+        Add a copy of the given tree to the cache. Entries which were not used for
+        the longest time are removed, if the limits of the cache are exceeded
+
+        :param key: key created with :py:meth:`make_key()`
+        :param xmltree: the parsed (and validated) xmltree
+        :param schema_dict: schema dictionary corresponding to the xmltree
+        :param included_tags: set of the tags included from other files
+        """
+        if not self.enabled:
+            return
+
+        nbytes = len(etree.tostring(xmltree))
+        if nbytes > self.max_memory:
+            return
+
+        self._remove(key)
+        self._entries[key] = CachedInpxml(copy.deepcopy(xmltree), schema_dict, set(included_tags), nbytes)
+        self._memory += nbytes
+
+        while len(self._entries) > self.max_entries or self._memory > self.max_memory:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, uuid: str) -> None:
+        """
+        Remove all entries for the node with the given UUID
+
+        :param uuid: UUID of the FleurinpData
+        """
+        for key in [key for key in self._entries if key[0] == uuid]:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the statistics of the cache
+        """
+        self._entries.clear()
+        self._memory = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the statistics of the cache
+
+        :returns: dict with the number of ``hits``, ``misses``, ``entries`` and the estimated ``memory`` in bytes
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'memory': self._memory}
+
+    def _remove(self, key: tuple[str, str, str]) -> None:
+        """
+        Remove the entry with the given key if it exists
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._memory -= entry.nbytes
+
+
+#: Cache used by :py:meth:`~aiida_fleur.data.fleurinp.FleurinpData.load_inpxml()`
+INPXML_CACHE = InpxmlTreeCache()
+
+
+class InpxmlValidationCache:
+    """
+    Persistent cache of the ``inp.xml`` contents, which were validated successfully
+    against the XML schema.
+
+    Each validated content is recorded as an empty file named after the hash of the
+    canonical form of the tree (see :py:meth:`make_key()`) in the given folder. Since
+    the files are only created after a successful validation and never modified, the
+    cache can be shared between processes without locking.
+
+    :param folder: path to the folder of the cache. By default the folder
+                   ``aiida_fleur/validated_inpxml`` in the AiiDA configuration directory is used
+    """
+
+    def __init__(self, folder: str | pathlib.Path | None = None) -> None:
+        self._folder = pathlib.Path(folder) if folder is not None else None
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def folder(self) -> pathlib.Path:
+        """
+        Folder containing the entries of the cache
+        """
+        if self._folder is None:
+            try:
+                from aiida.manage.configuration.settings import AiiDAConfigDir
+                config_folder = AiiDAConfigDir.get()
+            except ImportError:
+                from aiida.manage.configuration.settings import AIIDA_CONFIG_FOLDER as config_folder
+            self._folder = pathlib.Path(config_folder) / 'aiida_fleur' / 'validated_inpxml'
+        return self._folder
+
+    @folder.setter
+    def folder(self, folder: str | pathlib.Path) -> None:
+        self._folder = pathlib.Path(folder)
+
+    @staticmethod
+    def make_key(xmltree: etree._ElementTree, schema_dict: InputSchemaDict) -> str:
+        """
+        Create the key for the given tree. The key is the sha256 hash of the canonical (C14N)
+        form of the tree without whitespace only text, so that it does not depend on the
+        formatting of the file, the order of the attributes or comments. The version of the schema
+        and of masci-tools are included, so that changes in the schema lead to a new validation
+
+        :param xmltree: the xmltree with all included files inserted
+        :param schema_dict: schema dictionary the tree is validated against
+
+        :returns: str of the key
+        """
+        import masci_tools
+
+        xmltree = etree.fromstring(etree.tostring(xmltree), etree.XMLParser(remove_blank_text=True,
+                                                                            remove_comments=True))
+        sha = hashlib.sha256(etree.tostring(xmltree, method='c14n'))
+        sha.update(f"{schema_dict['inp_version']}:{masci_tools.__version__}".encode())
+        return sha.hexdigest()
+
+    def is_validated(self, key: str) -> bool:
+        """
+        Check whether the content with the given key was already validated successfully
+
+        :param key: key created with :py:meth:`make_key()`
+        """
+        if not self.enabled:
+            return False
+        if (self.folder / key).is_file():
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, key: str) -> None:
+        """
+        Record a successful validation of the content with the given key.
+        Errors writing to the folder are ignored, i.e. the content will be validated again
+
+        :param key: key created with :py:meth:`make_key()`
+        """
+        if not self.enabled:
+            return
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            (self.folder / key).touch()
+        except OSError:
+            pass
+
+    def validate(self,
+                 xmltree: etree._ElementTree,
+                 schema_dict: InputSchemaDict,
+                 header: str = '',
+                 force: bool = False) -> None:
+        """
+        Validate the given tree against the schema, if the same content was not
+        validated successfully before
+
+        :param xmltree: the xmltree to validate
+        :param schema_dict: schema dictionary the tree is validated against
+        :param header: header for the error message passed on to :py:meth:`InputSchemaDict.validate()`
+        :param force: bool, if True the tree is always validated
+
+        :raises ValueError: if the validation fails
+        """
+        if not self.enabled:
+            schema_dict.validate(xmltree, header=header)
+            return
+
+        key = self.make_key(xmltree, schema_dict)
+        if not force and self.is_validated(key):
+            return
+        schema_dict.validate(xmltree, header=header)
+        self.add(key)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache folder and reset the statistics of the cache
+        """
+        if self.folder.is_dir():
+            for entry in self.folder.iterdir():
+                os.remove(entry)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the statistics of the cache
+
+        :returns: dict with the number of ``hits`` and ``misses`` in this process
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+#: Cache used by :py:meth:`~aiida_fleur.data.fleurinp.FleurinpData.load_inpxml()` and
+#: :py:meth:`~aiida_fleur.data.fleurinpmodifier.FleurinpModifier.validate()`
+VALIDATION_CACHE = InpxmlValidationCache()
@@ -16,17 +16,25 @@ Please implement file parsing routines that they can be executed from outside
 the parser. Makes testing and portability easier.
 """
 # TODO: warnings
+import os
 import re
 import json
+import hashlib
+from copy import deepcopy
 from lxml import etree
+import numpy as np
 
 from aiida.parsers import Parser
-from aiida.orm import Dict
+from aiida.orm import Dict, ArrayData, ProcessNode
+from aiida.common import AttributeDict
 from aiida.common.exceptions import NotExistent
 
 from masci_tools.io.parsers.fleur import outxml_parser
 from masci_tools.io.parsers.fleur_schema import InputSchemaDict
 
+from aiida_fleur.parsers.timing import ParserTimer
+from aiida_fleur.tools.io_routines import get_output_filename, open_output_file
+
 #Phrases in this list are used to detect out of
 #memory errors
 OUT_OF_MEMORY_PHRASES = [
@@ -35,6 +43,42 @@ OUT_OF_MEMORY_PHRASES = [
     'Allocation of array for communication failed'  #from io/eig66_mpi
 ]
 
+#Tasks for the outxml_parser extracting the per-iteration quantities
+#needed to judge the convergence of a calculation. The torques are not
+#part of the minimal mode in masci-tools so they are redefined here
+CONVERGENCE_PARSE_TASKS = {
+    'torques': {
+        '_minimal': True,
+        '_minimum_version': '0.35',
+        'torque_x': {
+            'parse_type': 'attrib',
+            'path_spec': {
+                'name': 'sigma_x',
+                'contains': 'noncollinearTorque'
+            }
+        },
+        'torque_y': {
+            'parse_type': 'attrib',
+            'path_spec': {
+                'name': 'sigma_y',
+                'contains': 'noncollinearTorque'
+            }
+        }
+    }
+}
+
+#Direct children of the <iteration> elements that are kept for all iterations
+#when reading the out.xml in the streaming mode. Everything else is only kept
+#for the last iteration
+STREAMING_KEEP_TAGS = {
+    'totalEnergy', 'densityConvergence', 'ldaUDensityMatrixConvergence', 'totalForcesOnRepresentativeAtoms',
+    'noncollinearTorque', 'occupationDistance', 'elementDistance'
+}
+
+#Minimal number of elements of an array to be moved into the output_arrays
+#in the slim output mode. Smaller lists stay in the output_parameters
+SLIM_OUTPUT_MIN_SIZE = 100
+
 
 class FleurParser(Parser):
     """
@@ -44,6 +88,11 @@ class FleurParser(Parser):
     Then it parses the out.xml file and returns a (simple) parameterData node
     with the results of the last iteration.
     Other files (DOS.x, bands.x, relax.xml, ...) are also parsed if they are retrieved.
+
+    With the ``slim_output`` parser option (off by default) large numeric arrays
+    are moved from the ``output_parameters`` into the ``output_arrays`` output, i.e.
+    these keys are missing in ``output_parameters`` and ``calc.res``. Consumers
+    should read the results with :py:func:`get_output_res`, which works for both modes.
     """
 
     _setting_key = 'parser_options'
@@ -73,6 +122,22 @@ class FleurParser(Parser):
                                 nodes to be stored by AiiDA
 
         """
+        timer = ParserTimer('fleur.fleurparser')
+        try:
+            return self._parse_retrieved(timer, temporary_folder=kwargs.get('retrieved_temporary_folder'))
+        finally:
+            timer.report(self.node)
+
+    def _parse_retrieved(self, timer, temporary_folder=None):
+        """
+        Checks and parses the files in the retrieved folder
+
+        :param timer: ParserTimer instance recording the time spent in the parsing stages
+        :param temporary_folder: path to the folder with the files of the ``retrieve_temporary_list``
+                                 (files only needed for parsing, see the ``retrieve_profile`` setting)
+
+        :returns: exit code if the parsing failed
+        """
 
         ####### init some variables ######
 
@@ -100,13 +165,30 @@ class FleurParser(Parser):
         list_of_files = output_folder.list_object_names()
         self.logger.info(f'File list: {list_of_files}')
 
+        # files only needed for parsing might be retrieved temporarily
+        temporary_files = []
+        if temporary_folder is not None and os.path.isdir(temporary_folder):
+            temporary_files = os.listdir(temporary_folder)
+            self.logger.info(f'Temporary file list: {temporary_files}')
+
+        def _open_parser_file(filename, mode='r'):
+            if filename in list_of_files:
+                return output_folder.open(filename, mode)
+            return open(os.path.join(temporary_folder, filename), mode, encoding='utf-8')
+
         # has output xml file, otherwise error
-        if FleurCalculation._OUTXML_FILE_NAME not in list_of_files:
+        # out.xml and relax.xml might be compressed (gzip_outputs setting)
+        if get_output_filename(list_of_files, FleurCalculation._OUTXML_FILE_NAME) is None:
             self.logger.error(f"XML out not found '{FleurCalculation._OUTXML_FILE_NAME}'")
             has_xml_outfile = False  #Return after the error lines were processed
         else:
             has_xml_outfile = True
 
+        if 'settings' in calc.inputs:
+            parser_options = calc.inputs.settings.get_dict().get(self._setting_key, {})
+        else:
+            parser_options = {}
+
         # check if all files expected are there for the calculation
         for file in should_retrieve:
             if file not in list_of_files:
@@ -114,12 +196,13 @@ class FleurParser(Parser):
                     f"Expected file '{file}' not found in retrieved folder, it was probably not created by fleur")
 
         # check if something was written to the error file
-        if FleurCalculation._ERROR_FILE_NAME in list_of_files:
+        if FleurCalculation._ERROR_FILE_NAME in list_of_files + temporary_files:
             errorfile = FleurCalculation._ERROR_FILE_NAME
             # read
             try:
-                with output_folder.open(errorfile, 'r') as efile:
+                with timer.stage('error_file'), _open_parser_file(errorfile, 'r') as efile:
                     error_file_lines = efile.read()  # Note: read(), not readlines()
+                    timer.add_file_size(errorfile, efile)
             except OSError:
                 self.logger.error(f'Failed to open error file: {errorfile}.')
                 return self.exit_codes.ERROR_OPENING_OUTPUTS
@@ -139,33 +222,29 @@ class FleurParser(Parser):
                     mpiprocs = self.node.get_attribute('resources').get('num_mpiprocs_per_machine', 1)
 
                     kb_used = 0.0
+                    mem_kb_avail = None
                     if has_xml_outfile:
-                        with output_folder.open(FleurCalculation._OUTXML_FILE_NAME,
-                                                'r') as out_file:  # lazy out.xml parsing
-                            outlines = out_file.read()
-                            try:
-                                line_avail = re.findall(r'<mem memoryPerNode="\d+', outlines)[0]
-                                mem_kb_avail = int(re.findall(r'\d+', line_avail)[0])
-                            except IndexError:
-                                mem_kb_avail = 1.0
-                                self.logger.info('Did not manage to find memory available info.')
-                            else:
-                                usage_json = FleurCalculation._USAGE_FILE_NAME
-                                if usage_json in list_of_files:
-                                    with output_folder.open(usage_json, 'r') as us_file:
-                                        usage = json.load(us_file)
-                                    kb_used = usage['data']['VmPeak']
-                                else:
-                                    try:
-                                        line_used = re.findall(r'used.+', error_file_lines)[0]
-                                        kb_used = int(re.findall(r'\d+', line_used)[2])
-                                    except IndexError:
-                                        self.logger.info('Did not manage to find memory usage info.')
-                    else:
-                        kb_used = 0.0
+                        with open_output_file(output_folder, FleurCalculation._OUTXML_FILE_NAME,
+                                              'r') as out_file:  # only the header is read
+                            mem_kb_avail = parse_memory_available(out_file)
+                    memory_info = {'memory_per_node_kb': mem_kb_avail, 'mpiprocs_per_machine': mpiprocs}
+                    if mem_kb_avail is None:
                         mem_kb_avail = 1.0
                         self.logger.info('Did not manage to find memory available info.')
-                        self.logger.info('Did not manage to find memory usage info.')
+                    else:
+                        usage_json = FleurCalculation._USAGE_FILE_NAME
+                        if usage_json in list_of_files + temporary_files:
+                            with _open_parser_file(usage_json, 'r') as us_file:
+                                usage = json.load(us_file)
+                            kb_used = usage['data']['VmPeak']
+                        else:
+                            try:
+                                line_used = re.findall(r'used.+', error_file_lines)[0]
+                                kb_used = int(re.findall(r'\d+', line_used)[2])
+                            except IndexError:
+                                self.logger.info('Did not manage to find memory usage info.')
+                    memory_info['memory_used_per_process_kb'] = kb_used
+                    memory_info['memory_usage_ratio'] = kb_used * mpiprocs / mem_kb_avail
 
                     # here we estimate how much walltime was available and consumed
                     try:
@@ -176,8 +255,12 @@ class FleurParser(Parser):
                     except KeyError:
                         pass
 
-                    if kb_used * mpiprocs / mem_kb_avail > 0.93 or \
+                    if memory_info['memory_usage_ratio'] > 0.93 or \
                         any(phrase in error_file_lines for phrase in OUT_OF_MEMORY_PHRASES):
+                        error_params = {'error_name': 'NOT_ENOUGH_MEMORY', **memory_info}
+                        error_params['description'] = ('This output node contains information '
+                                                       'about the memory available and used in the FLEUR calculation')
+                        self.out('error_params', Dict(error_params))
                         return self.exit_codes.ERROR_NOT_ENOUGH_MEMORY
                     if 'TIME LIMIT' in error_file_lines or 'time limit' in error_file_lines:
                         return self.exit_codes.ERROR_TIME_LIMIT
@@ -191,7 +274,7 @@ class FleurParser(Parser):
                         return self.exit_codes.ERROR_MISSING_DEPENDENCY.format(name='libxc')
                     if 'Overlapping MT-spheres during relaxation: ' in error_file_lines:
                         overlap_line = re.findall(r'\S+ +\S+ olap: +\S+', error_file_lines)[0].split()
-                        with output_folder.open('relax.xml', 'r') as rlx:
+                        with open_output_file(output_folder, FleurCalculation._RELAX_FILE_NAME, 'r') as rlx:
                             schema_dict = InputSchemaDict.fromVersion('0.34')
                             relax_dict = parse_relax_file(rlx, schema_dict)
                             it_number = len(relax_dict['energies']) + 1  # relax.xml was not updated
@@ -217,7 +300,7 @@ class FleurParser(Parser):
                     return self.exit_codes.ERROR_FLEUR_CALC_FAILED
 
         # if a relax.xml was retrieved
-        if FleurCalculation._RELAX_FILE_NAME in list_of_files:
+        if get_output_filename(list_of_files, FleurCalculation._RELAX_FILE_NAME) is not None:
             self.logger.info('relax.xml file found in retrieved folder')
             has_relax_file = True
 
@@ -227,14 +310,16 @@ class FleurParser(Parser):
             return self.exit_codes.ERROR_NO_OUTXML
         # open output file
 
-        with output_folder.open(FleurCalculation._OUTXML_FILE_NAME, 'rb') as outxmlfile_opened:
-            success = True
-            parser_info = {}
-            try:
-                out_dict = outxml_parser(outxmlfile_opened, parser_info_out=parser_info, ignore_validation=True)
-            except (ValueError, FileNotFoundError, KeyError) as exc:
-                self.logger.error(f'XML output parsing failed: {str(exc)}')
-                success = False
+        with timer.stage('outxml'), \
+             open_output_file(output_folder, FleurCalculation._OUTXML_FILE_NAME, 'rb') as outxmlfile_opened:
+            out_dict, parser_info, convergence_arrays = parse_outxml(outxmlfile_opened,
+                                                                     streaming=parser_options.get('streaming', False),
+                                                                     logger=self.logger)
+            timer.add_bytes_read(FleurCalculation._OUTXML_FILE_NAME, outxmlfile_opened.tell())
+        success = out_dict is not None
+        if convergence_arrays is not None:
+            self.out('output_convergence', convergence_arrays_to_node(convergence_arrays))
+        parser_info['parser_timing'] = timer.as_dict()
 
         # Call routines for output node creation
         if not success:
@@ -245,6 +330,19 @@ class FleurParser(Parser):
             return self.exit_codes.ERROR_XMLOUT_PARSING_FAILED
 
         if out_dict:
+            if parser_options.get('slim_output', False):
+                min_size = parser_options.get('slim_output_min_size', SLIM_OUTPUT_MIN_SIZE)
+                out_dict, output_arrays = split_output_arrays(out_dict, min_size=min_size)
+                if output_arrays is not None:
+                    self.out('output_arrays', output_arrays)
+            # the peak memory is used for fitting the performance model (tools/performance_model.py)
+            usage_json = FleurCalculation._USAGE_FILE_NAME
+            if usage_json in list_of_files + temporary_files:
+                try:
+                    with _open_parser_file(usage_json, 'r') as us_file:
+                        out_dict['memory_used_per_process_kb'] = json.load(us_file)['data']['VmPeak']
+                except (ValueError, KeyError):
+                    self.logger.info('Did not manage to find memory usage info.')
             outxml_params = Dict({**out_dict, **parser_info})
             link_name = self.get_linkname_outparams()
             self.out(link_name, outxml_params)
@@ -256,40 +354,523 @@ class FleurParser(Parser):
 
         if has_relax_file:
             relax_name = FleurCalculation._RELAX_FILE_NAME
+            old_relax_hash = None
             try:
                 fleurinp = calc.inputs.fleurinp
             except NotExistent:
-                old_relax_text = ''
+                pass
             else:
                 if relax_name in fleurinp.list_object_names():
-                    with fleurinp.open(relax_name, 'r') as rlx:
-                        old_relax_text = rlx.read()
-                else:
-                    old_relax_text = ''
+                    with fleurinp.open(relax_name, 'rb') as rlx:
+                        old_relax_hash, _ = hash_file_content(rlx)
 
             inp_version = outxml_params.get_dict().get('input_file_version', '0.34')
             schema_dict = InputSchemaDict.fromVersion(inp_version)
-            # dummy comparison between old and new relax
-            with output_folder.open(relax_name, 'rb') as rlx:
-                new_relax_text = rlx.read()
-                if new_relax_text != old_relax_text:
+            # compare the content hashes of the old and new relax.xml
+            with timer.stage('relax_xml'), open_output_file(output_folder, relax_name, 'rb') as rlx:
+                new_relax_hash, nbytes = hash_file_content(rlx)
+                timer.add_bytes_read(relax_name, nbytes)
+                if new_relax_hash != old_relax_hash:
+                    previous_relax = None
+                    if old_relax_hash is not None:
+                        previous_relax = get_previous_relax_parameters(calc, old_relax_hash)
                     try:
-                        relax_dict = parse_relax_file(rlx, schema_dict)
+                        relax_dict = parse_relax_file(rlx, schema_dict, previous_relax=previous_relax)
                     except etree.XMLSyntaxError:
                         return self.exit_codes.ERROR_RELAX_PARSING_FAILED
+                    relax_dict['relax_file_hash'] = new_relax_hash
                     self.out('relax_parameters', relax_dict)
+            outxml_params['parser_timing'] = timer.as_dict()  #The node is not stored yet
+
+        if 'steps' in calc.inputs:
+            with timer.stage('steps'):
+                return self._parse_steps(output_folder, calc.inputs.steps.get_list(), parser_options)
+
+    def _parse_steps(self, output_folder, steps, parser_options):
+        """
+        Parse the outputs of the follow-up steps (``steps`` input), which are
+        retrieved into a subfolder with the label of the step
+
+        :param output_folder: the retrieved folder
+        :param steps: list of the steps of the calculation
+        :param parser_options: dict with the options for the parser
+
+        :returns: exit code if one of the steps failed
+        """
+        FleurCalculation = self.node.process_class
+
+        for step in steps:
+            label = step['label']
+            if label not in output_folder.list_object_names():
+                self.logger.error(f'No outputs found for the step {label}')
+                return self.exit_codes.ERROR_FLEUR_STEP_FAILED.format(label=label)
+
+            step_files = output_folder.list_object_names(label)
+            if FleurCalculation._ERROR_FILE_NAME in step_files:
+                with output_folder.open(f'{label}/{FleurCalculation._ERROR_FILE_NAME}', 'r') as efile:
+                    error_file_lines = efile.read().replace('\x00', ' ')
+                if error_file_lines and 'Run finished successfully' not in error_file_lines:
+                    self.logger.warning(f'The following was written into std error of the step {label}:'
+                                        f' \n {error_file_lines}')
+                    return self.exit_codes.ERROR_FLEUR_STEP_FAILED.format(label=label)
+
+            if FleurCalculation._OUTXML_FILE_NAME not in step_files:
+                self.logger.error(f'XML out not found for the step {label}')
+                return self.exit_codes.ERROR_FLEUR_STEP_FAILED.format(label=label)
+
+            with output_folder.open(f'{label}/{FleurCalculation._OUTXML_FILE_NAME}', 'rb') as outxmlfile:
+                out_dict, parser_info, _ = parse_outxml(outxmlfile,
+                                                        streaming=parser_options.get('streaming', False),
+                                                        logger=self.logger)
+            if not out_dict:
+                self.logger.error(f'Parsing of XML output file of the step {label} was not successfull.')
+                self.out(f'steps.{label}', Dict(parser_info))
+                return self.exit_codes.ERROR_FLEUR_STEP_FAILED.format(label=label)
+            self.out(f'steps.{label}', Dict({**out_dict, **parser_info}))
+
+
+def parse_memory_available(outxmlfile, chunk_size=65536):
+    """
+    Scan the header of the out.xml for the available memory per node
+    (``<mem memoryPerNode=...>``). Only the part of the file before the
+    first iteration is read.
+
+    :param outxmlfile: opened out.xml file handle (in text mode)
+    :param chunk_size: number of characters read at once
+
+    :returns: memory available per node in kB or None if it was not found
+    """
+    buffer = ''
+    for chunk in iter(lambda: outxmlfile.read(chunk_size), ''):
+        buffer += chunk
+        match = re.search(r'<mem memoryPerNode="(\d+)\D', buffer)
+        if match:
+            return int(match.group(1))
+        if '<iteration' in buffer:
+            break
+        buffer = buffer[-64:]  #The tag could be split between two chunks
+    return None
+
+
+def parse_outxml(outxmlfile, streaming=False, logger=None):
+    """
+    Parse the out.xml file like it is done in the :py:class:`FleurParser`.
+    The file is read only once and the tree is reused for extracting
+    the output dictionary and the convergence arrays.
+
+    :param outxmlfile: opened out.xml file handle (in bytes mode)
+    :param streaming: bool, if True the file is read with :py:func:`load_outxml_streaming()`
+    :param logger: logger to use for reporting problems (optional)
+
+    :returns: tuple of the output dictionary (None if the parsing failed),
+              the parser info dictionary and the dictionary of convergence arrays
+              (None if not available, see :py:func:`extract_convergence_arrays()`)
+    """
+    parser_info = {}
+    # The tree is read only once and reused for all the following parsing steps
+    # If the file is broken it is passed on to masci-tools, which tries to repair it
+    try:
+        if streaming:
+            outxml_source = load_outxml_streaming(outxmlfile)
+        else:
+            outxml_source = etree.parse(outxmlfile, etree.XMLParser(attribute_defaults=True, encoding='utf-8'))
+    except etree.XMLSyntaxError:
+        outxmlfile.seek(0)
+        outxml_source = outxmlfile
+    try:
+        out_dict = outxml_parser(outxml_source, parser_info_out=parser_info, ignore_validation=True)
+    except (ValueError, FileNotFoundError, KeyError) as exc:
+        if logger is not None:
+            logger.error(f'XML output parsing failed: {str(exc)}')
+        return None, parser_info, None
+
+    convergence_arrays = None
+    if out_dict:
+        if not isinstance(outxml_source, etree._ElementTree):
+            outxmlfile.seek(0)
+        convergence_arrays = extract_convergence_arrays(outxml_source, logger=logger)
+
+    return out_dict, parser_info, convergence_arrays
+
+
+def load_outxml_streaming(outxmlfile):
+    """
+    Read the out.xml file incrementally. As soon as an iteration is read completely
+    the previous iteration is pruned to the elements needed for judging the convergence
+    (see ``STREAMING_KEEP_TAGS``). Only the last iteration is kept completely.
+    This way the peak memory scales with the size of a single iteration
+    and not with the size of the whole file.
+
+    :param outxmlfile: opened out.xml file handle (in bytes mode)
+
+    :returns: xmltree with the pruned iterations
+
+    :raises etree.XMLSyntaxError: if the file is broken
+    """
+    context = etree.iterparse(outxmlfile, events=('end',), tag='iteration', attribute_defaults=True)
+
+    previous = None
+    for _, iteration in context:
+        if previous is not None:
+            for child in list(previous):
+                if child.tag not in STREAMING_KEEP_TAGS and \
+                   next(child.iter(*STREAMING_KEEP_TAGS), None) is None:
+                    previous.remove(child)
+        previous = iteration
+
+    return context.root.getroottree()
+
+
+def parse_convergence_arrays(outxmlfile, logger=None):
+    """
+    This function extracts the quantities of all iterations in the out.xml
+    needed to judge the convergence of a calculation, i.e. total energies,
+    charge density distances, LDA+U density matrix distances, forces and torques.
+
+    :param outxmlfile: opened out.xml file handle (in bytes mode) or a parsed xmltree
+    :param logger: logger to use for reporting problems (optional)
+
+    :returns: ArrayData with the arrays (first dimension is the iteration)
+              or None if no iterations were found
+    """
+    arrays = extract_convergence_arrays(outxmlfile, logger=logger)
+    if arrays is None:
+        return None
+    return convergence_arrays_to_node(arrays)
+
+
+def convergence_arrays_to_node(arrays):
+    """
+    Create the ArrayData for the ``output_convergence`` output
 
+    :param arrays: dict of numpy arrays produced by :py:func:`extract_convergence_arrays()`
 
-def parse_relax_file(relax_file, schema_dict):
+    :returns: ArrayData with the given arrays
+    """
+    convergence = ArrayData()
+    for name, array in arrays.items():
+        convergence.set_array(name, array)
+    return convergence
+
+
+def extract_convergence_arrays(outxmlfile, logger=None):
+    """
+    Extracts the arrays stored in the ``output_convergence`` output (see :py:func:`parse_convergence_arrays()`)
+    as plain numpy arrays. Does not create any AiiDA nodes, so it can be used without a loaded profile.
+
+    :param outxmlfile: opened out.xml file handle (in bytes mode) or a parsed xmltree
+    :param logger: logger to use for reporting problems (optional)
+
+    :returns: dict of numpy arrays (first dimension is the iteration)
+              or None if no iterations were found
+    """
+    try:
+        output_dict = outxml_parser(outxmlfile,
+                                    minimal_mode=True,
+                                    list_return=True,
+                                    iteration_to_parse='all',
+                                    additional_tasks=CONVERGENCE_PARSE_TASKS,
+                                    overwrite=True,
+                                    parser_info_out={},
+                                    ignore_validation=True)
+    except (ValueError, FileNotFoundError, KeyError) as exc:
+        if logger is not None:
+            logger.warning(f'Extracting the convergence information failed: {str(exc)}')
+        return None
+
+    energies = output_dict.get('energy_hartree')
+    if not energies:
+        return None
+    n_iter = len(energies)
+
+    if 'overall_density_convergence' in output_dict:
+        distances = output_dict['overall_density_convergence']
+    else:
+        distances = output_dict.get('density_convergence')
+
+    #Values are given together with the shape of one iteration
+    arrays = {'energy_hartree': (energies, ()), 'density_convergence': (distances, ())}
+
+    nmmp_distances = output_dict.get('ldau_info', {}).get('density_matrix_distance')
+    if nmmp_distances is not None:
+        #The distance is only written from the iteration on, in which a density matrix
+        #from a previous iteration is available. The missing iterations at the start
+        #and missing spins are padded with NaN
+        nmmp_distances = [dist if isinstance(dist, list) else [dist] for dist in nmmp_distances]
+        width = max(len(dist) for dist in nmmp_distances)
+        nmmp_distances = [[None] * width] * (n_iter - len(nmmp_distances)) + nmmp_distances
+        arrays['nmmp_distance'] = ([dist + [None] * (width - len(dist)) for dist in nmmp_distances], (width,))
+
+    forces = output_dict.get('force_atoms')
+    if forces is not None:
+        arrays['force_atoms'] = ([[force for _, force in force_iter] for force_iter in forces], (-1, 3))
+
+    arrays['torque_x'] = (output_dict.get('torque_x'), (-1,))
+    arrays['torque_y'] = (output_dict.get('torque_y'), (-1,))
+
+    convergence = {}
+    for name, (values, shape) in arrays.items():
+        if values is None:
+            continue
+        try:
+            convergence[name] = np.array(values, dtype=float).reshape((n_iter, *shape))  #None is converted to NaN
+        except (ValueError, TypeError):
+            if logger is not None:
+                logger.warning(f'Could not convert {name} to an array with one entry per iteration')
+            continue
+
+    return convergence
+
+
+def split_output_arrays(out_dict, separator='__', min_size=SLIM_OUTPUT_MIN_SIZE):
+    """
+    Move the large array valued entries of the output dictionary of the out.xml parser
+    into an ArrayData node (slim output mode). Entries are moved if they can be
+    converted to a numeric numpy array with at least ``min_size`` elements, smaller
+    lists and lists of strings stay in the dictionary. Lists of pairs of an
+    atom index and a vector (e.g. ``force_atoms``) are split into an index array
+    (suffix ``_index``) and a value array. Nested dictionaries are handled recursively,
+    the keys are joined with the given separator for the array names.
+
+    Which entries were moved is stored in the ``slim_output_arrays`` entry of the
+    returned dictionary, so that the full dictionary can be restored with
+    :py:func:`restore_output_arrays()`.
+
+    :param out_dict: output dictionary of the out.xml parser
+    :param separator: str used to join the keys of nested dictionaries
+    :param min_size: minimal number of elements of the moved arrays
+
+    :returns: tuple of the output dictionary without the moved entries and
+              the ArrayData with the moved entries (None if nothing was moved)
+    """
+    arrays = {}
+    moved = {}
+
+    def _split(output, path):
+        slim = {}
+        for key, value in output.items():
+            name = separator.join((*path, key))
+            if isinstance(value, dict):
+                slim[key] = _split(value, (*path, key))
+                continue
+            if not isinstance(value, (list, tuple)) or len(value) == 0:
+                slim[key] = value
+                continue
+
+            is_indexed = all(
+                isinstance(entry, (list, tuple)) and len(entry) == 2 and isinstance(entry[0], int) and
+                isinstance(entry[1], (list, tuple)) for entry in value)
+            if is_indexed:
+                index = np.array([entry[0] for entry in value])
+                array = np.array([entry[1] for entry in value])
+                if array.dtype.kind in 'biuf' and array.size >= min_size:
+                    arrays[f'{name}_index'] = index
+                    arrays[name] = array
+                    moved['.'.join((*path, key))] = {'array': name, 'index': f'{name}_index'}
+                    continue
+            else:
+                try:
+                    array = np.array(value)
+                except ValueError:  #Inhomogeneous lists
+                    array = None
+                if array is not None and array.dtype.kind in 'biuf' and array.size >= min_size:
+                    arrays[name] = array
+                    moved['.'.join((*path, key))] = {'array': name}
+                    continue
+            slim[key] = value
+        return slim
+
+    slim_dict = _split(out_dict, ())
+    if not arrays:
+        return slim_dict, None
+
+    output_arrays = ArrayData()
+    for name, array in arrays.items():
+        output_arrays.set_array(name, array)
+    slim_dict['slim_output_arrays'] = moved
+    return slim_dict, output_arrays
+
+
+def restore_output_arrays(output_parameters, output_arrays):
+    """
+    Restore the full output dictionary from the outputs of the slim output mode
+    (see :py:func:`split_output_arrays()`)
+
+    Example of use::
+
+        out_dict = restore_output_arrays(calc.outputs.output_parameters, calc.outputs.output_arrays)
+
+    :param output_parameters: Dict node or dict of the ``output_parameters`` output
+    :param output_arrays: ArrayData of the ``output_arrays`` output (can be None
+                          if the slim mode was not used)
+
+    :returns: dict with the same content as in the default output mode
+    """
+    if isinstance(output_parameters, Dict):
+        output_parameters = output_parameters.get_dict()
+    out_dict = deepcopy(output_parameters)
+    moved = out_dict.pop('slim_output_arrays', {})
+    if not moved:
+        return out_dict
+    if output_arrays is None:
+        raise ValueError('The output_arrays are needed to restore the full output dictionary')
+
+    for key, entry in moved.items():
+        *path, last = key.split('.')
+        output = out_dict
+        for name in path:
+            output = output.setdefault(name, {})
+        value = output_arrays.get_array(entry['array']).tolist()
+        if 'index' in entry:
+            value = [[index, vector] for index, vector in zip(output_arrays.get_array(entry['index']).tolist(), value)]
+        output[last] = value
+
+    return out_dict
+
+
+def hash_file_content(file_handle, chunk_size=65536):
+    """
+    Compute the sha256 hash of the content of the given file. The file is read in chunks
+
+    :param file_handle: opened file handle (in binary mode)
+    :param chunk_size: number of bytes read at once
+
+    :returns: tuple of the hexdigest and the number of bytes read
+    """
+    file_handle.seek(0)
+    content_hash = hashlib.sha256()
+    nbytes = 0
+    for chunk in iter(lambda: file_handle.read(chunk_size), b''):
+        content_hash.update(chunk)
+        nbytes += len(chunk)
+    return content_hash.hexdigest(), nbytes
+
+
+def get_previous_relax_parameters(calc, relax_file_hash):
+    """
+    Get the parsed relax.xml of the parent calculation, if it corresponds to the
+    relax.xml given to the calculation
+
+    :param calc: CalcJobNode of the FleurCalculation
+    :param relax_file_hash: sha256 hash of the relax.xml given to the calculation
+
+    :returns: dictionary with the relaxation history or None if it is not available
+    """
+    if 'parent_folder' not in calc.inputs:
+        return None
+    parent_calc = calc.inputs.parent_folder.creator
+    if parent_calc is None or 'relax_parameters' not in parent_calc.outputs:
+        return None
+    previous_relax = parent_calc.outputs.relax_parameters.get_dict()
+    if previous_relax.get('relax_file_hash') != relax_file_hash:
+        return None
+    return previous_relax
+
+
+def parse_relax_file(relax_file, schema_dict, previous_relax=None):
     """
     This function parsers relax.xml output file and
     returns a Dict containing all the data given there.
+
+    If the already parsed relaxation history of the previous relax.xml is given,
+    only the steps appended since then are converted and merged with the history.
+    If the history does not match the beginning of the file, the whole file is parsed
+
+    :param relax_file: opened relax.xml file handle (in binary mode)
+    :param schema_dict: InputSchemaDict of the input file version
+    :param previous_relax: dictionary with the relaxation history of the previous relax.xml
+
+    :returns: Dict with the displacements, energies and posforces
     """
     from masci_tools.util.xml.xml_getters import get_relaxation_information
 
+    if previous_relax is not None:
+        out_dict = _parse_relax_file_incremental(relax_file, schema_dict, previous_relax)
+        if out_dict is not None:
+            return Dict(out_dict)
+
     relax_file.seek(0)
     tree = etree.parse(relax_file)
 
     out_dict = get_relaxation_information(tree, schema_dict)
 
     return Dict(out_dict)
+
+
+def _parse_relax_file_incremental(relax_file, schema_dict, previous_relax):
+    """
+    Parse only the relaxation steps of the relax.xml, which are not contained in
+    the given history. The skipped steps are checked against the energies in the history
+
+    :param relax_file: opened relax.xml file handle (in binary mode)
+    :param schema_dict: InputSchemaDict of the input file version
+    :param previous_relax: dictionary with the relaxation history of the previous relax.xml
+
+    :returns: merged dictionary with the relaxation information or None if the
+              history does not match the file
+    """
+    from masci_tools.util.xml.xml_getters import get_relaxation_information
+
+    previous_energies = previous_relax.get('energies', [])
+    previous_posforces = previous_relax.get('posforces', [])
+    if len(previous_energies) != len(previous_posforces):
+        return None
+
+    relax_file.seek(0)
+    nsteps = 0
+    skipped_steps = []
+    root = None
+    for _, elem in etree.iterparse(relax_file, events=('end',), tag='step'):
+        if nsteps < len(previous_energies):
+            try:
+                energy = float(elem.get('energy'))
+            except (TypeError, ValueError):
+                return None
+            if not np.isclose(energy, previous_energies[nsteps], rtol=0, atol=1e-8):
+                return None
+            elem.clear()
+            skipped_steps.append(elem)
+        root = elem.getroottree()
+        nsteps += 1
+
+    if nsteps < len(previous_energies):
+        return None
+    if root is None:
+        #No steps in the file
+        return None
+
+    for elem in skipped_steps:
+        elem.getparent().remove(elem)
+
+    new_steps = get_relaxation_information(root, schema_dict)
+
+    return {
+        'displacements': new_steps['displacements'],
+        'energies': list(previous_energies) + new_steps['energies'],
+        'posforces': list(previous_posforces) + new_steps['posforces'],
+    }
+
+
+def get_output_res(calc):
+    """
+    Return the output parameters of a FleurCalculation with attribute access, i.e. the
+    same as ``calc.res``. If the slim output mode was used, the entries moved to the
+    ``output_arrays`` are restored (see :py:func:`restore_output_arrays()`)
+
+    This function should be used instead of accessing the ``output_parameters`` directly,
+    since the moved entries are missing in the ``output_parameters`` in the slim output mode.
+
+    Example of use::
+
+        res = get_output_res(calc)
+        moments = res.magnetic_moments
+
+    :param calc: the FleurCalculation node, a node of a workflow exposing its outputs
+                 (e.g. ``FleurBaseWorkChain``) or a namespace of exposed outputs
+                 (e.g. ``scf_workchain.outputs.last_calc``)
+
+    :returns: AttributeDict with the full output parameters
+    """
+    outputs = calc.outputs if isinstance(calc, ProcessNode) else calc
+    output_arrays = outputs.output_arrays if 'output_arrays' in outputs else None
+    return AttributeDict(restore_output_arrays(outputs.output_parameters, output_arrays))
@@ -18,6 +18,7 @@ from aiida.common.exceptions import NotExistent, InputValidationError, Validatio
 
 from aiida_fleur.data.fleurinp import FleurinpData
 from aiida_fleur.calculation.fleurinputgen import FleurinputgenCalculation
+from aiida_fleur.parsers.timing import ParserTimer
 
 import pprint
 import re
@@ -50,6 +51,20 @@ class Fleur_inputgenParser(Parser):
 
         :return: a dictionary of AiiDA nodes to be stored in the database.
         """
+        timer = ParserTimer('fleur.fleurinpgenparser')
+        try:
+            return self._parse_retrieved(timer)
+        finally:
+            timer.report(self.node)
+
+    def _parse_retrieved(self, timer):
+        """
+        Checks the files in the retrieved folder and creates the FleurinpData
+
+        :param timer: ParserTimer instance recording the time spent in the parsing stages
+
+        :returns: exit code if the parsing failed
+        """
 
         try:
             output_folder = self.retrieved
@@ -64,8 +79,9 @@ class Fleur_inputgenParser(Parser):
         errorfile = FleurinputgenCalculation._ERROR_FILE_NAME
         if errorfile in list_of_files:
             try:
-                with output_folder.open(errorfile, 'r') as error_file:
+                with timer.stage('error_file'), output_folder.open(errorfile, 'r') as error_file:
                     error_file_lines = error_file.read()
+                    timer.add_file_size(errorfile, error_file)
             except OSError:
                 self.logger.error(f'Failed to open error file: {errorfile}.')
                 return self.exit_codes.ERROR_OPENING_OUTPUTS
@@ -85,8 +101,9 @@ class Fleur_inputgenParser(Parser):
         shellout_file = FleurinputgenCalculation._SHELLOUT_FILE_NAME
         if FleurinputgenCalculation._SHELLOUT_FILE_NAME in list_of_files:
             try:
-                with output_folder.open(shellout_file, 'r') as shellout:
+                with timer.stage('shellout_file'), output_folder.open(shellout_file, 'r') as shellout:
                     shellout_file_lines = shellout.read()
+                    timer.add_file_size(shellout_file, shellout)
             except OSError:
                 self.logger.error(f'Failed to open error file: {shellout_file}.')
                 return self.exit_codes.ERROR_OPENING_OUTPUTS
@@ -115,8 +132,9 @@ class Fleur_inputgenParser(Parser):
                 return self.exit_codes.ERROR_MISSING_RETRIEVED_FILES
 
         try:
-            fleurinp = FleurinpData(files=[])
-            fleurinp.set_file(inpxml_file, node=output_folder)
+            with timer.stage('fleurinp'):
+                fleurinp = FleurinpData(files=[])
+                fleurinp.set_file(inpxml_file, node=output_folder)
         except InputValidationError as ex:
             self.logger.error(f'FleurinpData initialization failed: {str(ex)}')
             if fleurinp.parser_info == {}:
@@ -128,5 +146,9 @@ class Fleur_inputgenParser(Parser):
             self.logger.error(f'FleurinpData validation failed: {str(ex)}')
             return self.exit_codes.ERROR_FLEURINPDATA_NOT_VALID
 
+        with output_folder.open(inpxml_file, 'rb') as inpxml:
+            timer.add_file_size(inpxml_file, inpxml)
+        fleurinp.parser_info = {**fleurinp.parser_info, 'parser_timing': timer.as_dict()}
+
         self.logger.info('FleurinpData initialized')
         self.out('fleurinp', fleurinp)
@@ -0,0 +1,209 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+"""
+This module contains utility to measure the time spent in the different stages
+of the parsers, the number of bytes read and the increase of the peak memory.
+
+Each parser run produces a dictionary, which is stored in the ``parser_timing``
+entry of the parser info. In addition it is emitted on the logger
+``aiida_fleur.parsers.performance`` (the dictionary is available as the
+``parser_timing`` attribute of the log record) and passed to all functions
+registered with :py:func:`register_parser_timing_hook`. The numbers of all
+parser runs in the current process are accumulated and can be retrieved with
+:py:func:`get_parser_timing_summary`.
+"""
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+try:
+    import resource
+except ImportError:  #Not available on Windows
+    resource = None
+
+PERFORMANCE_LOGGER = logging.getLogger('aiida_fleur.parsers.performance')
+
+_TIMING_HOOKS = []
+_TIMING_SUMMARY = {}
+
+
+def _peak_memory_kb():
+    """
+    Return the peak resident memory of the current process in kB
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  #Given in bytes on macOS
+        peak = peak // 1024
+    return peak
+
+
+class ParserTimer:
+    """
+    Collects the wall time of the stages of a parser run, the number of
+    bytes read from each file and the increase of the peak memory of the process.
+
+    Usage::
+
+        timer = ParserTimer('fleur.fleurparser')
+        with timer.stage('outxml'):
+            ...
+        timer.add_bytes_read('out.xml', 1024)
+        parser_info['parser_timing'] = timer.as_dict()
+        timer.report(node)
+
+    .. note::
+        The peak memory delta is the increase of the maximum resident set size of
+        the process. If the peak before the parser run was not exceeded it is 0.
+    """
+
+    def __init__(self, parser_name):
+        self.parser_name = parser_name
+        self.walltimes = {}
+        self.bytes_read = {}
+        self._start = time.perf_counter()
+        self._peak_memory_start = _peak_memory_kb()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Context manager measuring the wall time of the enclosed block.
+        If the same stage is entered multiple times the times are added up
+
+        :param name: name of the stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.walltimes[name] = self.walltimes.get(name, 0.0) + time.perf_counter() - start
+
+    def add_bytes_read(self, filename, nbytes):
+        """
+        Record the number of bytes read from the given file
+
+        :param filename: name of the file
+        :param nbytes: number of bytes
+        """
+        self.bytes_read[filename] = self.bytes_read.get(filename, 0) + nbytes
+
+    def add_file_size(self, filename, handle):
+        """
+        Record the size of an open file in bytes as read. The size is determined
+        by seeking to the end of the (underlying binary) handle, nothing is read
+
+        :param filename: name of the file
+        :param handle: open file handle in text or binary mode
+        """
+        binary_handle = getattr(handle, 'buffer', handle)
+        binary_handle.seek(0, os.SEEK_END)
+        self.add_bytes_read(filename, binary_handle.tell())
+
+    def as_dict(self):
+        """
+        Return the collected numbers as a dictionary
+
+        :returns: dict with the keys ``walltime_stages``, ``walltime_total``,
+                  ``bytes_read`` and ``peak_memory_delta_kb``
+        """
+        return {
+            'walltime_stages': dict(self.walltimes),
+            'walltime_total': time.perf_counter() - self._start,
+            'walltime_units': 's',
+            'bytes_read': dict(self.bytes_read),
+            'peak_memory_delta_kb': max(_peak_memory_kb() - self._peak_memory_start, 0)
+        }
+
+    def report(self, node=None, timing=None):
+        """
+        Export the collected numbers to the performance logger, the registered hooks
+        and the accumulated summary of this process
+
+        :param node: the node of the calculation that was parsed (optional)
+        :param timing: dictionary produced by :py:meth:`as_dict()`, if not given it is created
+        """
+        if timing is None:
+            timing = self.as_dict()
+
+        summary = _TIMING_SUMMARY.setdefault(self.parser_name, {
+            'count': 0,
+            'walltime_total': 0.0,
+            'walltime_stages': {},
+            'bytes_read': 0,
+            'peak_memory_delta_kb_max': 0
+        })
+        summary['count'] += 1
+        summary['walltime_total'] += timing['walltime_total']
+        for stage, walltime in timing['walltime_stages'].items():
+            summary['walltime_stages'][stage] = summary['walltime_stages'].get(stage, 0.0) + walltime
+        summary['bytes_read'] += sum(timing['bytes_read'].values())
+        summary['peak_memory_delta_kb_max'] = max(summary['peak_memory_delta_kb_max'], timing['peak_memory_delta_kb'])
+
+        pk = node.pk if node is not None else None
+        PERFORMANCE_LOGGER.info('%s (pk: %s): %.3f s, %d bytes read, peak memory +%d kB',
+                                self.parser_name,
+                                pk,
+                                timing['walltime_total'],
+                                sum(timing['bytes_read'].values()),
+                                timing['peak_memory_delta_kb'],
+                                extra={
+                                    'parser_timing': timing,
+                                    'parser_name': self.parser_name,
+                                    'pk': pk
+                                })
+
+        for hook in _TIMING_HOOKS:
+            try:
+                hook(self.parser_name, node, timing)
+            except Exception as exc:  #pylint: disable=broad-except
+                PERFORMANCE_LOGGER.warning(f'Parser timing hook {hook!r} failed: {exc}')
+
+
+def register_parser_timing_hook(hook):
+    """
+    Register a function, which is called after each parser run with the
+    parser name, the calculation node and the timing dictionary
+
+    :param hook: callable with the signature ``hook(parser_name, node, timing)``
+    """
+    if hook not in _TIMING_HOOKS:
+        _TIMING_HOOKS.append(hook)
+
+
+def unregister_parser_timing_hook(hook):
+    """
+    Remove a function registered with :py:func:`register_parser_timing_hook`
+
+    :param hook: the registered callable
+    """
+    if hook in _TIMING_HOOKS:
+        _TIMING_HOOKS.remove(hook)
+
+
+def get_parser_timing_summary():
+    """
+    Return the accumulated timings of all parser runs in the current process
+
+    :returns: dict with one entry for each parser containing the number of runs,
+              the summed wall times (total and per stage), the summed bytes read
+              and the maximum increase of the peak memory
+    """
+    from copy import deepcopy
+    return deepcopy(_TIMING_SUMMARY)
+
+
+def reset_parser_timing_summary():
+    """
+    Clear the accumulated timings of the current process
+    """
+    _TIMING_SUMMARY.clear()
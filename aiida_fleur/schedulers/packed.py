@@ -0,0 +1,348 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+"""
+This module contains schedulers packing many small calculations into one job
+of the underlying scheduler.
+
+Each calculation is submitted as usual and stays its own CalcJob with its own
+retrieved folder and parser run. Instead of submitting the job script directly,
+it is added to a queue on the remote machine. Job scripts with the same code
+and resources are collected in the same queue. When enough job scripts are
+queued, or no new one was added for some time, the queued job scripts are run
+one after the other in a single job (pack) of the underlying scheduler.
+The state of each calculation is tracked with a file in its working directory.
+All changes of the queues are done while holding a lock (``flock``) on a file
+in the pack root, since several AiiDA daemon workers may submit and poll at the same time.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+
+from aiida.common.escaping import escape_for_bash
+from aiida.common.exceptions import FeatureNotAvailable
+from aiida.schedulers.datastructures import JobInfo, JobState, JobTemplate
+from aiida.schedulers.plugins.direct import DirectScheduler
+from aiida.schedulers.plugins.slurm import SlurmScheduler
+from aiida.schedulers.scheduler import SchedulerError
+
+PACK_STATUS_FILE = '.fleur_pack_status'
+PACK_ID_FILE = '.fleur_pack_id'
+#Lock file in the pack root serializing the changes of the queues
+PACK_LOCK_FILE = '.lock'
+
+#Runs the job scripts listed in the file given as first argument one after the other
+#Job scripts, which were killed before they were started, are skipped
+PACK_RUNNER = f"""packid=$SLURM_JOB_ID
+[ -n "$packid" ] || packid=$$
+while read -r script; do
+    wd=$(dirname "$script")
+    [ "$(cat "$wd/{PACK_STATUS_FILE}" 2>/dev/null)" = QUEUED ] || continue
+    out=$(sed -n 's/^#FLEUR_PACK_OUTPUT=//p' "$script")
+    err=$(sed -n 's/^#FLEUR_PACK_ERROR=//p' "$script")
+    (cd "$wd" && exec bash "$script" > "${{out:-/dev/null}}" 2> "${{err:-/dev/null}}") < /dev/null &
+    echo "RUNNING $packid $!" > "$wd/{PACK_STATUS_FILE}"
+    wait $!
+    echo DONE > "$wd/{PACK_STATUS_FILE}"
+done < "$1"
+"""
+
+
+class PackedSchedulerMixin:
+    """
+    Mixin for a scheduler class, which packs the submitted job scripts into
+    larger jobs of the scheduler. The job id of each calculation is the path
+    to its working directory
+
+    The following class attributes control the packing:
+
+        * ``_pack_root``: folder on the remote machine containing the queues (shell variables are expanded)
+        * ``_pack_size``: maximum number of job scripts run in one job
+        * ``_pack_max_walltime``: maximum of the summed walltimes (in seconds) of the job scripts run
+          in one job. A job script exceeding this limit on its own is run in a job of its own.
+          No limit is applied if it is None
+        * ``_pack_wait``: seconds without new job scripts in a queue, after which the queue is launched,
+          even if it contains less than ``_pack_size`` job scripts
+        * ``_pack_lock_timeout``: seconds to wait for the lock of the queues. If the lock cannot be
+          acquired, no queues are launched in this update
+    """
+    _pack_root = '$HOME/.aiida_fleur_packs'
+    _pack_size = 8
+    _pack_max_walltime: int | None = 86400
+    _pack_wait = 120
+    _pack_lock_timeout = 60
+
+    _features = {
+        'can_query_by_user': False,
+    }
+
+    @staticmethod
+    def get_pack_key(job_tmpl: JobTemplate) -> str:
+        """
+        Returns the key of the queue for the given job template. Job scripts
+        are only packed together if they use the same codes and resources
+
+        :param job_tmpl: JobTemplate of the calculation
+
+        :returns: str of the key
+        """
+        key_data = {
+            'resources': dict(job_tmpl.job_resource) if job_tmpl.job_resource else {},
+            'queue_name': job_tmpl.queue_name,
+            'account': job_tmpl.account,
+            'qos': job_tmpl.qos,
+            'codes': [list(code_info.cmdline_params[:1]) for code_info in job_tmpl.codes_info or []],
+        }
+        key_string = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(key_string.encode('utf-8')).hexdigest()[:16]
+
+    def _get_submit_script_header(self, job_tmpl: JobTemplate) -> str:
+        """
+        Adds the information needed for the packing as comments in front of the
+        header of the underlying scheduler
+        """
+        lines = [
+            f'#FLEUR_PACK_KEY={self.get_pack_key(job_tmpl)}',
+            f'#FLEUR_PACK_WALLTIME={int(job_tmpl.max_wallclock_seconds or 0)}',
+        ]
+        if job_tmpl.sched_output_path:
+            lines.append(f'#FLEUR_PACK_OUTPUT={job_tmpl.sched_output_path}')
+        if job_tmpl.sched_error_path and not job_tmpl.sched_join_files:
+            lines.append(f'#FLEUR_PACK_ERROR={job_tmpl.sched_error_path}')
+
+        return '\n'.join(lines + [super()._get_submit_script_header(job_tmpl)])
+
+    def _get_submit_command(self, submit_script: str) -> str:
+        """
+        Returns the command adding the job script to the queue for its key.
+        Executed in the working directory of the calculation
+
+        :param submit_script: the path of the submit script relative to the working directory (already escaped)
+        """
+        return (f"key=$(sed -n 's/^#FLEUR_PACK_KEY=//p' {submit_script}) && "
+                f'mkdir -p "{self._pack_root}/$key" && echo QUEUED > {PACK_STATUS_FILE} && '
+                f'{{ flock -w {self._pack_lock_timeout} 9 && '
+                f'echo "$PWD"/{submit_script} >> "{self._pack_root}/$key/queue"; }} '
+                f'9> "{self._pack_root}/{PACK_LOCK_FILE}" && echo "$PWD"')
+
+    def _parse_submit_output(self, retval: int, stdout: str, stderr: str) -> str:
+        """
+        Parse the output of the submit command
+
+        :returns: the job id, i.e. the working directory of the calculation
+        """
+        if retval != 0 or not stdout.strip():
+            self.logger.error(f'Error in _parse_submit_output: retval={retval}; stdout={stdout}; stderr={stderr}')
+            raise SchedulerError(f'Error during submission, retval={retval}\nstdout={stdout}\nstderr={stderr}')
+        return stdout.strip()
+
+    def _get_pack_runner_header(self) -> list[str]:
+        """
+        Returns the shell commands writing the header of the script ``$runner``
+        running the job scripts in the file ``$part``. ``$first`` is the first of these job scripts
+        """
+        return []
+
+    def _get_pack_launch_command(self) -> str:
+        """
+        Returns the shell command launching the script ``$runner`` for the job scripts in
+        the file ``$part``. Has to set the variable ``packid`` to the id of the launched job
+        """
+        raise NotImplementedError
+
+    def _get_pack_alive_command(self) -> str:
+        """
+        Returns the shell command checking whether the job with the id ``$1`` is still active
+        """
+        raise NotImplementedError
+
+    def _get_task_kill_command(self) -> str:
+        """
+        Returns the shell command stopping a running job script. ``$2`` is the id of the
+        pack and ``$3`` the process id of the job script
+        """
+        raise NotImplementedError
+
+    def _get_joblist_command(self, jobs: list[str] | None = None, user: str | None = None) -> str:
+        """
+        Returns the command launching the queues, which are ready, and printing
+        the state of the given jobs
+
+        :param jobs: list of the job ids (working directories)
+        :param user: not supported, the jobs have to be given explicitly
+        """
+        if user is not None:
+            raise FeatureNotAvailable('Packed schedulers can only query the state of given jobs')
+
+        max_walltime = self._pack_max_walltime or 0
+        lines = [
+            f'pack_alive() {{ {self._get_pack_alive_command()}; }}',
+            f'root="{self._pack_root}"',
+            'now=$(date +%s)',
+            'mkdir -p "$root"',
+            f'exec 9> "$root/{PACK_LOCK_FILE}"',
+            f'if flock -w {self._pack_lock_timeout} 9; then',
+            'for queue in "$root"/*/queue; do',
+            '[ -f "$queue" ] || continue',
+            'count=$(wc -l < "$queue")',
+            f'waited=$([ $((now - $(stat -c %Y "$queue"))) -ge {self._pack_wait} ] && echo 1)',
+            f'if [ "$count" -lt {self._pack_size} ] && [ -z "$waited" ]; then continue; fi',
+            'pack="$(dirname "$queue")/pack_${now}_$$"',
+            'mv "$queue" "$pack" || continue',
+            '#Split into parts with at most _pack_size job scripts and _pack_max_walltime seconds',
+            'while read -r script; do',
+            "walltime=$(sed -n 's/^#FLEUR_PACK_WALLTIME=//p' \"$script\")",
+            'echo "${walltime:-0} $script"',
+            f'done < "$pack" | awk -v size={self._pack_size} -v max={max_walltime} -v prefix="$pack.part_" \'{{',
+            'if (n >= size || (n > 0 && max > 0 && total + $1 > max)) { part++; n = 0; total = 0 }',
+            'n++; total += $1; sub(/^[0-9]+ /, ""); print > sprintf("%s%04d", prefix, part) }\'',
+            '#Incomplete packs are only launched after the waiting time',
+            'last=$(ls "$pack".part_* | tail -n 1)',
+            f'if [ -z "$waited" ] && [ "$(wc -l < "$last")" -lt {self._pack_size} ]; then',
+            'cat "$last" >> "$queue" && rm "$last"',
+            'fi',
+            'for part in "$pack".part_*; do',
+            '[ -f "$part" ] || continue',
+            'first=$(head -n 1 "$part")',
+            'runner="$part.sh"',
+            "echo '#!/bin/bash' > \"$runner\"",
+            *self._get_pack_runner_header(),
+            'cat >> "$runner" << \'FLEUR_PACK_RUNNER\'',
+            PACK_RUNNER.rstrip('\n'),
+            'FLEUR_PACK_RUNNER',
+            'packid=""',
+            '#The launched job must not inherit the lock',
+            f'{{ {self._get_pack_launch_command()}; }} 9>&-',
+            'if [ -n "$packid" ]; then',
+            f'while read -r script; do echo "$packid" > "$(dirname "$script")/{PACK_ID_FILE}"; done < "$part"',
+            'fi',
+            'done',
+            'done',
+            'fi',
+            'exec 9>&-',
+        ]
+
+        for job_id in jobs or []:
+            workdir = escape_for_bash(job_id)
+            lines.extend([
+                f'status=$(cat {workdir}/{PACK_STATUS_FILE} 2>/dev/null)',
+                f'packid=$(cat {workdir}/{PACK_ID_FILE} 2>/dev/null)',
+                'case "$status" in',
+                f'QUEUED) if [ -z "$packid" ] || pack_alive "$packid"; then echo {workdir} QUEUED; fi ;;',
+                f'RUNNING*) set -- $status; if pack_alive "$2"; then echo {workdir} RUNNING; fi ;;',
+                'esac',
+            ])
+        return '\n'.join(lines)
+
+    def _parse_joblist_output(self, retval: int, stdout: str, stderr: str) -> list[JobInfo]:
+        """
+        Parse the output of the joblist command. Only active jobs are listed
+
+        :returns: list of JobInfo objects
+        """
+        if retval != 0:
+            raise SchedulerError(f'Error during the packed joblist command, retval={retval}\n'
+                                 f'stdout={stdout}\nstderr={stderr}')
+        if stderr.strip():
+            self.logger.warning(f'There was some text in stderr of the packed joblist command: {stderr}')
+
+        job_list = []
+        for line in stdout.splitlines():
+            if not line.strip():
+                continue
+            job_id, state = line.rsplit(maxsplit=1)
+            job = JobInfo()
+            job.job_id = job_id
+            job.job_state = JobState.RUNNING if state == 'RUNNING' else JobState.QUEUED
+            job_list.append(job)
+        return job_list
+
+    def _get_kill_command(self, jobid: str) -> str:
+        """
+        Returns the command killing the given job. Queued job scripts are
+        marked to be skipped, running job scripts are stopped. The command fails
+        if the job script cannot be stopped or is not known
+
+        :param jobid: job id (working directory) of the calculation
+        """
+        status_file = f'{escape_for_bash(jobid)}/{PACK_STATUS_FILE}'
+        return '\n'.join([
+            f'status=$(cat {status_file} 2>/dev/null)',
+            'case "$status" in',
+            f'QUEUED) echo KILLED > {status_file} ;;',
+            f'RUNNING*) set -- $status; {self._get_task_kill_command()} && echo KILLED > {status_file} ;;',
+            'DONE|KILLED) ;;',
+            f'*) echo "No packed job found in {escape_for_bash(jobid)}" >&2; false ;;',
+            'esac',
+        ])
+
+    def _parse_kill_output(self, retval: int, stdout: str, stderr: str) -> bool:
+        """
+        Parse the output of the kill command
+
+        :raises SchedulerError: if the job could not be killed, since the job script
+                                might still be running in its pack
+
+        :returns: True if the job was killed
+        """
+        if retval != 0:
+            self.logger.error(f'Error in _parse_kill_output: retval={retval}; stdout={stdout}; stderr={stderr}')
+            raise SchedulerError(f'Error during the kill of the packed job, retval={retval}\n'
+                                 f'stdout={stdout}\nstderr={stderr}')
+        return True
+
+    def _get_detailed_job_info_command(self, job_id: str) -> str:
+        """
+        The packed jobs are not known to the underlying scheduler
+        """
+        raise FeatureNotAvailable('Cannot get detailed job info for packed jobs')
+
+
+class PackedDirectScheduler(PackedSchedulerMixin, DirectScheduler):
+    """
+    Packs the calculations into jobs run directly as background processes.
+    Stand-in for a real scheduler, e.g. for testing the packing locally
+    """
+
+    def _get_pack_launch_command(self) -> str:
+        return 'nohup bash "$runner" "$part" > "$part.log" 2>&1 < /dev/null & packid=$!'
+
+    def _get_pack_alive_command(self) -> str:
+        return 'kill -0 "$1" 2>/dev/null'
+
+    def _get_task_kill_command(self) -> str:
+        return '{ pkill -TERM -P "$3"; kill "$3"; }'
+
+
+class PackedSlurmScheduler(PackedSchedulerMixin, SlurmScheduler):
+    """
+    Packs the calculations into SLURM jobs. The job scripts in a pack are run one
+    after the other in the same allocation, the requested walltime of the pack is
+    the sum of the walltimes of the calculations (at most ``_pack_max_walltime``)
+    """
+
+    def _get_pack_runner_header(self) -> list[str]:
+        return [
+            "sed -n '/^#SBATCH/p' \"$first\" | grep -v -e '--time' -e '--output' -e '--error' -e '--job-name' "
+            '>> "$runner"',
+            "total=$(cat \"$part\" | xargs sed -n 's/^#FLEUR_PACK_WALLTIME=//p' | awk '{s+=$1} END {print s+0}')",
+            'if [ "$total" -gt 0 ]; then echo "#SBATCH --time=$((total / 60 + 1))" >> "$runner"; fi',
+            'echo "#SBATCH --job-name=fleur_pack" >> "$runner"',
+        ]
+
+    def _get_pack_launch_command(self) -> str:
+        return 'packid=$(sbatch --parsable --output="$part.log" "$runner" "$part" | cut -d";" -f1)'
+
+    def _get_pack_alive_command(self) -> str:
+        return 'squeue -h -j "$1" -o %i 2>/dev/null | grep -q .'
+
+    def _get_task_kill_command(self) -> str:
+        return '{ echo "Running packed calculations can only be stopped with the whole pack (scancel $2)" >&2; false; }'
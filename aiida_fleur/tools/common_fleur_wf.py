@@ -293,140 +293,190 @@ def determine_favorable_reaction(reaction_list, workchain_dict):
     return energy_sorted_reactions
 
 
-def performance_extract_calcs(calcs):
+# entries of the output parameters projected by performance_extract_calcs
+# The calculations without the first three entries are skipped
+# Only scalar entries are used, which are never moved to the output_arrays
+# in the slim output mode of the FleurParser
+_PERFORMANCE_OUTPUT_KEYS = {
+    'fermi_energy': 'fermi_energy',
+    'bandgap': 'bandgap',
+    'energy': 'energy',
+    'force_largest': 'force_largest',
+    'n_symmetries': 'number_of_symmetries',
+    'n_spin_components': 'number_of_spin_components',
+    'n_kpoints': 'number_of_kpoints',
+    'n_iterations': 'number_of_iterations',
+    'n_iterations_total': 'number_of_iterations_total',
+    'density_convergence': 'density_convergence',
+    'overall_density_convergence': 'overall_density_convergence',
+    'walltime_sec': 'walltime',
+    'n_atoms': 'number_of_atoms',
+    'kmax': 'kmax',
+}
+_PERFORMANCE_REQUIRED_KEYS = ('fermi_energy', 'bandgap', 'energy')
+
+
+def performance_extract_calcs(calcs=None, chunk_size=10000, as_dataframe=False):
     """
     Extracts some runtime and system data from given fleur calculations
 
-    :params calcs: list of calculation nodes/pks/or uuids. Fleur calc specific
+    All data is projected in one database query per chunk (no nodes are loaded) and
+    the cost columns are computed on the whole arrays.
+    Calculations without ``fermi_energy``, ``bandgap`` or ``energy`` in the
+    output parameters are skipped.
 
-    :returns data_dict: dictionary, dictionary of arrays with the same length,
-                        from with a panda frame can be created.
+    :params calcs: list of calculation nodes/pks/or uuids. Fleur calc specific.
+                   If not given all FleurCalculations are used
+    :param chunk_size: number of calculations queried at once
+    :param as_dataframe: if True a pandas DataFrame is returned
 
-    Note: Is not the fastest for many calculations > 1000.
+    :returns data_dict: dictionary of numpy arrays with the same length (ordered by pk),
+                        or the corresponding pandas DataFrame
     """
-    data_dict = {
-        'n_symmetries': [],
-        'n_spin_components': [],
-        'n_kpoints': [],
-        'n_iterations': [],
-        'walltime_sec': [],
-        'walltime_sec_per_it': [],
-        'n_iterations_total': [],
-        'density_distance': [],
-        'computer': [],
-        'n_atoms': [],
-        'kmax': [],
-        'cost': [],
-        'costkonstant': [],
-        'walltime_sec_cor': [],
-        'total_cost': [],
-        'fermi_energy': [],
-        'bandgap': [],
-        'energy': [],
-        'force_largest': [],
-        'ncores': [],
-        'pk': [],
-        'uuid': [],
-        'serial': [],
-        'resources': []
-    }
-    count = 0
-    for calc in calcs:
-        if not isinstance(calc, Node):
-            calc = load_node(calc)
-        count = count + 1
-        pk = calc.pk
-        print((count, pk))
-        res = calc.res
-        res_keys = list(res)
-        try:
-            efermi = res.fermi_energy
-        except AttributeError:
-            print(f'skipping {pk}, {calc.uuid}')
-            efermi = -10000
-            continue  # we skip these entries
-        try:
-            gap = res.bandgap
-        except AttributeError:
-            gap = -10000
-            print(f'skipping 2 {pk}, {calc.uuid}')
-            continue
-
-        try:
-            energy = res.energy
-        except AttributeError:
-            energy = 0.0
-            print(f'skipping 3 {pk}, {calc.uuid}')
-            continue
+    import numpy as np
 
-        data_dict['bandgap'].append(gap)
-        data_dict['fermi_energy'].append(efermi)
-        data_dict['energy'].append(energy)
-        data_dict['force_largest'].append(res.force_largest)
-        data_dict['pk'].append(pk)
-        data_dict['uuid'].append(calc.uuid)
-        data_dict['n_symmetries'].append(res.number_of_symmetries)
-        nspins = res.number_of_spin_components
-        data_dict['n_spin_components'].append(nspins)
-        nkpt = res.number_of_kpoints
-        data_dict['n_kpoints'].append(nkpt)
-        niter = res.number_of_iterations
-        data_dict['n_iterations'].append(niter)
-        data_dict['n_iterations_total'].append(res.number_of_iterations_total)
-
-        if 'overall_density_convergence' not in res_keys:
-            data_dict['density_distance'].append(res.density_convergence)
-        else:  # magnetic, old
-            data_dict['density_distance'].append(res.overall_density_convergence)
-
-        walltime = res.walltime
-        if walltime <= 0:
-            # date was not considert yet, we assume one day...
-            walltime_new = walltime + 86400
-        else:
-            walltime_new = walltime
-
-        walltime_periteration = walltime_new / niter
-
-        data_dict['walltime_sec'].append(walltime)
-        data_dict['walltime_sec_cor'].append(walltime_new)
-        data_dict['walltime_sec_per_it'].append(walltime_periteration)
-        cname = calc.computer.label
-        data_dict['computer'].append(cname)
-        natom = res.number_of_atoms
-        data_dict['n_atoms'].append(natom)
-
-        # fleurinp = calc.get_inputs_dict()['fleurinpdata']
-        # kmax = fleurinp.inp_dict['calculationSetup']['cutoffs']['Kmax']
-        kmax = res.kmax
-        data_dict['kmax'].append(kmax)
-
-        cost = calc_time_cost_function(natom, nkpt, kmax, nspins)
-        total_cost = cost * niter
-
-        serial = not calc.attributes['withmpi']
-        # codename = calc.get_code().label
-        # code_col.append(codename)
-
-        # if 'mpi' in codename:
-        #    serial = False
-        # else:
-        #    serial = True
-        data_dict['serial'].append(serial)
-
-        resources = calc.attributes['resources']
-        mpi_proc = get_mpi_proc(resources)
-
-        c_ratio = cost_ratio(cost, walltime_new, mpi_proc)
-        data_dict['resources'].append(resources)
-        data_dict['cost'].append(cost)
-        data_dict['costkonstant'].append(c_ratio)
-        data_dict['total_cost'].append(total_cost)
-        data_dict['ncores'].append(mpi_proc)
+    chunks = list(iter_performance_data(calcs=calcs, chunk_size=chunk_size))
+    if chunks:
+        data_dict = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    else:
+        data_dict = _performance_data_from_rows([])
 
+    if as_dataframe:
+        import pandas as pd
+        return pd.DataFrame(data_dict)
     return data_dict
 
 
+def iter_performance_data(calcs=None, chunk_size=10000):
+    """
+    Generator version of :py:func:`performance_extract_calcs()` for large databases.
+    The data is yielded in chunks, so the memory needed does not depend on the number of calculations
+
+    :params calcs: list of calculation nodes/pks/or uuids. If not given all FleurCalculations are used
+    :param chunk_size: number of calculations queried at once
+
+    :returns: generator of dictionaries of numpy arrays (see :py:func:`performance_extract_calcs()`)
+    """
+    from aiida.orm import QueryBuilder, CalcJobNode, Computer, Dict
+
+    def _build_query(filters):
+        qb = QueryBuilder()
+        qb.append(CalcJobNode,
+                  filters=filters,
+                  project=['id', 'uuid', 'attributes.resources', 'attributes.withmpi'],
+                  tag='calc')
+        qb.append(Computer, with_node='calc', project=['label'])
+        qb.append(Dict,
+                  with_incoming='calc',
+                  edge_filters={'label': 'output_parameters'},
+                  project=[f'attributes.{key}' for key in _PERFORMANCE_OUTPUT_KEYS.values()])
+        qb.order_by({'calc': {'id': 'asc'}})
+        return qb
+
+    if calcs is None:
+        qb = _build_query({'process_type': 'aiida.calculations:fleur.fleur'})
+        rows = []
+        for row in qb.iterall(batch_size=chunk_size):
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield _performance_data_from_rows(rows)
+                rows = []
+        if rows:
+            yield _performance_data_from_rows(rows)
+        return
+
+    calcs = list(calcs)
+    for index in range(0, len(calcs), chunk_size):
+        pks = []
+        uuids = []
+        for calc in calcs[index:index + chunk_size]:
+            if isinstance(calc, Node):
+                pks.append(calc.pk)
+            elif isinstance(calc, str):
+                uuids.append(calc)
+            else:
+                pks.append(calc)
+        filters = {'or': []}
+        if pks:
+            filters['or'].append({'id': {'in': pks}})
+        if uuids:
+            filters['or'].append({'uuid': {'in': uuids}})
+        yield _performance_data_from_rows(_build_query(filters).all())
+
+
+def _performance_data_from_rows(rows):
+    """
+    Convert the rows of the query in :py:func:`iter_performance_data()` to numpy arrays
+    and compute the cost columns
+
+    :param rows: list of the projected rows
+
+    :returns: dict of numpy arrays
+    """
+    import numpy as np
+
+    keys = ['pk', 'uuid', 'resources', 'withmpi', 'computer', *_PERFORMANCE_OUTPUT_KEYS]
+    required = [keys.index(key) for key in _PERFORMANCE_REQUIRED_KEYS]
+    rows = [row for row in rows if all(row[index] is not None for index in required)]
+    columns = {key: list(values) for key, values in zip(keys, zip(*rows))} if rows else {key: [] for key in keys}
+
+    def _array(values, dtype=float):
+        if dtype is int and any(value is None for value in values):
+            dtype = float  # missing entries are represented as nan
+        if dtype is object:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            return array
+        return np.array(values, dtype=dtype)
+
+    density_distance = [
+        overall if overall is not None else distance
+        for overall, distance in zip(columns['overall_density_convergence'], columns['density_convergence'])
+    ]
+    try:
+        density_distance = _array(density_distance)
+    except (TypeError, ValueError):  # list of distances for magnetic calculations
+        density_distance = _array(density_distance, object)
+    natom = _array(columns['n_atoms'], int)
+    nkpt = _array(columns['n_kpoints'], int)
+    nspins = _array(columns['n_spin_components'], int)
+    niter = _array(columns['n_iterations'], int)
+    kmax = _array(columns['kmax'])
+    walltime = _array(columns['walltime_sec'])
+    # date was not considert yet, we assume one day...
+    walltime_cor = np.where(walltime <= 0, walltime + 86400, walltime)
+    ncores = _array([get_mpi_proc(resources or {}) for resources in columns['resources']], int)
+
+    cost = calc_time_cost_function(natom, nkpt, kmax, nspins)
+
+    return {
+        'n_symmetries': _array(columns['n_symmetries'], int),
+        'n_spin_components': nspins,
+        'n_kpoints': nkpt,
+        'n_iterations': niter,
+        'walltime_sec': walltime,
+        'walltime_sec_per_it': walltime_cor / niter,
+        'n_iterations_total': _array(columns['n_iterations_total'], int),
+        'density_distance': density_distance,
+        'computer': _array(columns['computer'], object),
+        'n_atoms': natom,
+        'kmax': kmax,
+        'cost': cost,
+        'costkonstant': cost_ratio(cost, walltime_cor, ncores),
+        'walltime_sec_cor': walltime_cor,
+        'total_cost': cost * niter,
+        'fermi_energy': _array(columns['fermi_energy']),
+        'bandgap': _array(columns['bandgap']),
+        'energy': _array(columns['energy']),
+        'force_largest': _array(columns['force_largest']),
+        'ncores': ncores,
+        'pk': _array(columns['pk'], int),
+        'uuid': _array(columns['uuid'], object),
+        'serial': np.logical_not(_array(columns['withmpi'], bool)),
+        'resources': _array(columns['resources'], object)
+    }
+
+
 def get_mpi_proc(resources):
     """Determine number of total processes from given resource dict"""
     nmachines = resources.get('num_machines', 0)
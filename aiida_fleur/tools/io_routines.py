@@ -12,7 +12,64 @@
 Here we collect IO routines and their utility, for writting certain things to files, or post process files.
 For example collection of data or database evaluations, for other people.
 """
+import gzip
 import warnings
+from contextlib import contextmanager
+
+#Suffix of the files compressed on the remote machine before retrieval
+COMPRESSED_SUFFIX = '.gz'
+
+
+def get_output_filename(folder, filename):
+    """
+    Return the name of the given file in the folder. If only the compressed
+    version (``filename.gz``) is present, this name is returned
+
+    :param folder: node with a repository (e.g. the retrieved FolderData) or list of filenames
+    :param filename: name of the uncompressed file
+
+    :returns: name of the file in the folder or None if it is not present
+    """
+    if isinstance(folder, (list, tuple, set)):
+        list_of_files = folder
+    else:
+        list_of_files = folder.list_object_names()
+
+    if filename in list_of_files:
+        return filename
+    if f'{filename}{COMPRESSED_SUFFIX}' in list_of_files:
+        return f'{filename}{COMPRESSED_SUFFIX}'
+    return None
+
+
+@contextmanager
+def open_output_file(folder, filename, mode='rb'):
+    """
+    Open a file in the repository of the given node. If the file was compressed
+    before retrieval (``filename.gz``) it is decompressed transparently
+
+    :param folder: node with a repository (e.g. the retrieved FolderData)
+    :param filename: name of the uncompressed file
+    :param mode: mode to open the file with ('r' or 'rb')
+
+    :raises FileNotFoundError: if neither the file nor the compressed file exist
+    """
+    name = get_output_filename(folder, filename)
+    if name is None:
+        raise FileNotFoundError(f'{filename} not found in {folder}')
+
+    if not name.endswith(COMPRESSED_SUFFIX):
+        with folder.open(name, mode) as handle:
+            yield handle
+        return
+
+    with folder.open(name, 'rb') as handle:
+        if 'b' in mode:
+            with gzip.GzipFile(fileobj=handle, mode='rb') as gzip_handle:
+                yield gzip_handle
+        else:
+            with gzip.open(handle, mode='rt', encoding='utf-8') as gzip_handle:
+                yield gzip_handle
 
 
 def write_results_to_file(headerstring, data, destination='./outputfile', seperator='  ', transpose=True):
@@ -104,9 +161,10 @@ def compress_fleuroutxml(outxmlfilepath, dest_file_path=None, delete_eig=True, i
     Compresses a fleur out.xml file by deleting certain things
     like eigenvalues tags and/or iterations from it
 
-    :param outxmlfilepath: (absolut) file path
+    :param outxmlfilepath: (absolut) file path, gzipped files (``.xml.gz``) are read transparently
     :type outxmlfilepath: str
     :param dest_file_path: (absolut) for the compressed file to be saved, if no desitination file path is given the file is overriden in place (default)!
+                           If the path ends with ``.gz`` the file is written gzipped
     :type dest_file_path: str, optional
     :param delete_eig:  if eigenvalues are deleted from file default is True
     :type delete_eig: boolean, optional
@@ -161,7 +219,8 @@ def compress_fleuroutxml(outxmlfilepath, dest_file_path=None, delete_eig=True, i
     if dest_file_path is None:
         dest_file_path = outxmlfilepath  # overwrite file
     if xmltree.getroot() is not None:  #otherwise write fails
-        xmltree.write(dest_file_path, encoding='utf-8', pretty_print=True)
+        compression = 9 if str(dest_file_path).endswith(COMPRESSED_SUFFIX) else 0
+        xmltree.write(dest_file_path, encoding='utf-8', pretty_print=True, compression=compression)
     else:
         raise ValueError('xmltree has no root..., I cannot write to proper xml')
 
@@ -0,0 +1,224 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+"""
+Simple performance model for FLEUR calculations. The cost constants are fitted
+per code and computer from finished calculations and are used to predict the
+walltime and memory of new calculations before they are submitted.
+
+The model is stored as a :class:`~aiida.orm.Dict` node with the label
+``fleur_performance_model`` and has the following form::
+
+    {
+        'fleur@computer': {
+            'time_constant': ...,  # core seconds per unit of cost and iteration
+            'memory_constant': ...,  # kB of all MPI processes together per unit of memory cost
+            'n_calcs': ...,  # number of calculations used for the time fit
+            'n_memory_calcs': ...  # number of calculations used for the memory fit
+        }
+    }
+"""
+import math
+import statistics
+
+from aiida import orm
+from aiida.common.exceptions import NotExistent
+
+from aiida_fleur.tools.common_fleur_wf import calc_time_cost_function
+from aiida_fleur.parsers.fleur import get_output_res
+
+PERFORMANCE_MODEL_LABEL = 'fleur_performance_model'
+
+
+def get_performance_key(code_label, computer_label):
+    """
+    Key of the entry in the performance model for the given code and computer
+
+    :param code_label: str, label of the code
+    :param computer_label: str, label of the computer
+
+    :returns: str of the form ``code@computer``
+    """
+    return f'{code_label}@{computer_label}'
+
+
+def calc_memory_cost_function(natom, kmax, nspins=1):
+    """
+    Estimates the total memory needed by all MPI processes for a system. The size of the
+    Hamiltonian and overlap matrices scales with the square of the number of basis functions
+    """
+    return (natom * kmax**3)**2 * nspins
+
+
+def get_total_mpiprocs(resources):
+    """
+    Determine the total number of MPI processes from the given resource dict
+    """
+    n_procs = resources.get('tot_num_mpiprocs')
+    if not n_procs:
+        n_procs = resources.get('num_machines', 1) * resources.get('num_mpiprocs_per_machine', 1)
+    return n_procs
+
+
+def get_total_cores(resources):
+    """
+    Determine the total number of cores (MPI processes times OMP threads) from the given resource dict
+    """
+    return get_total_mpiprocs(resources) * resources.get('num_cores_per_mpiproc', 1)
+
+
+def extract_performance_sample(calc):
+    """
+    Extract the quantities needed for fitting the performance model from a finished
+    FleurCalculation
+
+    :param calc: calculation node, pk or uuid
+
+    :returns: dict with the sample or None if the calculation cannot be used
+    """
+    if not isinstance(calc, orm.Node):
+        calc = orm.load_node(calc)
+
+    if not calc.is_finished_ok:
+        return None
+    try:
+        res = get_output_res(calc)
+    except NotExistent:
+        return None
+
+    try:
+        natom = res['number_of_atoms']
+        kmax = res['kmax']
+        nkpt = res['number_of_kpoints']
+        nspins = res['number_of_spin_components']
+        niter = res['number_of_iterations']
+        walltime = res['walltime']
+    except KeyError:
+        return None
+
+    if walltime <= 0:
+        # date was not considered yet, we assume one day...
+        walltime = walltime + 86400
+    if not niter or walltime <= 0:
+        return None
+
+    try:
+        code_label = calc.inputs.code.label
+    except NotExistent:
+        code_label = ''
+
+    resources = calc.base.attributes.get('resources', {})
+
+    #The peak memory is measured per process, the model describes the memory of all processes
+    memory = res.get('memory_used_per_process_kb')
+    if memory:
+        memory = memory * get_total_mpiprocs(resources)
+
+    return {
+        'key': get_performance_key(code_label, calc.computer.label),
+        'time_cost': calc_time_cost_function(natom, nkpt, kmax, nspins),
+        'memory_cost': calc_memory_cost_function(natom, kmax, nspins),
+        'walltime_sec_per_it': walltime / niter,
+        'ncores': get_total_cores(resources),
+        'memory_kb': memory
+    }
+
+
+def fit_performance_model(calcs, previous_model=None):
+    """
+    Fit the cost constants of the performance model per code and computer
+    from the given calculations. The median over the calculations is used, so that
+    a few outliers do not spoil the model
+
+    :param calcs: list of FleurCalculation nodes, pks or uuids
+    :param previous_model: optional performance model, the entries for codes/computers
+                           not contained in ``calcs`` are kept
+
+    :returns: unstored :class:`~aiida.orm.Dict` with the performance model
+    """
+    samples = {}
+    for calc in calcs:
+        sample = extract_performance_sample(calc)
+        if sample is not None:
+            samples.setdefault(sample['key'], []).append(sample)
+
+    model = {}
+    if previous_model is not None:
+        model = previous_model.get_dict()
+
+    for key, key_samples in samples.items():
+        time_constants = [
+            sample['walltime_sec_per_it'] * sample['ncores'] / sample['time_cost'] for sample in key_samples
+        ]
+        memory_constants = [
+            sample['memory_kb'] / sample['memory_cost'] for sample in key_samples if sample['memory_kb']
+        ]
+        model[key] = {
+            'time_constant': statistics.median(time_constants),
+            'memory_constant': statistics.median(memory_constants) if memory_constants else None,
+            'n_calcs': len(time_constants),
+            'n_memory_calcs': len(memory_constants)
+        }
+
+    model_node = orm.Dict(model)
+    model_node.label = PERFORMANCE_MODEL_LABEL
+    model_node.description = 'Cost constants of FLEUR calculations per code and computer'
+    return model_node
+
+
+def load_performance_model():
+    """
+    Load the most recently created (stored) performance model
+
+    :returns: :class:`~aiida.orm.Dict` with the performance model or None if there is none
+    """
+    qb = orm.QueryBuilder()
+    qb.append(orm.Dict, filters={'label': PERFORMANCE_MODEL_LABEL}, tag='model')
+    qb.order_by({'model': {'ctime': 'desc'}})
+    qb.limit(1)
+    result = qb.all(flat=True)
+    if not result:
+        return None
+    return result[0]
+
+
+def predict_performance(model, fleurinp, code_label, computer_label):
+    """
+    Predict the cost of a FLEUR calculation for the given input. The size of the
+    system is taken from the :py:attr:`~aiida_fleur.data.fleurinp.FleurinpData.inp_summary`
+    attribute, so the ``inp.xml`` file is not parsed again
+
+    :param model: :class:`~aiida.orm.Dict` with the performance model
+    :param fleurinp: FleurinpData with the input of the calculation
+    :param code_label: str, label of the code
+    :param computer_label: str, label of the computer
+
+    :returns: dict with the total number of core seconds needed for ``itmax`` iterations (``core_seconds``)
+              and the memory needed by all MPI processes together in kB (``memory_kb``, None if not available)
+              or None if the model contains no entry for this code and computer or the summary
+              of the input is not complete
+    """
+    entry = model.get_dict().get(get_performance_key(code_label, computer_label))
+    if entry is None:
+        return None
+
+    summary = fleurinp.inp_summary
+    natom, kmax, nspins, nkpt = (summary.get(key) for key in ('natoms', 'kmax', 'jspins', 'nkpts'))
+    itmax = fleurinp.inp_dict.get('calculationSetup', {}).get('scfLoop', {}).get('itmax')
+    if any(value is None for value in (natom, kmax, nspins, nkpt, itmax)):
+        return None
+
+    prediction = {
+        'core_seconds': entry['time_constant'] * calc_time_cost_function(natom, nkpt, kmax, nspins) * itmax,
+        'memory_kb': None
+    }
+    if entry.get('memory_constant'):
+        prediction['memory_kb'] = math.ceil(entry['memory_constant'] * calc_memory_cost_function(natom, kmax, nspins))
+    return prediction
@@ -0,0 +1,364 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+"""
+This module contains functions to re-parse the ``out.xml`` files of many
+existing ``FleurCalculation`` nodes in parallel, e.g. after an update of masci-tools.
+
+The parsing itself is done with :py:func:`~aiida_fleur.parsers.fleur.parse_outxml()`
+in a pool of worker processes, so the results are the same as for the
+:py:class:`~aiida_fleur.parsers.fleur.FleurParser`. The workers do not access
+the database, the main process copies the files of each chunk into a temporary
+folder (without reading them into memory), from where the workers read them.
+
+The results can be written to a JSON lines file (one calculation per line) and/or
+stored as new ``Dict`` and ``ArrayData`` nodes, which are referenced in the extra
+``reparsed_outputs`` of the calculation. In both cases already successfully re-parsed
+calculations are skipped if the process is started again, failed ones are retried.
+
+.. note::
+
+    The results file is a row based JSON lines file and not a columnar format (e.g. parquet),
+    since it is appended after each chunk, so an interrupted run can be resumed, and no additional
+    dependency is needed. :py:func:`load_reparse_results()` converts it into a pandas DataFrame,
+    which can be written to a columnar format if needed.
+
+.. warning::
+
+    The stored nodes have no provenance links, they are not created by a process. The calculation
+    references them only in the extra ``reparsed_outputs`` and the new nodes contain the UUID
+    of the calculation in the extra ``reparsed_from``. The outputs of the calculation are not changed.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from aiida import orm
+
+from aiida_fleur.tools.io_routines import get_output_filename, open_output_file
+
+REPARSE_EXTRA_KEY = 'reparsed_outputs'
+OUTXML_FILE_NAME = 'out.xml'
+
+
+def _reparse_outxml(args):
+    """
+    Worker function parsing the content of one out.xml file
+
+    :param args: tuple of the pk of the calculation, the path to the file
+                 and the streaming option of the parser
+
+    :returns: tuple of the pk, the output dictionary (None if the parsing failed),
+              the parser info, the convergence arrays and an error message
+    """
+    from aiida_fleur.parsers.fleur import parse_outxml
+
+    pk, path, streaming = args
+    try:
+        with open(path, 'rb') as outxmlfile:
+            out_dict, parser_info, arrays = parse_outxml(outxmlfile, streaming=streaming)
+    except Exception as exc:  #pylint: disable=broad-except
+        return pk, None, {}, None, f'{exc.__class__.__name__}: {exc}'
+
+    error = None
+    if out_dict is None:
+        error = 'XML output parsing failed'
+    return pk, out_dict, parser_info, arrays, error
+
+
+def _read_finished_pks(output_file):
+    """
+    Read the pks of the calculations already successfully re-parsed in the given JSON lines file.
+    Failed calculations and incomplete lines (e.g. from an interrupted run) are ignored,
+    so these calculations are parsed again
+
+    :param output_file: path to the file
+
+    :returns: set of pks
+    """
+    finished = set()
+    if not Path(output_file).exists():
+        return finished
+    with open(output_file, encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+                if record['success']:
+                    finished.add(record['pk'])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return finished
+
+
+def get_reparse_candidates(filters=None, group=None, force=False, output_file=None, store=False):
+    """
+    Query the ``FleurCalculation`` nodes with a retrieved folder, which should be re-parsed
+
+    :param filters: additional QueryBuilder filters for the calculation nodes
+    :param group: only consider calculations in this group (Group node or label)
+    :param force: bool, if True calculations are not skipped if they were already re-parsed
+    :param output_file: path to the JSON lines file the results are written to. Calculations
+                        successfully re-parsed in this file are skipped
+    :param store: bool, if True calculations which were already re-parsed with the
+                  current masci-tools version and stored are skipped
+
+    :returns: tuple of a list of tuples (pk, uuid, pk of retrieved folder, parser options of the calculation)
+              and the number of skipped calculations
+    """
+    import masci_tools
+
+    calc_filters = {'process_type': 'aiida.calculations:fleur.fleur'}
+    if filters is not None:
+        calc_filters.update(filters)
+
+    if isinstance(group, str):
+        group = orm.load_group(group)
+
+    def _calc_query():
+        qb = orm.QueryBuilder()
+        if group is not None:
+            qb.append(orm.Group, filters={'id': group.pk}, tag='group')
+            qb.append(orm.CalcJobNode, filters=calc_filters, with_group='group', tag='calc', project=['id'])
+        else:
+            qb.append(orm.CalcJobNode, filters=calc_filters, tag='calc', project=['id'])
+        return qb
+
+    qb = _calc_query()
+    qb.add_projection('calc', ['id', 'uuid', f'extras.{REPARSE_EXTRA_KEY}'])
+    qb.append(orm.FolderData, with_incoming='calc', edge_filters={'label': 'retrieved'}, project=['id'])
+    qb.order_by({'calc': {'id': 'asc'}})
+
+    settings_qb = _calc_query()
+    settings_qb.append(orm.Dict,
+                       with_outgoing='calc',
+                       edge_filters={'label': 'settings'},
+                       project=['attributes.parser_options'])
+    parser_options = dict(settings_qb.iterall())
+
+    finished = set()
+    if not force and output_file is not None:
+        finished = _read_finished_pks(output_file)
+
+    candidates = []
+    skipped = 0
+    for pk, uuid, reparsed, retrieved_pk in qb.iterall():
+        if not force:
+            if store and reparsed and reparsed.get('masci_tools_version') == masci_tools.__version__:
+                skipped += 1
+                continue
+            if output_file is not None and pk in finished:
+                skipped += 1
+                continue
+        candidates.append((pk, uuid, retrieved_pk, parser_options.get(pk) or {}))
+
+    return candidates, skipped
+
+
+def _store_reparsed_outputs(pk, out_dict, parser_info, arrays, result_group=None):
+    """
+    Store the results of the re-parsing as new nodes and reference them in the extras of the calculation.
+    The nodes are not linked to the calculation
+
+    :param pk: pk of the calculation
+    :param out_dict: output dictionary
+    :param parser_info: parser info dictionary
+    :param arrays: dict of convergence arrays or None
+    :param result_group: Group the new nodes are added to (optional)
+    """
+    import masci_tools
+    from aiida_fleur.parsers.fleur import convergence_arrays_to_node
+
+    calc = orm.load_node(pk)
+    node_extras = {'reparsed_from': calc.uuid, 'masci_tools_version': masci_tools.__version__}
+    reparsed = {'masci_tools_version': masci_tools.__version__}
+
+    output_parameters = orm.Dict({**out_dict, **parser_info})
+    output_parameters.base.extras.set_many(node_extras)
+    output_parameters.store()
+    reparsed['output_parameters'] = output_parameters.uuid
+    new_nodes = [output_parameters]
+
+    if arrays is not None:
+        convergence = convergence_arrays_to_node(arrays)
+        convergence.base.extras.set_many(node_extras)
+        convergence.store()
+        reparsed['output_convergence'] = convergence.uuid
+        new_nodes.append(convergence)
+
+    if result_group is not None:
+        result_group.add_nodes(new_nodes)
+    calc.base.extras.set(REPARSE_EXTRA_KEY, reparsed)
+
+
+def reparse_calculations(filters=None,
+                         group=None,
+                         num_processes=None,
+                         output_file=None,
+                         store=False,
+                         result_group=None,
+                         streaming=None,
+                         force=False,
+                         chunk_size=None,
+                         progress_callback=None):
+    """
+    Re-parse the ``out.xml`` files of existing ``FleurCalculation`` nodes in parallel.
+
+    Example of use::
+
+        summary = reparse_calculations(filters={'attributes.exit_status': 0},
+                                       group='my_calcs',
+                                       num_processes=8,
+                                       output_file='reparsed.jsonl')
+
+    :param filters: additional QueryBuilder filters for the calculation nodes
+    :param group: only consider calculations in this group (Group node or label)
+    :param num_processes: number of worker processes, defaults to the number of CPUs.
+                          If 1 everything is done in the current process
+    :param output_file: path to a JSON lines file the results are appended to
+    :param store: bool, if True the results are stored as new Dict/ArrayData nodes
+                  (without provenance links, see the module documentation)
+    :param result_group: Group (node or label) the stored nodes are added to,
+                         the group is created if it does not exist
+    :param streaming: bool, if True the out.xml files are read in the streaming mode of the parser.
+                      By default the ``parser_options`` of each calculation are used, as in the
+                      :py:class:`~aiida_fleur.parsers.fleur.FleurParser`
+    :param force: bool, if True calculations which were already re-parsed are parsed again
+    :param chunk_size: number of files copied to the temporary folder and parsed at once,
+                       defaults to 4 times the number of processes
+    :param progress_callback: function called after each chunk with the summary dictionary
+
+    :returns: dictionary with the number of ``total``, ``skipped``, ``parsed`` and ``failed`` calculations
+              and a dictionary ``errors`` with the error messages for the pks of the failed calculations
+    """
+    if output_file is None and not store:
+        raise ValueError('Either an output_file has to be given or store has to be True')
+
+    if isinstance(result_group, str):
+        result_group, _ = orm.Group.collection.get_or_create(label=result_group)
+
+    if num_processes is None:
+        num_processes = multiprocessing.cpu_count()
+    if chunk_size is None:
+        chunk_size = 4 * num_processes
+
+    candidates, skipped = get_reparse_candidates(filters=filters,
+                                                 group=group,
+                                                 force=force,
+                                                 output_file=output_file,
+                                                 store=store)
+    summary = {'total': len(candidates) + skipped, 'skipped': skipped, 'parsed': 0, 'failed': 0, 'errors': {}}
+
+    pool = None
+    if num_processes > 1:
+        #Spawned processes do not inherit the database connections of this process
+        pool = multiprocessing.get_context('spawn').Pool(num_processes)
+
+    result_file = None
+    if output_file is not None:
+        result_file = open(output_file, 'a', encoding='utf-8')  #pylint: disable=consider-using-with
+    tmp_folder = tempfile.mkdtemp(prefix='aiida_fleur_reparse_')
+
+    try:
+        for start in range(0, len(candidates), chunk_size):
+            chunk = candidates[start:start + chunk_size]
+            uuids = {pk: uuid for pk, uuid, _, _ in chunk}
+
+            tasks = []
+            for pk, _, retrieved_pk, parser_options in chunk:
+                retrieved = orm.load_node(retrieved_pk)
+                if get_output_filename(retrieved, OUTXML_FILE_NAME) is None:
+                    summary['failed'] += 1
+                    summary['errors'][pk] = f'No {OUTXML_FILE_NAME} in the retrieved folder'
+                    continue
+                path = os.path.join(tmp_folder, f'{pk}_{OUTXML_FILE_NAME}')
+                with open_output_file(retrieved, OUTXML_FILE_NAME, 'rb') as outxmlfile, open(path, 'wb') as copy:
+                    shutil.copyfileobj(outxmlfile, copy)
+                if streaming is None:
+                    tasks.append((pk, path, parser_options.get('streaming', False)))
+                else:
+                    tasks.append((pk, path, streaming))
+
+            if pool is not None:
+                results = pool.imap_unordered(_reparse_outxml, tasks)
+            else:
+                results = map(_reparse_outxml, tasks)
+
+            for pk, out_dict, parser_info, arrays, error in results:
+                if error is not None:
+                    summary['failed'] += 1
+                    summary['errors'][pk] = error
+                else:
+                    summary['parsed'] += 1
+                    if store:
+                        _store_reparsed_outputs(pk, out_dict, parser_info, arrays, result_group=result_group)
+
+                if result_file is not None:
+                    record = {
+                        'pk': pk,
+                        'uuid': uuids[pk],
+                        'success': error is None,
+                        'error': error,
+                        'output_parameters': {
+                            **out_dict,
+                            **parser_info
+                        } if out_dict is not None else parser_info,
+                        'output_convergence': None
+                    }
+                    if arrays is not None:
+                        record['output_convergence'] = {name: array.tolist() for name, array in arrays.items()}
+                    result_file.write(json.dumps(record) + '\n')
+
+            for _, path, _ in tasks:
+                os.remove(path)
+
+            if result_file is not None:
+                result_file.flush()
+            if progress_callback is not None:
+                progress_callback(summary)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if result_file is not None:
+            result_file.close()
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+
+    return summary
+
+
+def load_reparse_results(output_file, keys=None):
+    """
+    Load the results written by :py:func:`reparse_calculations()` into a pandas DataFrame
+    with one row per calculation and one column per (flattened) entry of the output parameters
+
+    :param output_file: path to the JSON lines file
+    :param keys: list of keys of the output parameters to include, if not given all are included
+
+    :returns: pandas DataFrame
+    """
+    import pandas as pd
+
+    records = []
+    with open(output_file, encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            output = record.pop('output_parameters') or {}
+            record.pop('output_convergence', None)
+            if keys is not None:
+                output = {key: output.get(key) for key in keys}
+            records.append({**record, **output})
+
+    return pd.json_normalize(records)
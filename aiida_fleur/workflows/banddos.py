@@ -32,6 +32,7 @@ from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
 from aiida_fleur.tools.common_fleur_wf import get_inputs_fleur
 from aiida_fleur.tools.common_fleur_wf import test_and_get_codenode
 from aiida_fleur.data.fleurinp import FleurinpData, get_fleurinp_from_remote_data
+from aiida_fleur.parsers.fleur import get_output_res
 
 
 class FleurBandDosWorkChain(WorkChain):
@@ -223,7 +224,7 @@ class FleurBandDosWorkChain(WorkChain):
                 fleurin = self.inputs.fleurinp
 
         # how can the user say he want to use the given kpoint mesh, ZZ nkpts : False/0
-        fleurmode = FleurinpModifier(fleurin)
+        fleurmode = FleurinpModifier(fleurin, persistent=True)
 
         fchanges = wf_dict.get('inpxml_changes', [])
         # apply further user dependend changes
@@ -344,7 +345,7 @@ class FleurBandDosWorkChain(WorkChain):
             self.control_end_wc(error)
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
-        fleurinp_new = fleurmode.freeze()
+        fleurinp_new = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp_banddos = fleurinp_new
 
     def scf_needed(self):
@@ -399,7 +400,8 @@ class FleurBandDosWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # Do not copy mixing_history* files from the parent
-        settings = {'remove_from_remotecopy_list': ['mixing_history*']}
+        # The charge density is not changed, so it is not retrieved
+        settings = {'remove_from_remotecopy_list': ['mixing_history*'], 'retrieve_profile': 'analysis'}
 
         # Retrieve remote folder of the reference calculation
         pk_last = 0
@@ -450,7 +452,8 @@ class FleurBandDosWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # Do not copy mixing_history* files from the parent
-        settings = {'remove_from_remotecopy_list': ['mixing_history*']}
+        # The charge density is not changed, so it is not retrieved
+        settings = {'remove_from_remotecopy_list': ['mixing_history*'], 'retrieve_profile': 'analysis'}
 
         # Retrieve remote folder from the inputs
         remote = self.inputs.remote
@@ -498,7 +501,7 @@ class FleurBandDosWorkChain(WorkChain):
                 fleurinp = self.ctx.banddos_calc.inputs.fleurinp
             else:
                 fleurinp = get_fleurinp_from_remote_data(self.ctx.banddos_calc.inputs.parent_folder)
-            last_calc_out_dict = last_calc_out.get_dict()
+            last_calc_out_dict = get_output_res(self.ctx.banddos_calc)
         except (NotExistent, AttributeError):
             last_calc_out = None
             last_calc_out_dict = {}
@@ -524,10 +527,10 @@ class FleurBandDosWorkChain(WorkChain):
         efermi_scf = 0
         bandgap_scf = 0
         if 'remote' in self.inputs:
-            scf_results = self.inputs.remote.creator.res
+            scf_results = get_output_res(self.inputs.remote.creator)
         elif 'scf' in self.inputs:
             if self.ctx.scf and self.ctx.scf.is_finished_ok:
-                scf_results = self.ctx.scf.outputs.last_calc.output_parameters.dict
+                scf_results = get_output_res(self.ctx.scf.outputs.last_calc)
 
         if scf_results is not None:
             efermi_scf = scf_results.fermi_energy
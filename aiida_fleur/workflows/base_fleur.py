@@ -15,6 +15,8 @@ the FLEUR calculation. Inheritance from the BaseRestartWorkChain
 allows to add scenarios to restart a calculation in an
 automatic way if an expected failure occurred.
 """
+import math
+
 from aiida import orm
 from aiida.common import AttributeDict
 from aiida.engine import while_
@@ -22,6 +24,7 @@ from aiida.engine.processes.workchains import BaseRestartWorkChain
 from aiida.engine.processes.workchains.utils import process_handler, ProcessHandlerReport
 
 from aiida_fleur.tools.common_fleur_wf import optimize_calc_options
+from aiida_fleur.tools.performance_model import predict_performance
 from aiida_fleur.calculation.fleur import FleurCalculation
 from aiida_fleur.data.fleurinp import get_fleurinp_from_remote_data
 
@@ -31,6 +34,10 @@ class FleurBaseWorkChain(BaseRestartWorkChain):
     _workflowversion = '0.2.1'
     _process_class = FleurCalculation
 
+    # the walltime predicted by the performance model is multiplied by this factor
+    _walltime_safety_factor = 1.5
+    _min_wallclock_seconds = 600
+
     @classmethod
     def define(cls, spec):
         super().define(spec)
@@ -54,6 +61,12 @@ class FleurBaseWorkChain(BaseRestartWorkChain):
             'max_queue_nodes: maximal number of nodes allowed on the remote machine. Used only to automatically solve some FLEUR failures.'
             'max_queue_wallclock_sec: maximal wallclock time allowed on the remote machine. Used only to automatically solve some FLEUR failures.'
         )
+        spec.input('performance_model',
+                   valid_type=orm.Dict,
+                   required=False,
+                   help='Performance model (see aiida_fleur.tools.performance_model). If given, '
+                   'the number of nodes, the MPI/OMP ratio and the walltime of the first calculation '
+                   'are chosen based on the predicted cost.')
 
         spec.outline(
             cls.setup,
@@ -145,15 +158,24 @@ class FleurBaseWorkChain(BaseRestartWorkChain):
         else:
             fleurinp = get_fleurinp_from_remote_data(self.ctx.inputs.parent_folder)
 
+        prediction = None
+        if self.ctx.iteration == 0 and 'performance_model' in self.inputs:
+            prediction = self._apply_performance_prediction(fleurinp)
+
         only_even_MPI = self.inputs.add_comp_para['only_even_MPI']
         forbid_single_mpi = self.inputs.add_comp_para['forbid_single_mpi']
         try:
+            #The stored summary avoids parsing the inp.xml. If the number of kpoints
+            #could not be determined it is None and the error is raised here
+            nkpts = fleurinp.inp_summary.get('nkpts')
+            if nkpts is None:
+                nkpts = fleurinp.get_summary(properties=['nkpts'])['nkpts']
             machines, mpi_tasks, omp_threads, message = optimize_calc_options(self.ctx.num_machines,
                                                                               self.ctx.num_mpiprocs_per_machine,
                                                                               self.ctx.num_cores_per_mpiproc,
                                                                               self.ctx.use_omp,
                                                                               self.ctx.suggest_mpi_omp_ratio,
-                                                                              fleurinp,
+                                                                              kpts=nkpts,
                                                                               only_even_MPI=only_even_MPI,
                                                                               forbid_single_mpi=forbid_single_mpi)
         except ValueError as exc:
@@ -170,6 +192,59 @@ class FleurBaseWorkChain(BaseRestartWorkChain):
                 self.ctx.inputs.metadata.options['environment_variables'] = {}
             self.ctx.inputs.metadata.options['environment_variables']['OMP_NUM_THREADS'] = str(omp_threads)
 
+        if prediction is not None:
+            walltime = self._walltime_safety_factor * prediction['core_seconds'] / (machines * mpi_tasks * omp_threads)
+            walltime = min(max(math.ceil(walltime), self._min_wallclock_seconds), self.ctx.max_queue_wallclock_sec)
+            self.report(f'Setting the walltime to {walltime} seconds based on the performance model')
+            self.ctx.inputs.metadata.options['max_wallclock_seconds'] = walltime
+
+    def _apply_performance_prediction(self, fleurinp):
+        """
+        Choose the number of nodes and the MPI/OMP ratio of the first calculation
+        from the cost predicted by the performance model. The number of nodes is chosen,
+        so that the calculation finishes in the requested walltime and the number of
+        MPI processes per node is reduced if the predicted memory does not fit on a node.
+
+        :param fleurinp: FleurinpData of the calculation
+
+        :returns: dict with the prediction or None if the model has no entry for the code and computer
+        """
+        code = self.ctx.inputs.code
+        computer = code.computer or self.ctx.inputs.metadata.get('computer')
+        if computer is None:
+            return None
+
+        prediction = predict_performance(self.inputs.performance_model, fleurinp, code.label, computer.label)
+        if prediction is None:
+            self.report(f'The performance model has no entry for {code.label}@{computer.label}')
+            return None
+
+        cpus_per_node = self.ctx.num_mpiprocs_per_machine * self.ctx.num_cores_per_mpiproc
+        walltime = self.ctx.inputs.metadata.options['max_wallclock_seconds']
+        machines = math.ceil(self._walltime_safety_factor * prediction['core_seconds'] / (cpus_per_node * walltime))
+        self.ctx.num_machines = min(max(machines, 1), self.ctx.max_queue_nodes)
+        self.report(f"Predicted cost: {prediction['core_seconds']:.0f} core seconds. "
+                    f'Using {self.ctx.num_machines} nodes')
+
+        memory_per_machine = computer.get_default_memory_per_machine()
+        memory_per_process = None
+        if prediction['memory_kb']:
+            #The predicted memory is distributed over all MPI processes
+            memory_per_process = math.ceil(prediction['memory_kb'] /
+                                           (self.ctx.num_machines * self.ctx.num_mpiprocs_per_machine))
+        if memory_per_machine and memory_per_process:
+            max_mpi_per_node = int(0.8 * memory_per_machine / memory_per_process)
+            if max_mpi_per_node < self.ctx.num_mpiprocs_per_machine:
+                if self.ctx.use_omp and max_mpi_per_node > 0:
+                    self.ctx.suggest_mpi_omp_ratio = max_mpi_per_node / (cpus_per_node / max_mpi_per_node)
+                    self.report(f'Predicted memory per process: {memory_per_process} kB. '
+                                f'Using at most {max_mpi_per_node} MPI processes per node')
+                else:
+                    self.report(f'WARNING: Predicted memory per process ({memory_per_process} kB) '
+                                f'might not fit on the nodes')
+
+        return prediction
+
     @process_handler(priority=1,
                      exit_codes=[
                          FleurCalculation.exit_codes.ERROR_FLEUR_CALC_FAILED,
@@ -259,11 +334,20 @@ class FleurBaseWorkChain(BaseRestartWorkChain):
 
         self.ctx.restart_calc = None
         self.ctx.is_finished = False
-        self.report('Calculation failed due to lack of memory, I resubmit it with twice larger'
+
+        # The parser stores the memory estimates in the error_params output
+        # If more than twice the available memory was used the number of nodes is increased further
+        factor = 2
+        if 'error_params' in calculation.outputs:
+            memory_ratio = calculation.outputs.error_params.get_dict().get('memory_usage_ratio')
+            if memory_ratio:
+                factor = max(factor, math.ceil(memory_ratio / 0.8))
+
+        self.report(f'Calculation failed due to lack of memory, I resubmit it with {factor} times larger'
                     ' amount of computational nodes and smaller MPI/OMP ratio')
 
         # increase number of nodes
-        propose_nodes = self.ctx.num_machines * 2
+        propose_nodes = self.ctx.num_machines * factor
         if propose_nodes > self.ctx.max_queue_nodes:
             propose_nodes = self.ctx.max_queue_nodes
         self.ctx.num_machines = propose_nodes
@@ -353,9 +437,12 @@ def _is_remote_reusable(inputs, calculation):
             'cdn1',
     )):
         can_use_remote = True
+    elif FleurCalculation._get_remote_density_folder(calculation) is not None:
+        #The charge density was left on the remote machine on purpose (retrieve_profile/max_retrieve_size settings)
+        can_use_remote = True
 
     if 'fleurinp' in inputs:
-        modes = inputs.fleurinp.get_fleur_modes()
+        modes = inputs.fleurinp.fleur_modes
         if modes['force_theorem'] or modes['dos'] or modes['band']:
             # in modes listed above it makes no sense copying cdn.hdf
             can_use_remote = False
@@ -470,7 +470,7 @@ class FleurCFCoeffWorkChain(WorkChain):
             else:
                 options = {}
 
-            fm = FleurinpModifier(fleurinp_scf)
+            fm = FleurinpModifier(fleurinp_scf, persistent=True)
 
             fm.set_atomgroup({'cFCoeffs': {
                 'chargeDensity': False,
@@ -490,7 +490,7 @@ class FleurCFCoeffWorkChain(WorkChain):
                 self.control_end_wc(error)
                 return {}, self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
-            fleurinp_cf = fm.freeze()
+            fleurinp_cf = fm.freeze(deduplicate=True)
 
             label = f'analogue_cf_{index}'
             description = f'Calculation of crystal field potential with {analogue_element} Analogue Method'
@@ -535,7 +535,7 @@ class FleurCFCoeffWorkChain(WorkChain):
         else:
             description = 'Calculation of crystal field potential/charge density'
 
-        fm = FleurinpModifier(fleurinp_scf)
+        fm = FleurinpModifier(fleurinp_scf, persistent=True)
         element = self.ctx.wf_dict['element']
         if self.ctx.wf_dict['rare_earth_analogue']:
             #Only charge density
@@ -561,7 +561,7 @@ class FleurCFCoeffWorkChain(WorkChain):
             self.control_end_wc(error)
             return {}, self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
-        fleurinp_cf = fm.freeze()
+        fleurinp_cf = fm.freeze(deduplicate=True)
 
         inputs_rareearth = get_inputs_fleur(inputs.fleur,
                                             remote_data,
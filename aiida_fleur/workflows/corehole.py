@@ -37,6 +37,7 @@ from aiida_fleur.workflows.scf import FleurScfWorkChain
 from aiida_fleur.tools.StructureData_util import supercell
 from aiida_fleur.tools.create_corehole import create_corehole_para  #, create_corehole_fleurinp
 from aiida_fleur.tools.extract_corelevels import extract_corelevels
+from aiida_fleur.tools.io_routines import open_output_file
 from aiida_fleur.tools.StructureData_util import break_symmetry
 from aiida_fleur.tools.StructureData_util import find_equi_atoms
 from aiida_fleur.tools.element_econfig_list import get_econfig, get_coreconfig
@@ -45,6 +46,7 @@ from aiida_fleur.tools.element_econfig_list import get_state_occ, highest_unocc_
 from aiida_fleur.tools.dict_util import dict_merger, extract_elementpara
 from aiida_fleur.data.fleurinp import FleurinpData
 from aiida_fleur.data.fleurinpmodifier import inpxml_changes
+from aiida_fleur.parsers.fleur import get_output_res
 
 
 class FleurCoreholeWorkChain(WorkChain):
@@ -1160,7 +1162,7 @@ def extract_results_corehole(calcs):
             continue
         if calc.is_finished_ok:
             # get out.xml file of calculation
-            with calc.outputs.retrieved.open('out.xml', 'rb') as outxml:
+            with open_output_file(calc.outputs.retrieved, 'out.xml', 'rb') as outxml:
                 corelevels, atomtypes = extract_corelevels(outxml)
 
             #all_corelevels.append(core)
@@ -1170,11 +1172,12 @@ def extract_results_corehole(calcs):
             #    print corelevels[0][0]['corestates'][i]['energy']
 
             #TODO how to store?
-            efermi = calc.res.fermi_energy
+            res = get_output_res(calc)
+            efermi = res.fermi_energy
             #print efermi
-            bandgap = calc.res.bandgap
-            total_energy = calc.res.energy
-            total_energy_units = calc.res.energy_units
+            bandgap = res.bandgap
+            total_energy = res.energy
+            total_energy_units = res.energy_units
             #total_energy = calc.res.total_energy
             #total_energy_units = calc.res.total_energy_units
 
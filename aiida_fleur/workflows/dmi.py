@@ -32,6 +32,7 @@ from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
 from aiida_fleur.workflows.base_fleur import FleurBaseWorkChain
 from aiida_fleur.data.fleurinp import FleurinpData, get_fleurinp_from_remote_data
 from aiida_fleur.data.fleurinpmodifier import inpxml_changes
+from aiida_fleur.parsers.fleur import get_output_res
 
 from masci_tools.util.constants import HTR_TO_EV
 
@@ -316,7 +317,7 @@ class FleurDMIWorkChain(WorkChain):
                     }},
                 )
 
-        fleurmode = FleurinpModifier(fleurin)
+        fleurmode = FleurinpModifier(fleurin, persistent=True)
         try:
             fleurmode.add_task_list(self.ctx.wf_dict['inpxml_changes'])
         except (ValueError, TypeError) as exc:
@@ -339,7 +340,7 @@ class FleurDMIWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # apply
-        out = fleurmode.freeze()
+        out = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp = out
 
     def force_after_scf(self):
@@ -469,7 +470,7 @@ class FleurDMIWorkChain(WorkChain):
             return self.exit_codes.ERROR_FORCE_THEOREM_FAILED
 
         try:
-            out_dict = calculation.outputs.output_parameters.dict
+            out_dict = get_output_res(calculation)
             h_so = out_dict.dmi_force_so_h_so
             mae_thetas = out_dict.dmi_force_theta
             mae_phis = out_dict.dmi_force_phi
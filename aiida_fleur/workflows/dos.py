@@ -133,7 +133,7 @@ class fleur_dos_wc(WorkChain):
         emin = wf_dict.get('emin', -0.30)
         emax = wf_dict.get('emax', 0.80)
 
-        fleurmode = FleurinpModifier(self.inputs.fleurinp)
+        fleurmode = FleurinpModifier(self.inputs.fleurinp, persistent=True)
 
         # change_dict = {'dos': True, 'ndir' : -1, 'minEnergy' : self.inputs.wf_parameters.get_dict().get('minEnergy', -0.30000000),
         # 'maxEnergy' :  self.inputs.wf_parameters.get_dict().get('manEnergy','0.80000000'),
@@ -148,7 +148,7 @@ class fleur_dos_wc(WorkChain):
             fleurmode.set_nkpts(count=nkpts)
             # fleurinp_new.replace_tag()
         fleurmode.show(validate=True, display=False)  # needed?
-        fleurinp_new = fleurmode.freeze()
+        fleurinp_new = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp1 = fleurinp_new
         # print(fleurinp_new)
         # print(fleurinp_new.folder.get_subfolder('path').get_abs_path(''))
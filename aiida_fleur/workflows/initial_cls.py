@@ -35,6 +35,8 @@ from aiida_fleur.calculation.fleur import FleurCalculation as FleurCalc
 from aiida_fleur.workflows.scf import FleurScfWorkChain
 from aiida_fleur.tools.common_fleur_wf_util import get_natoms_element
 from aiida_fleur.data.fleurinp import FleurinpData
+from aiida_fleur.tools.io_routines import open_output_file
+from aiida_fleur.parsers.fleur import get_output_res
 
 
 class FleurInitialCLSWorkChain(WorkChain):
@@ -966,7 +968,7 @@ def extract_results(calcs):
         if calc.is_finished_ok:
             # get out.xml file of calculation
 
-            with calc.outputs.retrieved.open('out.xml', 'rb') as outxml:
+            with open_output_file(calc.outputs.retrieved, 'out.xml', 'rb') as outxml:
                 corelevels, atomtypes = extract_corelevels(outxml)
 
             #all_corelevels.append(core)
@@ -976,10 +978,11 @@ def extract_results(calcs):
             #    print corelevels[0][0]['corestates'][i]['energy']
 
             #TODO how to store?
-            efermi = calc.res.fermi_energy
+            res = get_output_res(calc)
+            efermi = res.fermi_energy
             #print efermi
-            bandgap = calc.res.bandgap
-            te = calc.res.energy
+            bandgap = res.bandgap
+            te = res.energy
             #total_energy = calc.res.total_energy
             #total_energy_units = calc.res.total_energy_units
 
@@ -30,6 +30,7 @@ from aiida_fleur.workflows.scf import FleurScfWorkChain
 from aiida_fleur.workflows.base_fleur import FleurBaseWorkChain
 from aiida_fleur.data.fleurinpmodifier import FleurinpModifier, inpxml_changes
 from aiida_fleur.data.fleurinp import FleurinpData, get_fleurinp_from_remote_data
+from aiida_fleur.parsers.fleur import get_output_res
 from masci_tools.util.constants import HTR_TO_EV
 
 
@@ -291,7 +292,7 @@ class FleurMaeWorkChain(WorkChain):
             #         'occurrences': range(1, len(fleurin.inp_dict['cell']['symmetryOperations']))
             #     }))
 
-        fleurmode = FleurinpModifier(fleurin)
+        fleurmode = FleurinpModifier(fleurin, persistent=True)
         try:
             fleurmode.add_task_list(self.ctx.wf_dict['inpxml_changes'])
         except (ValueError, TypeError) as exc:
@@ -314,7 +315,7 @@ class FleurMaeWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # apply
-        out = fleurmode.freeze()
+        out = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp = out
 
     def force_after_scf(self):
@@ -445,7 +446,7 @@ class FleurMaeWorkChain(WorkChain):
         try:
             fleurout = calculation.outputs.output_parameters
             fleur_output_uuid = fleurout.uuid
-            out_dict = fleurout.dict
+            out_dict = get_output_res(calculation)
             t_energydict = out_dict.mae_force_evsum
             mae_thetas = out_dict.mae_force_theta
             mae_phis = out_dict.mae_force_phi
@@ -519,7 +519,7 @@ class FleurOrbControlWorkChain(WorkChain):
                 fleurinp = inputs.fleurinp
 
         if fleurinp is not None:
-            modes = fleurinp.get_fleur_modes()
+            modes = fleurinp.fleur_modes
             if modes['ldau']:
                 error = f"ERROR: Wrong input: fleurinp {'in scf_no_ldau' if 'scf_no_ldau' in inputs else ''} already contains LDA+U"
                 self.report(error)
@@ -724,8 +724,8 @@ class FleurOrbControlWorkChain(WorkChain):
         settings.setdefault('remove_from_remotecopy_list', []).append('mixing_history*')
 
         self.report(f'INFO: create fleurinp for config {index}')
-        fm = FleurinpModifier(fleurinp)
-        modes = fleurinp.get_fleur_modes()
+        fm = FleurinpModifier(fleurinp, persistent=True)
+        modes = fleurinp.fleur_modes
 
         fm.set_inpchanges({'itmax': self.ctx.wf_dict['iterations_fixed'], 'l_linMix': True, 'mixParam': 0.0})
 
@@ -774,7 +774,7 @@ class FleurOrbControlWorkChain(WorkChain):
             self.control_end_wc(error)
             return {}, self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
-        fleurinp_fixed = fm.freeze()
+        fleurinp_fixed = fm.freeze(deduplicate=True)
 
         input_fixed = get_inputs_fleur(inputs.fleur,
                                        remote_data,
@@ -25,6 +25,8 @@ from aiida_fleur.workflows.base_fleur import FleurBaseWorkChain
 from aiida_fleur.data.fleurinp import FleurinpData
 from aiida_fleur.data.fleurinpmodifier import inpxml_changes
 from aiida_fleur.tools.StructureData_util import break_symmetry_wf
+from aiida_fleur.tools.io_routines import open_output_file
+from aiida_fleur.parsers.fleur import get_output_res
 
 
 class FleurRelaxWorkChain(WorkChain):
@@ -454,13 +456,11 @@ class FleurRelaxWorkChain(WorkChain):
             return
 
         try:
-            relax_out = self.ctx.scf_res.outputs.last_calc.output_parameters
+            relax_out = get_output_res(self.ctx.scf_res.outputs.last_calc)
             retrieved_node = self.ctx.scf_res.outputs.last_calc.retrieved
         except NotExistent:
             return self.exit_codes.ERROR_NO_SCF_OUTPUT
 
-        relax_out = relax_out.get_dict()
-
         try:
             total_energy = relax_out['energy']
             total_energy_units = relax_out['energy_units']
@@ -472,7 +472,10 @@ class FleurRelaxWorkChain(WorkChain):
         self.ctx.total_energy_units = total_energy_units
         self.ctx.atomtype_info = atomtype_info
 
-        fleurinp = FleurinpData(files=['inp.xml', 'relax.xml'], node=retrieved_node)
+        fleurinp = FleurinpData()
+        with open_output_file(retrieved_node, 'relax.xml', 'rb') as relax_file:  #might be compressed
+            fleurinp.set_file(relax_file, dst_filename='relax.xml')
+        fleurinp.set_file('inp.xml', node=retrieved_node)
         structure = fleurinp.get_structuredata_ncf()
 
         self.ctx.final_structure = structure
@@ -483,11 +486,9 @@ class FleurRelaxWorkChain(WorkChain):
         """
 
         try:
-            scf_out = self.ctx.scf_final_res.outputs.last_calc.output_parameters
+            scf_out_d = get_output_res(self.ctx.scf_final_res.outputs.last_calc)
         except NotExistent:
             return self.exit_codes.ERROR_NO_SCF_OUTPUT
-
-        scf_out_d = scf_out.get_dict()
         try:
             total_energy = scf_out_d['energy']
             total_energy_units = scf_out_d['energy_units']
@@ -23,6 +23,7 @@ from aiida_fleur.workflows.scf import FleurScfWorkChain
 from aiida_fleur.calculation.fleur import FleurCalculation as FleurCalc
 from aiida_fleur.tools.StructureData_util import break_symmetry_wf
 from aiida_fleur.tools.common_fleur_wf import find_nested_process
+from aiida_fleur.parsers.fleur import get_output_res
 
 
 class FleurRelaxTorqueWorkChain(WorkChain):
@@ -354,7 +355,7 @@ class FleurRelaxTorqueWorkChain(WorkChain):
         for i, angle in enumerate(zip(new_angles['alphas'], new_angles['betas'])):
             fm.set_atomgroup({'nocoParams': {'beta': angle[1], 'alpha': angle[0]}}, position=i + 1)
 
-        new_fleurinpdata = fm.freeze()
+        new_fleurinpdata = fm.freeze(deduplicate=True)
 
         self.ctx.new_fleurinp = new_fleurinpdata
 
@@ -457,11 +458,9 @@ class FleurRelaxTorqueWorkChain(WorkChain):
         """
 
         try:
-            scf_out = self.ctx.scf_final_res.outputs.last_calc.output_parameters
+            scf_out_d = get_output_res(self.ctx.scf_final_res.outputs.last_calc)
         except NotExistent:
             return self.exit_codes.ERROR_NO_SCF_OUTPUT
-
-        scf_out_d = scf_out.get_dict()
         try:
             total_energy = scf_out_d['energy']
             total_energy_units = scf_out_d['energy_units']
@@ -34,7 +34,8 @@ from aiida_fleur.calculation.fleur import FleurCalculation
 
 from aiida_fleur.data.fleurinp import FleurinpData, get_fleurinp_from_remote_data_cf
 
-from masci_tools.io.parsers.fleur import outxml_parser
+from aiida_fleur.parsers.fleur import parse_convergence_arrays, get_output_res
+from aiida_fleur.tools.io_routines import open_output_file
 
 
 class FleurScfWorkChain(WorkChain):
@@ -407,7 +408,7 @@ class FleurScfWorkChain(WorkChain):
 
         wf_dict = self.ctx.wf_dict
 
-        fleurmode = FleurinpModifier(self.ctx.fleurinp)
+        fleurmode = FleurinpModifier(self.ctx.fleurinp, persistent=True)
 
         fleurmode.set_inpchanges({'itmax': self.ctx.default_itmax})
         #Take out straight mixing
@@ -430,7 +431,7 @@ class FleurScfWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # apply
-        out = fleurmode.freeze()
+        out = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp = out
         return
 
@@ -468,7 +469,7 @@ class FleurScfWorkChain(WorkChain):
         converge_mode = wf_dict['mode']
         fchanges = wf_dict['inpxml_changes']
 
-        fleurmode = FleurinpModifier(fleurin)
+        fleurmode = FleurinpModifier(fleurin, persistent=True)
 
         itmax = self.ctx.default_itmax
         if self.ctx.run_straight_mixing:
@@ -565,7 +566,7 @@ class FleurScfWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # apply
-        out = fleurmode.freeze()
+        out = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp = out
         return
 
@@ -592,6 +593,14 @@ class FleurScfWorkChain(WorkChain):
                 remotecopy_list.append('mixing_history*')
             settings['remove_from_remotecopy_list'] = remotecopy_list
 
+        if self.ctx.run_straight_mixing and self.ctx.loop_count == 0:
+            # The first run with straight mixing is always continued, so the files of the
+            # fleur modes are not needed. The charge density is still retrieved, since the run
+            # might already be converged or the remote folder might not be usable for the restart
+            if settings is None:
+                settings = {}
+            settings.setdefault('retrieve_profile', 'restart')
+
         if self.ctx.run_straight_mixing and self.ctx.loop_count == 1:
             status = self.reset_straight_mixing()
             if status:
@@ -677,65 +686,35 @@ class FleurScfWorkChain(WorkChain):
         if self.ctx.parse_last:
             last_base_wc = self.ctx.last_base_wc
 
-            walltime = last_base_wc.outputs.output_parameters['walltime']
+            walltime = get_output_res(last_base_wc)['walltime']
             if isinstance(walltime, int):
                 self.ctx.total_wall_time = self.ctx.total_wall_time + walltime
 
-            with last_base_wc.outputs.retrieved.open(FleurCalculation._OUTXML_FILE_NAME, 'rb') as outxmlfile:
-                output_dict = outxml_parser(outxmlfile,
-                                            minimal_mode=True,
-                                            list_return=True,
-                                            iteration_to_parse='all',
-                                            ignore_validation=True)
-
-            energies = output_dict.get('energy_hartree', [])
-            if energies is not None:
-                self.ctx.total_energy.extend(energies)
-
-            if 'overall_density_convergence' in output_dict:
-                distances = output_dict['overall_density_convergence']
+            if 'output_convergence' in last_base_wc.outputs:
+                convergence = last_base_wc.outputs.output_convergence
             else:
-                distances = output_dict.get('density_convergence', [])
+                # calculations parsed before the convergence arrays were added as an output
+                with open_output_file(last_base_wc.outputs.retrieved, FleurCalculation._OUTXML_FILE_NAME,
+                                      'rb') as outxmlfile:
+                    convergence = parse_convergence_arrays(outxmlfile)
+            convergence = convert_convergence_arrays(convergence)
 
-            if distances is not None:
-                self.ctx.distance.extend(distances)
-
-            if 'ldau_info' in output_dict:
-                nmmp_distances = output_dict['ldau_info'].get('density_matrix_distance', [])
-
-                if nmmp_distances is not None:
-                    self.ctx.nmmp_distance.extend(nmmp_distances)
+            self.ctx.total_energy.extend(convergence['energy_hartree'])
+            self.ctx.distance.extend(convergence['density_convergence'])
+            self.ctx.nmmp_distance.extend(convergence['nmmp_distance'])
 
             if mode == 'force':
-                forces = output_dict.get('force_atoms', [])
-                if forces is not None:
-                    for force_iter in forces:
-                        self.ctx.all_forces.append([force for atom, force in force_iter])
+                self.ctx.all_forces.extend(convergence['force_atoms'])
 
             if mode == 'torque':
-
-                with last_base_wc.outputs.retrieved.open(FleurCalculation._OUTXML_FILE_NAME, 'rb') as outxmlfile:
-                    output_dict_torque = outxml_parser(outxmlfile,
-                                                       iteration_to_parse='all',
-                                                       optional_tasks=['torques', 'noco_angles'],
-                                                       ignore_validation=True)
-
-                    x_torques = output_dict_torque.get('torque_x', [])
-                    y_torques = output_dict_torque.get('torque_y', [])
-                    if not isinstance(x_torques[0], list):  # only 1 iterations was done
-                        x_torques = [x_torques]
-                        y_torques = [y_torques]
-
-                    # extract angles from inp.xml because out.xml causes alpha and beta to jump
-                    # alpha_angles = output_dict_torque.get('noco_alpha', [])
-                    # beta_angles = output_dict_torque.get('noco_beta', [])
-                    alpha_angles = [x['nocoParams']['alpha'] for x in self.ctx.fleurinp.inp_dict['atomGroups']]
-                    beta_angles = [x['nocoParams']['beta'] for x in self.ctx.fleurinp.inp_dict['atomGroups']]
-
-                    self.ctx.x_torques.extend(x_torques)
-                    self.ctx.y_torques.extend(y_torques)
-                    self.ctx.alpha_angles = alpha_angles
-                    self.ctx.beta_angles = beta_angles
+                # extract angles from inp.xml because out.xml causes alpha and beta to jump
+                alpha_angles = [x['nocoParams']['alpha'] for x in self.ctx.fleurinp.inp_dict['atomGroups']]
+                beta_angles = [x['nocoParams']['beta'] for x in self.ctx.fleurinp.inp_dict['atomGroups']]
+
+                self.ctx.x_torques.extend(convergence['torque_x'])
+                self.ctx.y_torques.extend(convergence['torque_y'])
+                self.ctx.alpha_angles = alpha_angles
+                self.ctx.beta_angles = beta_angles
         else:
             errormsg = 'ERROR: scf wc was not successful, check log for details'
             self.control_end_wc(errormsg)
@@ -868,7 +847,7 @@ class FleurScfWorkChain(WorkChain):
         try:  # if something failed, we still might be able to retrieve something
             last_calc_out = self.ctx.last_base_wc.outputs.output_parameters
             retrieved = self.ctx.last_base_wc.outputs.retrieved
-            last_calc_out_dict = last_calc_out.get_dict()
+            last_calc_out_dict = get_output_res(self.ctx.last_base_wc)
         except (NotExistent, AttributeError):
             last_calc_out = None
             last_calc_out_dict = {}
@@ -993,6 +972,51 @@ class FleurScfWorkChain(WorkChain):
         self.return_results()
 
 
+def convert_convergence_arrays(convergence):
+    """
+    Convert the arrays of the ``output_convergence`` node of a FleurCalculation
+    into lists that can be stored in the context of the workchain. NaN entries
+    (e.g. the distance of the first iteration) are converted to None
+
+    :param convergence: ArrayData produced by the FleurParser or None
+
+    :returns: dict with lists for the energies, charge density distances, LDA+U distances,
+              forces and torques, one entry per iteration
+    """
+    import numpy as np
+
+    result = {
+        'energy_hartree': [],
+        'density_convergence': [],
+        'nmmp_distance': [],
+        'force_atoms': [],
+        'torque_x': [],
+        'torque_y': []
+    }
+    if convergence is None:
+        return result
+
+    for name in convergence.get_arraynames():
+        array = convergence.get_array(name)
+        if name == 'nmmp_distance':
+            values = []
+            for distances in array:
+                distances = [dist for dist in distances.tolist() if not np.isnan(dist)]
+                if not distances:
+                    values.append(None)
+                elif len(distances) == 1:
+                    values.append(distances[0])
+                else:
+                    values.append(distances)
+        elif array.ndim == 1:
+            values = [None if np.isnan(value) else value for value in array.tolist()]
+        else:
+            values = array.tolist()
+        result[name] = values
+
+    return result
+
+
 @cf
 def create_scf_result_node(**kwargs):
     """
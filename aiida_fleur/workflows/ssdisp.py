@@ -34,6 +34,7 @@ from aiida_fleur.workflows.scf import FleurScfWorkChain
 from aiida_fleur.data.fleurinpmodifier import FleurinpModifier, inpxml_changes
 from aiida_fleur.workflows.base_fleur import FleurBaseWorkChain
 from aiida_fleur.data.fleurinp import FleurinpData, get_fleurinp_from_remote_data
+from aiida_fleur.parsers.fleur import get_output_res
 
 
 class FleurSSDispWorkChain(WorkChain):
@@ -278,7 +279,7 @@ class FleurSSDispWorkChain(WorkChain):
             for label, beta in self.ctx.wf_dict['beta'].items():
                 fm.set_atomgroup_label(label, {'nocoParams': {'beta': beta}})
 
-        fleurmode = FleurinpModifier(fleurin)
+        fleurmode = FleurinpModifier(fleurin, persistent=True)
         try:
             fleurmode.add_task_list(self.ctx.wf_dict['inpxml_changes'])
         except (ValueError, TypeError) as exc:
@@ -301,7 +302,7 @@ class FleurSSDispWorkChain(WorkChain):
             return self.exit_codes.ERROR_CHANGING_FLEURINPUT_FAILED
 
         # apply
-        out = fleurmode.freeze()
+        out = fleurmode.freeze(deduplicate=True)
         self.ctx.fleurinp = out
 
     def force_after_scf(self):
@@ -427,7 +428,7 @@ class FleurSSDispWorkChain(WorkChain):
             return self.exit_codes.ERROR_FORCE_THEOREM_FAILED
 
         try:
-            out_dict = calculation.outputs.output_parameters.dict
+            out_dict = get_output_res(calculation)
             t_energydict = out_dict.spst_force_evsum
             e_u = out_dict.spst_force_units
 
@@ -25,6 +25,7 @@ from aiida_fleur.tools.StructureData_util import rescale, rescale_nowf, is_struc
 from aiida_fleur.workflows.scf import FleurScfWorkChain
 from aiida_fleur.tools.common_fleur_wf import test_and_get_codenode
 from aiida_fleur.tools.common_fleur_wf_util import check_eos_energies
+from aiida_fleur.parsers.fleur import get_output_res
 
 from masci_tools.util.constants import HTR_TO_EV
 
@@ -281,7 +282,7 @@ class FleurStrainWorkChain(WorkChain):
             distancelist.append(dis)
             calc_uuid = calc.outputs.last_calc.remote_folder.creator.uuid
             calc_uuids.append(calc_uuid)
-            bandgaplist.append(load_node(calc_uuid).res.bandgap)
+            bandgaplist.append(get_output_res(load_node(calc_uuid)).bandgap)
 
         en_array = np.array(t_energylist_peratom)
         vol_array = np.array(vol_peratom_success)
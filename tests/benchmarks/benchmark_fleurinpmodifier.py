@@ -0,0 +1,83 @@
+"""
+Benchmark of the persistent mode of the FleurinpModifier
+
+Emulates ``FleurScfWorkChain.change_fleurinp``, i.e. a number of tasks is added to a
+``FleurinpModifier`` and the changes are checked with ``show(validate=True)`` before
+``freeze()`` is called. The wall time and the number of times the ``inp.xml`` is loaded
+are reported for the default and the persistent mode. The in-memory and persistent
+caches for the ``inp.xml`` are disabled to only measure the replaying of the tasks.
+
+Usage::
+
+    python benchmark_fleurinpmodifier.py [--profile PROFILE] [--inpxml PATH] [--repeat N]
+
+.. warning::
+    The nodes created by this script are stored in the given profile, use a
+    separate profile for running it.
+"""
+import argparse
+import time
+from pathlib import Path
+
+INPXML_FILE = Path(__file__).parent.resolve().parent / 'files' / 'inpxml' / 'Si' / 'inp.xml'
+
+
+def _change_fleurinp(fleurinp, persistent):
+    """
+    Apply the same changes as the scf workchain for the density convergence mode
+    """
+    from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+    fleurmode = FleurinpModifier(fleurinp, persistent=persistent)
+    fleurmode.set_inpchanges({'imix': 'straight'})
+    fleurmode.set_inpchanges({'itmax': 30, 'minDistance': 1e-5})
+    fleurmode.set_species('all', {'mtSphere': {'radius': 2.1}})
+    fleurmode.show(display=False, validate=True)
+    return fleurmode.freeze()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', type=str, default=None, help='AiiDA profile to use')
+    parser.add_argument('--inpxml', type=str, default=str(INPXML_FILE), help='inp.xml file to use')
+    parser.add_argument('--repeat', type=int, default=10, help='Number of modifications')
+    args = parser.parse_args()
+
+    from aiida import load_profile
+    from aiida_fleur.data.fleurinp import FleurinpData
+    from aiida_fleur.data.inpxml_cache import INPXML_CACHE, VALIDATION_CACHE
+
+    load_profile(args.profile)
+
+    nloads = 0
+    original_load_inpxml = FleurinpData.load_inpxml
+
+    def _counting_load_inpxml(self, *args, **kwargs):
+        nonlocal nloads
+        nloads += 1
+        return original_load_inpxml(self, *args, **kwargs)
+
+    FleurinpData.load_inpxml = _counting_load_inpxml
+    INPXML_CACHE.enabled = False
+    VALIDATION_CACHE.enabled = False
+
+    fleurinp = FleurinpData(files=[args.inpxml])
+    fleurinp.store()
+
+    #Warm up imports and the schema dictionaries
+    reference = _change_fleurinp(fleurinp, False).get_content('inp.xml')
+    assert _change_fleurinp(fleurinp, True).get_content('inp.xml') == reference, 'Different inp.xml produced'
+
+    print(f'show(validate=True) and freeze() {args.repeat} times ({args.inpxml})')
+    print(f"{'mode':>11} {'loads':>6} {'per freeze [ms]':>16}")
+    for persistent in (False, True):
+        nloads = 0
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            _change_fleurinp(fleurinp, persistent)
+        walltime = time.perf_counter() - start
+        print(f"{'persistent' if persistent else 'default':>11} {nloads:>6} {walltime / args.repeat * 1000:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
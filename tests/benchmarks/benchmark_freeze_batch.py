@@ -0,0 +1,83 @@
+"""
+Benchmark of the creation of many modified versions of one FleurinpData
+
+Compares freezing one ``FleurinpModifier`` per variant, i.e. one
+``modify_fleurinpdata`` calcfunction per variant, with
+``FleurinpModifier.freeze_batch()``, which creates all variants in a single
+calcfunction parsing the original ``inp.xml`` only once. Each variant
+changes the spin spiral angles (as done for example in the ``FleurSSDispWorkChain``).
+
+Usage::
+
+    python benchmark_freeze_batch.py [--profile PROFILE] [--inpxml PATH] [--variants N]
+
+.. warning::
+    The nodes created by this script are stored in the given profile, use a
+    separate profile for running it.
+"""
+import argparse
+import time
+from pathlib import Path
+
+INPXML_FILE = Path(__file__).parent.resolve().parent / 'files' / 'inpxml' / 'Si' / 'inp.xml'
+
+
+def _create_variants(nvariants, original=None):
+    """
+    Create the FleurinpModifier for each variant
+    """
+    from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+    variants = []
+    for index in range(nvariants):
+        fm = FleurinpModifier(original)
+        fm.set_inpchanges({'itmax': 1, 'l_ss': True, 'qss': [0.0, 0.0, index / nvariants]})
+        variants.append(fm)
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', type=str, default=None, help='AiiDA profile to use')
+    parser.add_argument('--inpxml', type=str, default=str(INPXML_FILE), help='inp.xml file to use')
+    parser.add_argument('--variants', type=int, default=100, help='Number of variants to create')
+    args = parser.parse_args()
+
+    from aiida import load_profile
+    from aiida_fleur.data.fleurinp import FleurinpData
+    from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+    load_profile(args.profile)
+
+    fleurinp = FleurinpData(files=[args.inpxml])
+    fleurinp.store()
+
+    #Warm up imports and the schema dictionaries
+    FleurinpModifier.freeze_batch(fleurinp, _create_variants(1))
+
+    nloads = 0
+    load_inpxml = FleurinpData.load_inpxml
+
+    def _counting_load_inpxml(self, *args, **kwargs):
+        nonlocal nloads
+        nloads += 1
+        return load_inpxml(self, *args, **kwargs)
+
+    FleurinpData.load_inpxml = _counting_load_inpxml
+
+    print(f'Creating {args.variants} variants of {args.inpxml}')
+    print(f"{'implementation':>16} {'inp.xml loads':>14} {'time [s]':>9} {'per variant [ms]':>17}")
+    for name in ('freeze', 'freeze_batch'):
+        nloads = 0
+        start = time.perf_counter()
+        if name == 'freeze':
+            results = [fm.freeze() for fm in _create_variants(args.variants, fleurinp)]
+        else:
+            results = FleurinpModifier.freeze_batch(fleurinp, _create_variants(args.variants))
+        walltime = time.perf_counter() - start
+        assert len(results) == args.variants
+        print(f'{name:>16} {nloads:>14} {walltime:>9.3f} {walltime / args.variants * 1000:>17.1f}')
+
+
+if __name__ == '__main__':
+    main()
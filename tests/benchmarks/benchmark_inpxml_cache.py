@@ -0,0 +1,91 @@
+"""
+Benchmark of the cache for parsed ``inp.xml`` trees of FleurinpData
+
+Emulates the calls to ``FleurinpData`` methods done by the processes of a
+``FleurScfWorkChain`` with a given number of ``FleurCalculation`` runs:
+
+1. creation of the FleurinpData (parser of the inpgen calculation)
+2. ``change_fleurinp`` of the scf workchain (``FleurinpModifier.freeze()``)
+3. for each calculation: ``check_kpts`` of the base workchain (``get_nkpts()``),
+   ``prepare_for_submission`` of the calculation (``get_fleur_modes()``)
+   and ``_is_remote_reusable`` for restarts (``get_fleur_modes()``)
+
+The number of times the ``inp.xml`` is actually parsed (and validated) and the
+wall time are reported with and without the cache.
+
+Usage::
+
+    python benchmark_inpxml_cache.py [--profile PROFILE] [--inpxml PATH] [--runs N]
+
+.. warning::
+    The nodes created by this script are stored in the given profile, use a
+    separate profile for running it.
+"""
+import argparse
+import time
+from pathlib import Path
+
+INPXML_FILE = Path(__file__).parent.resolve().parent / 'files' / 'inpxml' / 'Si' / 'inp.xml'
+
+
+def _emulate_scf(inpxml, nruns):
+    """
+    Call the FleurinpData methods in the same order as a FleurScfWorkChain
+    """
+    from aiida_fleur.data.fleurinp import FleurinpData
+    from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+    fleurinp = FleurinpData(files=[str(inpxml)])
+    fleurinp.store()
+
+    fleurmode = FleurinpModifier(fleurinp)
+    fleurmode.set_inpchanges({'itmax': 30, 'minDistance': 1e-5})
+    fleurinp = fleurmode.freeze()
+
+    for index in range(nruns):
+        fleurinp.get_nkpts()
+        fleurinp.get_fleur_modes()
+        if index > 0:
+            fleurinp.get_fleur_modes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', type=str, default=None, help='AiiDA profile to use')
+    parser.add_argument('--inpxml', type=str, default=str(INPXML_FILE), help='inp.xml file to use')
+    parser.add_argument('--runs', type=int, default=5, help='Number of FleurCalculations in the scf workchain')
+    args = parser.parse_args()
+
+    from aiida import load_profile
+    import masci_tools.io.fleur_xml as fleur_xml
+    from aiida_fleur.data.inpxml_cache import INPXML_CACHE
+
+    load_profile(args.profile)
+
+    nparses = 0
+    original_load_inpxml = fleur_xml.load_inpxml
+
+    def _counting_load_inpxml(*args, **kwargs):
+        nonlocal nparses
+        nparses += 1
+        return original_load_inpxml(*args, **kwargs)
+
+    fleur_xml.load_inpxml = _counting_load_inpxml
+
+    #Warm up imports and the schema dictionaries
+    _emulate_scf(args.inpxml, 1)
+
+    print(f'FleurScfWorkChain with {args.runs} FleurCalculations ({args.inpxml})')
+    print(f"{'cache':>8} {'parses':>7} {'hits':>5} {'time [s]':>9}")
+    for enabled in (False, True):
+        INPXML_CACHE.clear()
+        INPXML_CACHE.enabled = enabled
+        nparses = 0
+        start = time.perf_counter()
+        _emulate_scf(args.inpxml, args.runs)
+        walltime = time.perf_counter() - start
+        print(f"{'on' if enabled else 'off':>8} {nparses:>7} {INPXML_CACHE.stats()['hits']:>5} {walltime:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
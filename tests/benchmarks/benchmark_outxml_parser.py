@@ -0,0 +1,117 @@
+"""
+Benchmark of the out.xml parsing done in the FleurParser
+
+Compares the default path (full lxml tree) with the streaming mode
+(``settings = {'parser_options': {'streaming': True}}``) for all files
+in ``tests/files/outxml``. Each measurement runs in a fresh process, the
+reported memory is the peak RSS of this process. The RSS after importing
+all needed modules is given as a reference.
+
+Usage::
+
+    python benchmark_outxml_parser.py [--replicate N]
+
+With ``--replicate N`` the iterations in each file are repeated N times
+to emulate long runs with large out.xml files.
+"""
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+OUTXML_FOLDER = Path(__file__).parent.resolve().parent / 'files' / 'outxml'
+
+
+def _parse(path, mode, queue):
+    """
+    Parse the given file like the FleurParser and report wall time and peak RSS
+    """
+    from lxml import etree
+    from masci_tools.io.parsers.fleur import outxml_parser
+    from aiida_fleur.parsers.fleur import load_outxml_streaming, CONVERGENCE_PARSE_TASKS
+
+    rss_imports = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with open(path, 'rb') as outxmlfile:
+        try:
+            if mode == 'streaming':
+                outxml_source = load_outxml_streaming(outxmlfile)
+            else:
+                outxml_source = etree.parse(outxmlfile, etree.XMLParser(attribute_defaults=True, encoding='utf-8'))
+        except etree.XMLSyntaxError:
+            outxmlfile.seek(0)
+            outxml_source = outxmlfile
+        try:
+            outxml_parser(outxml_source, parser_info_out={}, ignore_validation=True)
+            if not isinstance(outxml_source, etree._ElementTree):
+                outxmlfile.seek(0)
+            outxml_parser(outxml_source,
+                          minimal_mode=True,
+                          list_return=True,
+                          iteration_to_parse='all',
+                          additional_tasks=CONVERGENCE_PARSE_TASKS,
+                          overwrite=True,
+                          parser_info_out={},
+                          ignore_validation=True)
+        except Exception:  #pylint: disable=broad-except
+            queue.put(None)
+            return
+    walltime = time.perf_counter() - start
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((walltime, rss_peak / 1024, rss_imports / 1024))
+
+
+def _replicate_iterations(path, n_repeat, folder):
+    """
+    Write a copy of the given out.xml with all iterations repeated n_repeat times
+    """
+    from copy import deepcopy
+    from lxml import etree
+
+    try:
+        xmltree = etree.parse(str(path))
+    except etree.XMLSyntaxError:
+        return path
+    for iteration in xmltree.getroot().iter('iteration'):
+        for _ in range(n_repeat - 1):
+            iteration.addprevious(deepcopy(iteration))
+
+    new_path = Path(folder) / f'{path.stem}_x{n_repeat}.xml'
+    xmltree.write(str(new_path))
+    return new_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replicate', type=int, default=1, help='Repeat each iteration N times')
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{'file':<45} {'size [MB]':>10} {'mode':>10} {'time [s]':>10} {'peak RSS [MB]':>14} "
+              f"{'after imports [MB]':>19}")
+        paths = sorted(OUTXML_FOLDER.glob('**/*.xml'))
+        if args.replicate > 1:
+            #Done in a separate process to not increase the peak RSS inherited by the measurements
+            with ctx.Pool(1) as pool:
+                paths = pool.starmap(_replicate_iterations, [(path, args.replicate, folder) for path in paths])
+        for path in paths:
+            size = path.stat().st_size / 1024**2
+            for mode in ('default', 'streaming'):
+                queue = ctx.Queue()
+                process = ctx.Process(target=_parse, args=(path, mode, queue))
+                process.start()
+                result = queue.get()
+                process.join()
+                if result is None:
+                    print(f'{path.name:<45} {size:>10.2f} {mode:>10} {"failed":>10}')
+                    continue
+                walltime, rss_peak, rss_imports = result
+                print(f'{path.name:<45} {size:>10.2f} {mode:>10} {walltime:>10.3f} {rss_peak:>14.1f} '
+                      f'{rss_imports:>19.1f}')
+
+
+if __name__ == '__main__':
+    main()
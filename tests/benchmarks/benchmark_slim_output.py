@@ -0,0 +1,141 @@
+"""
+Benchmark of the slim output mode of the FleurParser
+
+Stores the ``output_parameters`` of the default mode and of the slim mode
+(``settings = {'parser_options': {'slim_output': True}}``) for a set of
+output dictionaries and compares the size of the attributes in the database
+and the time for QueryBuilder projections on these nodes.
+
+The output dictionaries are either taken from the ``output_parameters`` of the
+FleurCalculations in a given group (e.g. from an imported archive of a project)
+or constructed from ``tests/files/outxml/all_test/Fe_relax_out.xml`` by repeating all
+array entries to emulate large unit cells.
+
+Usage::
+
+    python benchmark_slim_output.py [--profile PROFILE] [--group LABEL | --natoms N --nodes M]
+
+.. warning::
+    The nodes created by this script are stored in the given profile, use a
+    separate profile for running it.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+OUTXML_FILE = Path(__file__).parent.resolve().parent / 'files' / 'outxml' / 'all_test' / 'Fe_relax_out.xml'
+
+
+def _synthetic_outputs(natoms, nnodes):
+    """
+    Create output dictionaries with the array entries repeated to the given number of atoms
+    """
+    from masci_tools.io.parsers.fleur import outxml_parser
+
+    out_dict = outxml_parser(str(OUTXML_FILE), ignore_validation=True)
+    factor = max(natoms // out_dict['number_of_atoms'], 1)
+
+    def _repeat(value):
+        if isinstance(value, dict):
+            return {key: _repeat(entry) for key, entry in value.items()}
+        if isinstance(value, (list, tuple)):
+            return list(value) * factor
+        return value
+
+    large_dict = _repeat(out_dict)
+    return [large_dict] * nnodes
+
+
+def _group_outputs(label):
+    """
+    Return the output dictionaries of all FleurCalculations in the given group
+    """
+    from aiida import orm
+    from aiida_fleur.parsers.fleur import restore_output_arrays
+
+    qb = orm.QueryBuilder()
+    qb.append(orm.Group, filters={'label': label}, tag='group')
+    qb.append(orm.CalcJobNode,
+              with_group='group',
+              filters={'process_type': 'aiida.calculations:fleur.fleur'},
+              project='*')
+    outputs = []
+    for calc, in qb.iterall():
+        if 'output_parameters' not in calc.outputs:
+            continue
+        output_arrays = calc.outputs.output_arrays if 'output_arrays' in calc.outputs else None
+        outputs.append(restore_output_arrays(calc.outputs.output_parameters, output_arrays))
+    return outputs
+
+
+def _measure(group):
+    """
+    Return the size of the attributes and the time of QueryBuilder projections for the nodes in the group
+    """
+    from aiida import orm
+
+    def _query(project):
+        qb = orm.QueryBuilder()
+        qb.append(orm.Group, filters={'id': group.pk}, tag='group')
+        qb.append(orm.Dict, with_group='group', project=project)
+        start = time.perf_counter()
+        result = qb.all(flat=True)
+        return result, time.perf_counter() - start
+
+    attributes, t_full = _query('attributes')
+    _, t_scalar = _query('attributes.energy_hartree')
+    size = sum(len(json.dumps(attrs)) for attrs in attributes)
+    return size, t_scalar, t_full
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', type=str, default=None, help='AiiDA profile to use')
+    parser.add_argument('--group', type=str, default=None, help='Group with FleurCalculations to take the outputs from')
+    parser.add_argument('--natoms', type=int, default=1000, help='Number of atoms for the synthetic outputs')
+    parser.add_argument('--nodes', type=int, default=200, help='Number of nodes for the synthetic outputs')
+    args = parser.parse_args()
+
+    from aiida import load_profile, orm
+    from aiida_fleur.parsers.fleur import split_output_arrays
+
+    load_profile(args.profile)
+
+    if args.group is not None:
+        outputs = _group_outputs(args.group)
+    else:
+        outputs = _synthetic_outputs(args.natoms, args.nodes)
+
+    label = f'benchmark_slim_output_{time.time():.0f}'
+    full_group = orm.Group(label=f'{label}_full').store()
+    slim_group = orm.Group(label=f'{label}_slim').store()
+
+    start = time.perf_counter()
+    full_group.add_nodes([orm.Dict(out_dict).store() for out_dict in outputs])
+    t_store_full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slim_nodes = []
+    repository_size = 0
+    for out_dict in outputs:
+        slim_dict, arrays = split_output_arrays(out_dict)
+        slim_nodes.append(orm.Dict(slim_dict).store())
+        if arrays is not None:
+            arrays.store()
+            repository_size += sum(arrays.get_array(name).nbytes for name in arrays.get_arraynames())
+    slim_group.add_nodes(slim_nodes)
+    t_store_slim = time.perf_counter() - start
+
+    print(f'{len(outputs)} output dictionaries')
+    print(f"{'mode':>6} {'attributes [MB]':>16} {'arrays [MB]':>12} {'store [s]':>10} {'scalar query [s]':>17} "
+          f"{'full query [s]':>15}")
+    modes = [('full', full_group, t_store_full, 0), ('slim', slim_group, t_store_slim, repository_size)]
+    for mode, group, t_store, arrays_size in modes:
+        size, t_scalar, t_full = _measure(group)
+        print(f'{mode:>6} {size / 1024**2:>16.2f} {arrays_size / 1024**2:>12.2f} {t_store:>10.3f} '
+              f'{t_scalar:>17.4f} {t_full:>15.4f}')
+
+
+if __name__ == '__main__':
+    main()
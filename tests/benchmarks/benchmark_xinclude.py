@@ -0,0 +1,98 @@
+"""
+Benchmark of the resolution of the files included in the ``inp.xml`` of a FleurinpData
+
+Compares the previous implementation of ``FleurinpData._include_files``, which writes
+each included file to a temporary file and rewrites the ``href`` attributes, with
+the resolver serving the files directly from the repository of the node. The files
+from ``tests/files/included_xml_files`` are used. The inp.xml cache is disabled
+and the schema validation is skipped to only measure the parsing and inclusion.
+
+Usage::
+
+    python benchmark_xinclude.py [--profile PROFILE] [--repeat N] [--tmpdir PATH] [--unstored]
+
+With ``--tmpdir`` the temporary files of the previous implementation are created in the
+given directory (e.g. on a shared file system) instead of the default temporary directory.
+With ``--unstored`` the FleurinpData is not stored, so the files are read from the
+sandbox folder instead of the repository of the profile.
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+INCLUDED_FILES_FOLDER = Path(__file__).parent.resolve().parent / 'files' / 'included_xml_files'
+
+
+def _load_inpxml_tempfiles(fleurinp):
+    """
+    Previous implementation: parse the inp.xml and include the files via temporary files
+    """
+    from masci_tools.io.fleur_xml import load_inpxml
+    from masci_tools.util.xml.common_functions import clear_xml, eval_xpath
+
+    with fleurinp.open(path='inp.xml', mode='rb') as inpxmlfile:
+        xmltree, _ = load_inpxml(inpxmlfile)
+
+    temp_files = []
+    for file in fleurinp.files:
+        nodes = eval_xpath(xmltree,
+                           '//xi:include[@href=$filename]',
+                           namespaces={'xi': 'http://www.w3.org/2001/XInclude'},
+                           filename=file,
+                           list_return=True)
+        if not nodes:
+            continue
+        include_content = fleurinp.get_content(file)
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as fo:
+            fo.write(include_content)
+            temp_files.append(fo.name)
+            for node in nodes:
+                node.set('href', fo.name)
+
+    cleared_tree, _ = clear_xml(xmltree)
+    for file in temp_files:
+        os.remove(file)
+    return cleared_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', type=str, default=None, help='AiiDA profile to use')
+    parser.add_argument('--repeat', type=int, default=200, help='Number of times the inp.xml is loaded')
+    parser.add_argument('--tmpdir', type=str, default=None, help='Directory for the temporary files')
+    parser.add_argument('--unstored', action='store_true', help='Do not store the FleurinpData')
+    args = parser.parse_args()
+
+    from aiida import load_profile
+    from lxml import etree
+    from aiida_fleur.data.fleurinp import FleurinpData
+    from aiida_fleur.data.inpxml_cache import INPXML_CACHE
+
+    load_profile(args.profile)
+    if args.tmpdir is not None:
+        tempfile.tempdir = args.tmpdir
+
+    fleurinp = FleurinpData(files=[str(INCLUDED_FILES_FOLDER / name) for name in ('inp.xml', 'kpts.xml', 'sym.xml')])
+    if not args.unstored:
+        fleurinp.store()
+    INPXML_CACHE.enabled = False
+
+    reference = etree.tostring(_load_inpxml_tempfiles(fleurinp))
+    xmltree, _ = fleurinp.load_inpxml(validate_xml_schema=False)
+    assert etree.tostring(xmltree) == reference, 'Different trees produced'
+
+    print(f'Loading {INCLUDED_FILES_FOLDER / "inp.xml"} with included files {args.repeat} times')
+    print(f"{'implementation':>16} {'per load [ms]':>14}")
+    for name, load in (('temporary files', _load_inpxml_tempfiles),
+                       ('resolver', lambda node: node.load_inpxml(validate_xml_schema=False))):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            load(fleurinp)
+        walltime = time.perf_counter() - start
+        print(f'{name:>16} {walltime / args.repeat * 1000:>14.3f}')
+
+
+if __name__ == '__main__':
+    main()
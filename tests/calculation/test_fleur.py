@@ -1,5 +1,6 @@
 """Tests for the `FleurCalculation` class."""
 
+import io
 import os
 import pytest
 from aiida import orm
@@ -56,6 +57,261 @@ def test_fleur_default_calcinfo(aiida_profile, fixture_sandbox, generate_calc_jo
     # file_regression.check(input_written, encoding='utf-8', extension='.in')
 
 
+def test_fleur_gzip_outputs_calcinfo(aiida_profile, fixture_sandbox, generate_calc_job, fixture_code, create_fleurinp):
+    """Test that the gzip_outputs setting compresses the out.xml before retrieval"""
+
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    inputs = {
+        'code': fixture_code(CALC_ENTRY_POINT),
+        'fleurinp': fleurinp,
+        'settings': orm.Dict({'gzip_outputs': True}),
+        'metadata': {
+            'options': {
+                'resources': {
+                    'num_machines': 1
+                },
+                'max_wallclock_seconds': int(60),
+                'withmpi': False
+            }
+        }
+    }
+
+    calc_info = generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    retrieve_list = ['cdn1', 'inp.xml', 'out.error', 'out.xml.gz', 'shell.out', 'usage.json']
+    assert sorted(calc_info.retrieve_list) == sorted(retrieve_list)
+    assert calc_info.append_text == 'if [ -f out.xml ]; then gzip -f out.xml; fi'
+
+
+@pytest.fixture
+def generate_fleur_parent_folder(fixture_localhost, generate_remote_data):
+    """Return a RemoteData of a FleurCalculation with a retrieved folder containing a cdn1 file"""
+
+    def _generate_fleur_parent_folder():
+        from aiida.common.links import LinkType
+
+        remote = generate_remote_data(fixture_localhost, '/tmp/parent_calc', 'fleur.fleur')
+        retrieved = orm.FolderData()
+        retrieved.put_object_from_filelike(io.BytesIO(b'cdn'), 'cdn1')
+        retrieved.base.links.add_incoming(remote.creator, link_type=LinkType.CREATE, link_label='retrieved')
+        retrieved.store()
+        return remote
+
+    return _generate_fleur_parent_folder
+
+
+@pytest.mark.parametrize('symlink_files', (False, True, ['mixing_history*', 'basis.hdf']))
+def test_fleur_symlink_remote_files(aiida_profile, fixture_sandbox, generate_calc_job, fixture_code, create_fleurinp,
+                                    generate_fleur_parent_folder, symlink_files):
+    """Test that the symlink_remote_files setting symlinks the files from the parent folder
+    except the ones fleur modifies in place"""
+
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    parent = generate_fleur_parent_folder()
+    inputs = {
+        'code': fixture_code(CALC_ENTRY_POINT),
+        'fleurinp': fleurinp,
+        'parent_folder': parent,
+        'settings': orm.Dict({
+            'additional_remotecopy_list': ['basis.hdf'],
+            'symlink_remote_files': symlink_files
+        }),
+        'metadata': {
+            'options': {
+                'resources': {
+                    'num_machines': 1
+                },
+                'max_wallclock_seconds': int(60),
+                'withmpi': False
+            }
+        }
+    }
+
+    calc_info = generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    computer_uuid = parent.computer.uuid
+    assert (parent.creator.outputs.retrieved.uuid, 'cdn1', 'cdn1') in calc_info.local_copy_list
+    #The mixing history is always copied
+    if symlink_files:
+        assert calc_info.remote_copy_list == [(computer_uuid, '/tmp/parent_calc/mixing_history*', './')]
+        assert calc_info.remote_symlink_list == [(computer_uuid, '/tmp/parent_calc/basis.hdf', 'basis.hdf')]
+    else:
+        assert calc_info.remote_copy_list == [(computer_uuid, '/tmp/parent_calc/mixing_history*', './'),
+                                              (computer_uuid, '/tmp/parent_calc/basis.hdf', './')]
+        assert calc_info.remote_symlink_list == []
+
+
+@pytest.mark.parametrize('profile,retrieve_list,retrieve_temporary_list', (
+    ('full', ['cdn1', 'inp.xml', 'out.error', 'out.xml', 'shell.out', 'usage.json', 'DOS.*', 'Local.*'], []),
+    ('analysis', ['inp.xml', 'out.xml', 'shell.out', 'DOS.*', 'Local.*'], ['out.error', 'usage.json']),
+    ('restart', ['cdn1', 'inp.xml', 'out.xml', 'shell.out'], ['out.error', 'usage.json']),
+    ('minimal', ['inp.xml', 'out.xml', 'shell.out'], ['out.error', 'usage.json']),
+))
+def test_fleur_retrieve_profile_calcinfo(aiida_profile, fixture_sandbox, generate_calc_job, fixture_code,
+                                         create_fleurinp, profile, retrieve_list, retrieve_temporary_list):
+    """Test the retrieve lists of the different retrieve profiles"""
+    from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+    fm = FleurinpModifier(create_fleurinp(TEST_INP_XML_PATH))
+    fm.set_inpchanges({'dos': True})
+    fleurinp = fm.freeze()
+
+    inputs = {
+        'code': fixture_code(CALC_ENTRY_POINT),
+        'fleurinp': fleurinp,
+        'settings': orm.Dict({'retrieve_profile': profile}),
+        'metadata': {
+            'options': {
+                'resources': {
+                    'num_machines': 1
+                },
+                'max_wallclock_seconds': int(60),
+                'withmpi': False
+            }
+        }
+    }
+
+    calc_info = generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    assert sorted(calc_info.retrieve_list) == sorted(retrieve_list)
+    assert sorted(calc_info.retrieve_temporary_list) == sorted(retrieve_temporary_list)
+
+
+def test_fleur_max_retrieve_size_calcinfo(aiida_profile, fixture_sandbox, generate_calc_job, fixture_code,
+                                          create_fleurinp):
+    """Test that the max_retrieve_size setting moves large files before the retrieval"""
+
+    settings = {'max_retrieve_size': 1000000, 'gzip_outputs': True, 'additional_retrieve_list': [('band/*', '.', 2)]}
+
+    inputs = {
+        'code': fixture_code(CALC_ENTRY_POINT),
+        'fleurinp': create_fleurinp(TEST_INP_XML_PATH),
+        'settings': orm.Dict(settings),
+        'metadata': {
+            'options': {
+                'resources': {
+                    'num_machines': 1
+                },
+                'max_wallclock_seconds': int(60),
+                'withmpi': False
+            }
+        }
+    }
+
+    calc_info = generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    assert calc_info.append_text.split('\n') == [
+        'mkdir -p not_retrieved',
+        "find . -maxdepth 1 -type f \\( -name 'cdn1' \\) -size +1000000c -exec mv {} not_retrieved/ \\;",
+        'if [ -f out.xml ]; then gzip -f out.xml; fi',
+    ]
+    assert ['band/*', '.', 2] in [list(file1) for file1 in calc_info.retrieve_list if not isinstance(file1, str)]
+
+    inputs['settings'] = orm.Dict({'retrieve_profile': 'everything'})
+    with pytest.raises(Exception, match='Unknown retrieve_profile'):
+        generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+
+def test_fleur_steps_calcinfo(aiida_profile, fixture_sandbox, generate_calc_job, fixture_code, create_fleurinp):
+    """Test that follow-up steps are run in subfolders of the same job with the modified inp.xml"""
+    from lxml import etree
+
+    steps = [{
+        'label': 'band',
+        'task_list': [('set_inpchanges', {
+            'changes': {
+                'band': True
+            }
+        })],
+        'cmdline': ['-debugtime']
+    }]
+
+    inputs = {
+        'code': fixture_code(CALC_ENTRY_POINT),
+        'fleurinp': create_fleurinp(TEST_INP_XML_PATH),
+        'steps': orm.List(steps),
+        'settings': orm.Dict({'gzip_outputs': True}),
+        'metadata': {
+            'options': {
+                'resources': {
+                    'num_machines': 1
+                },
+                'max_wallclock_seconds': int(60),
+                'withmpi': True
+            }
+        }
+    }
+
+    calc_info = generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    assert calc_info.append_text.split('\n') == [
+        '# follow-up step band',
+        "if [ -f out.xml ] && { [ ! -s out.error ] || grep -q 'Run finished successfully' out.error; }; then",
+        '    for file in cdn1 n_mmp_mat JUDFT_WARN_ONLY; do if [ -f "$file" ]; then cp "$file" band/; fi; done',
+        "    (cd band && 'mpirun' '-np' '1' '/bin/ls' '-minimalOutput' '-wtime' '1' '-debugtime' "
+        '> shell.out 2> out.error)',
+        'fi',
+        'if [ -f out.xml ]; then gzip -f out.xml; fi',
+    ]
+    assert sorted(calc_info.retrieve_list[-5:]) == [('band/band.gnu', '.', 2), ('band/bands.*', '.', 2),
+                                                    ('band/out.error', '.', 2), ('band/out.xml', '.', 2),
+                                                    ('band/shell.out', '.', 2)]
+
+    with fixture_sandbox.open('band/inp.xml', 'rb') as handle:
+        xmltree = etree.parse(handle)
+    assert xmltree.find('output').get('band') == 'T'
+
+    inputs['steps'] = orm.List([{'label': 'band', 'task_list': []}, {'label': 'band', 'task_list': []}])
+    with pytest.raises(Exception, match='used for more than one step'):
+        generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    inputs['steps'] = orm.List([{'label': 'ldau', 'task_list': [('set_file', {'filename': 'n_mmp_mat'})]}])
+    with pytest.raises(Exception, match='is not supported'):
+        generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+
+@pytest.mark.parametrize('setting,value,remote_path', (
+    ('retrieve_profile', 'minimal', '/tmp/parent_calc/cdn1'),
+    ('max_retrieve_size', 100, '/tmp/parent_calc/not_retrieved/cdn1'),
+))
+def test_fleur_remote_density_calcinfo(aiida_profile, fixture_sandbox, generate_calc_job, fixture_code, create_fleurinp,
+                                       fixture_localhost, setting, value, remote_path):
+    """Test that the charge density is copied from the remote folder, if it was not retrieved on purpose"""
+    from aiida.common.links import LinkType
+
+    creator = orm.CalcJobNode(computer=fixture_localhost, process_type='aiida.calculations:fleur.fleur')
+    creator.set_option('resources', {'num_machines': 1, 'num_mpiprocs_per_machine': 1})
+    parent_settings = orm.Dict({setting: value}).store()
+    creator.base.links.add_incoming(parent_settings, link_type=LinkType.INPUT_CALC, link_label='settings')
+    creator.store()
+
+    remote = orm.RemoteData(remote_path='/tmp/parent_calc', computer=fixture_localhost)
+    remote.base.links.add_incoming(creator, link_type=LinkType.CREATE, link_label='remote_folder')
+    retrieved = orm.FolderData()
+    retrieved.base.links.add_incoming(creator, link_type=LinkType.CREATE, link_label='retrieved')
+    retrieved.store()
+
+    inputs = {
+        'code': fixture_code(CALC_ENTRY_POINT),
+        'fleurinp': create_fleurinp(TEST_INP_XML_PATH),
+        'parent_folder': remote,
+        'metadata': {
+            'options': {
+                'resources': {
+                    'num_machines': 1
+                },
+                'max_wallclock_seconds': int(60),
+                'withmpi': False
+            }
+        }
+    }
+
+    calc_info = generate_calc_job(fixture_sandbox, CALC_ENTRY_POINT, inputs)
+
+    assert (remote.computer.uuid, remote_path, 'cdn1') in calc_info.remote_copy_list
+    assert all(filename != 'cdn1' for _, filename, _ in calc_info.local_copy_list)
+
+
 @pytest.mark.regression_test
 def test_FleurJobCalc_full_mock(fleur_local_code, create_fleurinp, clear_database):  # pylint: disable=redefined-outer-name
     """
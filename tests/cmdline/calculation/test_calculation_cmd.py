@@ -0,0 +1,44 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+'''
+Module to test all CLI calculation commands.
+'''
+import os
+import json
+
+from aiida.common import AttributeDict
+
+inpxmlfilefolder = os.path.dirname(os.path.abspath(__file__))
+SI_INPXML_FILE = os.path.abspath(os.path.join(inpxmlfilefolder, '../../files/inpxml/Si/inp.xml'))
+
+
+def test_cmd_reparse(run_cli_command, fixture_localhost, generate_calc_job_node, create_fleurinp, tmp_path):
+    """Test invoking the calculation reparse command with multiple processes."""
+    from aiida_fleur.cmdline.calculation import reparse
+
+    inputs = AttributeDict({'fleurinp': create_fleurinp(SI_INPXML_FILE), 'metadata': {}})
+    node = generate_calc_job_node('fleur.fleur', fixture_localhost, 'default', inputs, store=True)
+
+    output_file = tmp_path / 'reparsed.jsonl'
+    options = ['--filters', json.dumps({'id': node.pk}), '-n', '2', '-o', str(output_file)]
+    result = run_cli_command(reparse, options=options)
+    assert 'Re-parsed 1 calculations' in result.output
+
+    with open(output_file, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 1
+    assert records[0]['uuid'] == node.uuid
+    assert records[0]['success']
+
+    result = run_cli_command(reparse, options=options)
+    assert '1 skipped' in result.output
+
+    run_cli_command(reparse, options=['--filters', json.dumps({'id': node.pk})], raises=True)
@@ -40,6 +40,8 @@ def test_cmd_fleurinp_list(run_cli_command, create_fleurinp):
     results = run_cli_command(list_fleurinp, options=options)
     assert fleurinp.uuid in results.output
     assert fleurinp2.uuid in results.output
+    assert 'FePt' in results.output
+    assert 'Si2' in results.output
 
 
 def test_cmd_fleurinp_cat(run_cli_command, create_fleurinp):
@@ -61,6 +61,14 @@ def pytest_collection_modifyitems(session, config, items):
     #     item.add_marker(aiida_version_skip)
 
 
+@pytest.fixture(scope='session', autouse=True)
+def validation_cache_folder(tmp_path_factory):
+    """Use a temporary folder for the persistent cache of validated inp.xml files"""
+    from aiida_fleur.data.inpxml_cache import VALIDATION_CACHE
+    VALIDATION_CACHE.folder = tmp_path_factory.mktemp('validated_inpxml')
+    return VALIDATION_CACHE.folder
+
+
 @pytest.fixture(scope='function')
 def fixture_sandbox():
     """Return a `SandboxFolder`."""
@@ -144,6 +144,166 @@ def test_fleurinp_structuredata_extraction(create_fleurinp, inpxmlfilepath):
     #    # Therefore this test might let two much through
 
 
+@pytest.mark.parametrize('inpxmlfilepath', inpxmlfilelist)
+def test_fleurinp_get_summary(create_fleurinp, inpxmlfilepath):
+    """
+    Check that get_summary returns the same information as the single methods
+    and parses the inp.xml only once
+    """
+    from aiida.orm import KpointsData
+
+    fleurinp_tmp = create_fleurinp(inpxmlfilepath)
+
+    load_inpxml = fleurinp_tmp.load_inpxml
+    calls = []
+
+    def _counting_load_inpxml(*args, **kwargs):
+        calls.append(1)
+        return load_inpxml(*args, **kwargs)
+
+    fleurinp_tmp.load_inpxml = _counting_load_inpxml
+    summary = fleurinp_tmp.get_summary()
+    assert len(calls) == 1
+    del fleurinp_tmp.load_inpxml
+
+    assert summary['fleur_modes'] == fleurinp_tmp.get_fleur_modes()
+    assert summary['parameters'].get_dict() == fleurinp_tmp.get_parameterdata_ncf().get_dict()
+
+    if any(folder in inpxmlfilepath for folder in INPXML_LATNAM_DEFINITION):
+        assert summary['structure'] is None
+        assert summary['kpoints'] is None
+        with pytest.raises(ValueError, match='Could not extract Bravais matrix out of inp.xml.'):
+            fleurinp_tmp.get_summary(properties=['structure'])
+    else:
+        assert summary['structure'].get_ase() == fleurinp_tmp.get_structuredata_ncf().get_ase()
+        if any(folder in inpxmlfilepath for folder in INPXML_NO_KPOINTLISTS):
+            assert summary['kpoints'] is None
+        else:
+            assert isinstance(summary['kpoints'], (KpointsData, dict))
+
+    if summary['nkpts'] is not None:
+        assert summary['nkpts'] == fleurinp_tmp.get_nkpts()
+        assert fleurinp_tmp.get_summary(properties=['nkpts']) == {'nkpts': summary['nkpts']}
+    else:
+        with pytest.raises(ValueError):
+            fleurinp_tmp.get_summary(properties=['nkpts'])
+    with pytest.raises(ValueError, match='Unknown properties'):
+        fleurinp_tmp.get_summary(properties=['natoms'])
+
+
+@pytest.mark.parametrize('inpxmlfilepath', inpxmlfilelist)
+def test_fleurinp_inp_summary(create_fleurinp, inpxmlfilepath):
+    """
+    Check the queryable summary attribute against the information extracted from the inp.xml
+    """
+    fleurinp_tmp = create_fleurinp(inpxmlfilepath)
+    inp_summary = fleurinp_tmp.inp_summary
+
+    fleur_modes = fleurinp_tmp.get_fleur_modes()
+    assert inp_summary['fleur_modes'] == fleur_modes
+    assert inp_summary['jspins'] == fleur_modes['jspin']
+    assert inp_summary['noco'] == fleur_modes['noco']
+    assert inp_summary['soc'] == fleur_modes['soc']
+    assert inp_summary['kmax'] == fleurinp_tmp.inp_dict['calculationSetup']['cutoffs']['Kmax']
+
+    if inp_summary['nkpts'] is not None:
+        assert inp_summary['nkpts'] == fleurinp_tmp.get_nkpts()
+
+    if not any(folder in inpxmlfilepath for folder in INPXML_LATNAM_DEFINITION):
+        structure = fleurinp_tmp.get_structuredata_ncf()
+        assert inp_summary['formula'] == structure.get_formula()
+        assert inp_summary['natoms'] == len(structure.sites)
+    else:
+        assert inp_summary['natoms'] > 0
+
+
+def test_fleurinp_inp_summary_query(create_fleurinp):
+    """
+    Check that FleurinpData nodes can be filtered by the summary attribute
+    """
+    from aiida.orm import QueryBuilder
+    from aiida_fleur.data.fleurinp import FleurinpData
+
+    fleurinp = create_fleurinp(os.path.join(inpxmlfilefolder_valid, 'Si/inp.xml'))
+    fleurinp.store()
+
+    qb = QueryBuilder()
+    qb.append(FleurinpData,
+              filters={
+                  'id': fleurinp.pk,
+                  'attributes.inp_summary.natoms': 2,
+                  'attributes.inp_summary.fleur_modes.noco': False
+              },
+              project=['attributes.inp_summary.formula', 'attributes.inp_summary.nkpts'])
+    assert qb.all() == [[fleurinp.inp_summary['formula'], fleurinp.inp_summary['nkpts']]]
+
+
+def test_fleurinp_fleur_modes_attribute(create_fleurinp, monkeypatch):
+    """
+    Check that the fleur modes are read from the attribute and only parsed for nodes without it
+    """
+    from aiida_fleur.data.fleurinp import FleurinpData
+
+    fleurinp = create_fleurinp(os.path.join(inpxmlfilefolder_valid, 'Si/inp.xml'))
+    fleur_modes = fleurinp.get_fleur_modes()
+
+    def _load_inpxml(self, *args, **kwargs):
+        raise AssertionError('inp.xml should not be loaded')
+
+    with monkeypatch.context() as m:
+        m.setattr(FleurinpData, 'load_inpxml', _load_inpxml)
+        assert fleurinp.fleur_modes == fleur_modes
+
+    #Nodes created before the attribute was introduced
+    fleurinp.base.attributes.delete('inp_summary')
+    assert fleurinp.fleur_modes == fleur_modes
+
+
+def test_fleurinp_read_inp_version():
+    """
+    Check that the version of the inp.xml is read from the root element without
+    parsing the rest of the file
+    """
+    import io
+    from aiida_fleur.data.fleurinp import _read_inp_version
+
+    header = b'<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n<!-- comment -->\n'
+    assert _read_inp_version(io.BytesIO(header + b'<fleurInput fleurInputVersion="0.34">\n<broken <<<')) == '0.34'
+    assert _read_inp_version(io.BytesIO(header + b'<fleurInput>\n</fleurInput>')) is None
+    assert _read_inp_version(io.BytesIO(b'no xml file')) is None
+
+    with open(os.path.join(inpxmlfilefolder_valid, 'Si/inp.xml'), 'rb') as inpxmlfile:
+        assert _read_inp_version(inpxmlfile) == '0.35'
+
+
+def test_fleurinp_set_file_from_node(create_fleurinp):
+    """
+    Check that files are copied from the repository of another node, also with a
+    different destination name and if the source node is stored
+    """
+    import io
+    from aiida.orm import FolderData
+
+    inpxml_path = os.path.join(inpxmlfilefolder_valid, 'Si/inp.xml')
+    content = bytes(range(256)) * 4096
+
+    folder = FolderData()
+    folder.base.repository.put_object_from_file(inpxml_path, 'inp.xml')
+    folder.base.repository.put_object_from_filelike(io.BytesIO(content), 'cdn1')
+    folder.store()
+
+    fleurinp = create_fleurinp(inpxml_path)
+    fleurinp.set_file('cdn1', node=folder.pk, dst_filename='cdn_last')
+    assert fleurinp.files == ['inp.xml', 'cdn_last']
+    assert fleurinp.base.repository.get_object_content('cdn_last', mode='rb') == content
+
+    fleurinp.set_file('inp.xml', node=folder)
+    assert fleurinp.inp_version == '0.35'
+
+    with pytest.raises(ValueError, match='has to be present in the specified node'):
+        fleurinp.set_file('cdn.hdf', node=folder)
+
+
 # Input Modification tests
 @pytest.mark.parametrize('inpxmlfilepath', inpxmlfilelist)
 def test_fleurinp_single_value_modification(create_fleurinp, inpxmlfilepath):
@@ -194,6 +354,29 @@ expected_files_list = [{'inp.xml'}, {'inp.xml'}, {'inp.xml', 'kpts.xml', 'sym.xm
                        {'inp.xml', 'relax.xml'}]
 
 
+def test_fleurinp_included_files_from_repository(create_fleurinp, monkeypatch):
+    """
+    Test that the files included in the inp.xml are read from the repository
+    of the node without creating temporary files
+    """
+    import tempfile
+
+    def _no_tempfile(*args, **kwargs):
+        raise AssertionError('No temporary files should be created')
+
+    monkeypatch.setattr(tempfile, 'NamedTemporaryFile', _no_tempfile)
+
+    folder = os.path.abspath(os.path.join(inpxmlfilefolder, '../files/included_xml_files'))
+    fleurinp = create_fleurinp(os.path.join(folder, 'inp.xml'),
+                               additional_files=[os.path.join(folder, 'kpts.xml'),
+                                                 os.path.join(folder, 'sym.xml')])
+
+    xmltree, _, included_tags = fleurinp.load_inpxml(return_included_tags=True)
+    assert included_tags == {'kPointLists', 'symmetryOperations'}
+    assert not xmltree.xpath('//xi:include', namespaces={'xi': 'http://www.w3.org/2001/XInclude'})
+    assert fleurinp.get_nkpts() == 35
+
+
 @pytest.mark.parametrize('folderpath,expected_files', zip(folderlist, expected_files_list))
 def test_get_fleurinp_from_folder_data(folderpath, expected_files):
     from aiida import orm
@@ -78,7 +78,8 @@ def test_fleurinp_modifier_regression(create_fleurinp, file_regression):
     file_regression.check(new_fleurinp.get_content('inp.xml'), extension='.xml')
 
 
-def test_fleurinp_modifier_included_files(create_fleurinp, inpxml_etree, file_regression):
+@pytest.mark.parametrize('persistent', [False, True])
+def test_fleurinp_modifier_included_files(create_fleurinp, inpxml_etree, file_regression, persistent):
     """Tests if fleurinp_modifier with various other modifations methods,
     the detailed tests for method functionality is tested elsewhere."""
 
@@ -91,7 +92,7 @@ def test_fleurinp_modifier_included_files(create_fleurinp, inpxml_etree, file_re
 
     fleurinp_tmp = create_fleurinp(INPXML_FILE, additional_files=[KPTSXML_FILE, SYMXML_FILE])
 
-    fm = FleurinpModifier(fleurinp_tmp)
+    fm = FleurinpModifier(fleurinp_tmp, persistent=persistent)
     #Modify main inp.xml file
     fm.set_inpchanges({'dos': True, 'Kmax': 3.9})
     fm.shift_value({'Kmax': 0.1}, 'rel')
@@ -117,7 +118,7 @@ def test_fleurinp_modifier_included_files(create_fleurinp, inpxml_etree, file_re
         new_fleurinp.get_content('sym.xml')
     ]
 
-    file_regression.check('\n'.join(file_content), extension='.xml')
+    file_regression.check('\n'.join(file_content), extension='.xml', basename='test_fleurinp_modifier_included_files')
 
 
 #For this test we need a input file with defined LDA+U procedures
@@ -127,11 +128,12 @@ inpxmlfilefolder2 = os.path.dirname(os.path.abspath(__file__))
 inpxmlfilefolder2 = os.path.abspath(os.path.join(inpxmlfilefolder2, file_path2))
 
 
-def test_fleurinp_modifier_set_nmmpmat(create_fleurinp):
+@pytest.mark.parametrize('persistent', [False, True])
+def test_fleurinp_modifier_set_nmmpmat(create_fleurinp, persistent):
     """Tests if set_nmmpmat works on fleurinp modifier works, with right interface"""
     fleurinp_tmp = create_fleurinp(inpxmlfilefolder2)
 
-    fm = FleurinpModifier(fleurinp_tmp)
+    fm = FleurinpModifier(fleurinp_tmp, persistent=persistent)
     fm.set_nmmpmat('Ga-1', orbital=2, spin=1, state_occupations=[1, 2, 3, 4, 5])
     fm.set_nmmpmat('As-2', orbital=1, spin=1, denmat=[[1, -2, 3], [4, -5, 6], [7, -8, 9]])
 
@@ -241,6 +243,196 @@ def test_fleurinpmodifier_error_messages(create_fleurinp):
     fm = FleurinpModifier(fleurinp_tmp)
 
 
+def test_fleurinpmodifier_validation_cache(create_fleurinp):
+    """Test that the content validated by validate() is not validated again by freeze()"""
+    from aiida_fleur.data.inpxml_cache import VALIDATION_CACHE
+
+    fleurinp_tmp = create_fleurinp(inpxmlfilefolder)
+
+    fm = FleurinpModifier(fleurinp_tmp)
+    fm.set_inpchanges({'dos': True, 'Kmax': 3.71})
+    fm.validate()
+    stats = VALIDATION_CACHE.stats()
+    new_fleurinp = fm.freeze()
+
+    assert VALIDATION_CACHE.stats()['hits'] > stats['hits']
+    assert VALIDATION_CACHE.stats()['misses'] == stats['misses']
+    assert new_fleurinp.inp_dict['calculationSetup']['cutoffs']['Kmax'] == 3.71
+
+    fm = FleurinpModifier(fleurinp_tmp)
+    fm.xml_create_tag('/fleurInput/calculationSetup', 'notAValidTag')
+    with pytest.raises(ValueError, match='Changes were not valid'):
+        fm.validate(force_validation=True)
+
+
+def test_fleurinpmodifier_persistent(create_fleurinp, monkeypatch):
+    """Test that the persistent FleurinpModifier parses the inp.xml once and only applies new tasks"""
+    from aiida_fleur.data.fleurinp import FleurinpData
+
+    fleurinp_tmp = create_fleurinp(inpxmlfilefolder)
+
+    loads = []
+    load_inpxml = FleurinpData.load_inpxml
+
+    def _counting_load_inpxml(self, *args, **kwargs):
+        loads.append(self.uuid)
+        return load_inpxml(self, *args, **kwargs)
+
+    applied = []
+    apply_xml_tasks = FleurinpModifier._apply_xml_tasks.__func__
+
+    def _counting_apply_xml_tasks(cls, xmltree, nmmp_lines, schema_dict, modification_tasks):
+        applied.extend(task.name for task in modification_tasks)
+        return apply_xml_tasks(cls, xmltree, nmmp_lines, schema_dict, modification_tasks)
+
+    monkeypatch.setattr(FleurinpData, 'load_inpxml', _counting_load_inpxml)
+    monkeypatch.setattr(FleurinpModifier, '_apply_xml_tasks', classmethod(_counting_apply_xml_tasks))
+
+    fm = FleurinpModifier(fleurinp_tmp, persistent=True)
+    fm.set_inpchanges({'dos': True, 'Kmax': 3.9})
+    fm.validate()
+    fm.shift_value({'Kmax': 0.1}, 'abs')
+    xmltree = fm.show(display=False, validate=True)
+    assert float(xmltree.find('calculationSetup/cutoffs').get('Kmax')) == pytest.approx(4.0)
+    assert len(loads) == 1
+    assert applied == ['set_inpchanges', 'shift_value']
+
+    #Removing tasks rebuilds the tree
+    fm.undo()
+    xmltree = fm.show(display=False)
+    assert float(xmltree.find('calculationSetup/cutoffs').get('Kmax')) == pytest.approx(3.9)
+    assert len(loads) == 2
+
+    loads.clear()
+    new_fleurinp = fm.freeze()
+    assert loads == [new_fleurinp.uuid]  #Only the new inp.xml is loaded when it is added
+    assert new_fleurinp.inp_dict['calculationSetup']['cutoffs']['Kmax'] == 3.9
+    assert new_fleurinp.inp_dict['output']['dos']
+    assert new_fleurinp.creator.inputs.original.uuid == fleurinp_tmp.uuid
+
+    #Only the task list is an input of the calcfunction
+    assert set(new_fleurinp.creator.inputs) == {'original', 'modifications'}
+
+    #The modifier can still be used after freeze
+    fm.set_inpchanges({'itmax': 3})
+    new_fleurinp = fm.freeze()
+    assert new_fleurinp.inp_dict['calculationSetup']['scfLoop']['itmax'] == 3
+    assert new_fleurinp.inp_dict['calculationSetup']['cutoffs']['Kmax'] == 3.9
+
+
+def test_fleurinpmodifier_persistent_session_mismatch(create_fleurinp, monkeypatch):
+    """Test that the tree of a persistent session is only used if its tasks match the task list of the inputs"""
+    from aiida_fleur.data import fleurinpmodifier
+
+    fleurinp_tmp = create_fleurinp(inpxmlfilefolder)
+
+    fm = FleurinpModifier(fleurinp_tmp, persistent=True)
+    fm.set_inpchanges({'itmax': 3})
+    fm.show(display=False)
+
+    #Simulate a session, which is out of sync with the task list passed to the calcfunction
+    update_session = FleurinpModifier._update_session
+
+    def _outdated_session(self):
+        session = update_session(self)
+        session.tasks = session.tasks[:-1]
+        session.xmltree.find('calculationSetup/cutoffs').set('Kmax', '1.0')
+        return session
+
+    monkeypatch.setattr(FleurinpModifier, '_update_session', _outdated_session)
+    fm.set_inpchanges({'Kmax': 3.9})
+    new_fleurinp = fm.freeze()
+
+    assert new_fleurinp.inp_dict['calculationSetup']['scfLoop']['itmax'] == 3
+    assert new_fleurinp.inp_dict['calculationSetup']['cutoffs']['Kmax'] == 3.9
+    assert not fleurinpmodifier._FROZEN_SESSIONS
+
+
+def test_fleurinpmodifier_freeze_batch(create_fleurinp, monkeypatch):
+    """Test that freeze_batch creates all variants in one calcfunction and parses the original once"""
+    from aiida_fleur.data.fleurinp import FleurinpData
+
+    fleurinp_tmp = create_fleurinp(inpxmlfilefolder)
+    fleurinp_tmp.store()
+
+    loads = []
+    load_inpxml = FleurinpData.load_inpxml
+
+    def _counting_load_inpxml(self, *args, **kwargs):
+        loads.append(self.uuid)
+        return load_inpxml(self, *args, **kwargs)
+
+    monkeypatch.setattr(FleurinpData, 'load_inpxml', _counting_load_inpxml)
+
+    variants = []
+    for itmax in (1, 2, 3):
+        fm = FleurinpModifier()
+        fm.set_inpchanges({'itmax': itmax})
+        variants.append(fm)
+    fm = FleurinpModifier(fleurinp_tmp)
+    fm.set_inpchanges({'Kmax': 3.9})
+    variants.append(fm.task_list)
+
+    new_fleurinps = FleurinpModifier.freeze_batch(fleurinp_tmp, variants)
+
+    assert len(new_fleurinps) == 4
+    assert loads.count(fleurinp_tmp.uuid) == 1
+    assert [fleurinp.inp_dict['calculationSetup']['scfLoop']['itmax'] for fleurinp in new_fleurinps] == [1, 2, 3, 15]
+    assert new_fleurinps[3].inp_dict['calculationSetup']['cutoffs']['Kmax'] == 3.9
+
+    creator = new_fleurinps[0].creator
+    assert all(fleurinp.creator.uuid == creator.uuid for fleurinp in new_fleurinps)
+    assert creator.inputs.original.uuid == fleurinp_tmp.uuid
+    assert all(fleurinp.is_stored for fleurinp in new_fleurinps)
+
+    with pytest.raises(ValueError, match='No variants given'):
+        FleurinpModifier.freeze_batch(fleurinp_tmp, [])
+
+    other = FleurinpModifier(create_fleurinp(inpxmlfilefolder))
+    other.set_inpchanges({'itmax': 1})
+    with pytest.raises(ValueError, match='have to be based on the given original'):
+        FleurinpModifier.freeze_batch(fleurinp_tmp, [other])
+
+
+def test_fleurinpmodifier_freeze_deduplicate(create_fleurinp):
+    """Test that freeze(deduplicate=True) returns existing FleurinpData for the same original content and tasks"""
+    from aiida_fleur.data.fleurinpmodifier import FINGERPRINT_EXTRA_KEY, get_modification_fingerprint
+
+    fleurinp_tmp = create_fleurinp(inpxmlfilefolder)
+    fleurinp_tmp.store()
+
+    fm = FleurinpModifier(fleurinp_tmp)
+    fm.set_inpchanges({'itmax': 7, 'Kmax': 3.9})
+    new_fleurinp = fm.freeze()
+    assert new_fleurinp.base.extras.get(FINGERPRINT_EXTRA_KEY) == get_modification_fingerprint(fleurinp_tmp, fm._tasks)
+
+    #Same content of the original and same tasks (in a different order of the keys)
+    fleurinp_copy = create_fleurinp(inpxmlfilefolder)
+    fleurinp_copy.store()
+    fm = FleurinpModifier(fleurinp_copy, persistent=True)
+    fm.set_inpchanges({'Kmax': 3.9, 'itmax': 7})
+    assert fm.freeze(deduplicate=True).uuid == new_fleurinp.uuid
+    assert fm.freeze().uuid != new_fleurinp.uuid
+
+    fm.set_inpchanges({'itmax': 8})
+    other_fleurinp = fm.freeze(deduplicate=True)
+    assert other_fleurinp.uuid != new_fleurinp.uuid
+    assert other_fleurinp.inp_dict['calculationSetup']['scfLoop']['itmax'] == 8
+
+    #Only the missing variants are created
+    variants = []
+    for itmax in (7, 9):
+        fm = FleurinpModifier()
+        fm.set_inpchanges({'itmax': itmax, 'Kmax': 3.9})
+        variants.append(fm)
+    batch_fleurinps = FleurinpModifier.freeze_batch(fleurinp_tmp, variants, deduplicate=True)
+    assert batch_fleurinps[0].uuid == new_fleurinp.uuid
+    assert batch_fleurinps[1].inp_dict['calculationSetup']['scfLoop']['itmax'] == 9
+
+    assert FleurinpModifier.freeze_batch(fleurinp_tmp, variants[1:],
+                                         deduplicate=True)[0].uuid == batch_fleurinps[1].uuid
+
+
 def test_fleurinpmodifier_element_serialization(create_fleurinp):
     """Tests of fleurinpmodifier registration methods accepting etree.Elements as arguments
     If any of these don't serialize the elements correctly you will see an error that etree.fromstring
@@ -0,0 +1,201 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+'''
+Contains tests for the cache of parsed inp.xml trees of FleurinpData
+'''
+import os
+import pytest
+
+from aiida_fleur.data.inpxml_cache import INPXML_CACHE, VALIDATION_CACHE, InpxmlTreeCache, InpxmlValidationCache
+
+TEST_INP_XML_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '../files/inpxml/Si/inp.xml'))
+
+
+@pytest.fixture
+def clear_inpxml_cache():
+    """Start with an empty inp.xml cache"""
+    INPXML_CACHE.clear()
+    yield
+    INPXML_CACHE.clear()
+
+
+def test_load_inpxml_cached(create_fleurinp, clear_inpxml_cache):
+    """
+    Test that the tree of a stored FleurinpData is only parsed once and that
+    copies are returned
+    """
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    fleurinp.store()
+    INPXML_CACHE.clear()
+
+    xmltree, schema_dict = fleurinp.load_inpxml()
+    assert INPXML_CACHE.stats()['misses'] == 1
+    assert INPXML_CACHE.stats()['entries'] == 1
+
+    #Modifications of the returned tree do not change the cached tree
+    xmltree.getroot().clear()
+    xmltree2, schema_dict2 = fleurinp.load_inpxml()
+    assert INPXML_CACHE.stats()['hits'] == 1
+    assert schema_dict2 is schema_dict
+    assert xmltree2.getroot().tag == 'fleurInput'
+    assert len(xmltree2.getroot()) > 0
+
+    fleurinp.get_fleur_modes()
+    fleurinp.get_nkpts()
+    assert INPXML_CACHE.stats()['hits'] == 3
+
+    #Different keyword arguments for the parser are cached separately
+    fleurinp.load_inpxml(remove_blank_text=True)
+    assert INPXML_CACHE.stats()['misses'] == 2
+
+
+def test_load_inpxml_cache_invalidation(create_fleurinp, clear_inpxml_cache, tmp_path):
+    """
+    Test that changing the files of an unstored FleurinpData invalidates the cache
+    """
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    xmltree, _ = fleurinp.load_inpxml()
+    assert xmltree.find('calculationSetup/scfLoop').get('itmax') == '15'
+
+    content = fleurinp.get_content('inp.xml')
+    changed_path = tmp_path / 'inp.xml'
+    changed_path.write_text(content.replace('itmax="15"', 'itmax="3"'), encoding='utf-8')
+    fleurinp.set_file(str(changed_path))
+
+    xmltree, _ = fleurinp.load_inpxml()
+    assert xmltree.find('calculationSetup/scfLoop').get('itmax') == '3'
+    assert fleurinp.inp_dict['calculationSetup']['scfLoop']['itmax'] == 3
+
+
+def test_load_inpxml_cache_unstored(create_fleurinp, clear_inpxml_cache, monkeypatch):
+    """
+    Test that the cache entries of unstored FleurinpData do not hash the content of the repository
+    """
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    INPXML_CACHE.clear()
+
+    def _fail(self):
+        raise AssertionError('The repository should not be hashed')
+
+    monkeypatch.setattr(type(fleurinp.base.repository), 'hash', _fail)
+    fleurinp.load_inpxml()
+    fleurinp.load_inpxml()
+    assert INPXML_CACHE.stats()['misses'] == 1
+    assert INPXML_CACHE.stats()['hits'] == 1
+
+
+def test_inpxml_tree_cache_limits(create_fleurinp):
+    """
+    Test that the LRU cache removes the oldest entries when the limits are exceeded
+    """
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    xmltree, schema_dict = fleurinp.load_inpxml()
+
+    cache = InpxmlTreeCache(max_entries=2)
+    for index in range(3):
+        cache.put(cache.make_key(f'uuid{index}', 'hash'), xmltree, schema_dict, set())
+    assert cache.stats()['entries'] == 2
+    assert cache.get(cache.make_key('uuid0', 'hash')) is None
+    assert cache.get(cache.make_key('uuid2', 'hash')) is not None
+
+    cache = InpxmlTreeCache(max_memory=1)
+    cache.put(cache.make_key('uuid', 'hash'), xmltree, schema_dict, set())
+    assert cache.stats()['entries'] == 0
+
+    cache = InpxmlTreeCache()
+    cache.enabled = False
+    cache.put(cache.make_key('uuid', 'hash'), xmltree, schema_dict, set())
+    assert cache.get(cache.make_key('uuid', 'hash')) is None
+
+
+@pytest.fixture
+def count_validations(monkeypatch):
+    """Count the calls to the schema validation"""
+    from masci_tools.io.parsers.fleur_schema import InputSchemaDict
+
+    calls = []
+    validate = InputSchemaDict.validate
+
+    def _counting_validate(self, *args, **kwargs):
+        calls.append(1)
+        return validate(self, *args, **kwargs)
+
+    monkeypatch.setattr(InputSchemaDict, 'validate', _counting_validate)
+    return calls
+
+
+def test_validation_cache_load_inpxml(create_fleurinp, clear_inpxml_cache, count_validations):
+    """
+    Test that the validation of identical inp.xml content is only done once
+    and can be forced
+    """
+    VALIDATION_CACHE.clear()
+
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    assert VALIDATION_CACHE.stats() == {'hits': 0, 'misses': 1}
+
+    #Loading the same content again (e.g. in another process) skips the validation
+    INPXML_CACHE.clear()
+    nvalidations = len(count_validations)
+    fleurinp.load_inpxml()
+    assert len(count_validations) == nvalidations
+    assert VALIDATION_CACHE.stats() == {'hits': 1, 'misses': 1}
+
+    fleurinp.load_inpxml(force_validation=True)
+    assert len(count_validations) == nvalidations + 1
+
+    fleurinp.load_inpxml(validate_xml_schema=False, remove_blank_text=True)
+    assert len(count_validations) == nvalidations + 1
+
+
+def test_validation_cache_key(create_fleurinp):
+    """
+    Test that the key of the validation cache does not depend on the formatting
+    """
+    from lxml import etree
+
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    xmltree, schema_dict = fleurinp.load_inpxml()
+    xmltree_compact, _ = fleurinp.load_inpxml(remove_blank_text=True)
+    key = InpxmlValidationCache.make_key(xmltree, schema_dict)
+
+    assert InpxmlValidationCache.make_key(xmltree_compact, schema_dict) == key
+
+    xmltree.getroot().insert(0, etree.Comment('comment'))
+    assert InpxmlValidationCache.make_key(xmltree, schema_dict) == key
+
+    xmltree.find('calculationSetup/scfLoop').set('itmax', '3')
+    assert InpxmlValidationCache.make_key(xmltree, schema_dict) != key
+
+
+def test_validation_cache_invalid(tmp_path, create_fleurinp):
+    """
+    Test that failed validations are not recorded and that the cache can be disabled
+    """
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    xmltree, schema_dict = fleurinp.load_inpxml()
+
+    cache = InpxmlValidationCache(tmp_path / 'cache')
+    cache.validate(xmltree, schema_dict)
+    assert cache.stats() == {'hits': 0, 'misses': 1}
+    cache.validate(xmltree, schema_dict)
+    assert cache.stats() == {'hits': 1, 'misses': 1}
+
+    xmltree.find('calculationSetup/scfLoop').set('itmax', 'not_a_number')
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.validate(xmltree, schema_dict)
+    assert cache.stats() == {'hits': 1, 'misses': 3}
+
+    cache.clear()
+    cache.enabled = False
+    assert not cache.is_validated(cache.make_key(xmltree, schema_dict))
@@ -27,6 +27,153 @@ def test_fleurparse_relax_file(test_file):
     assert result.get_dict() != {}  #pylint: disable=use-implicit-booleaness-not-comparison
 
 
+def test_fleurparse_relax_file_incremental():
+    """Test that only the new steps of a relax.xml are parsed if the previous history is given"""
+    from aiida_fleur.parsers.fleur import parse_relax_file, _parse_relax_file_incremental
+    from masci_tools.io.parsers.fleur_schema import InputSchemaDict
+
+    schema_dict = InputSchemaDict.fromVersion('0.34')
+    with open(os.path.join(aiida_path, '../tests/parsers/fixtures/fleur/relax/relax.xml'), 'rb') as relaxfile:
+        full = parse_relax_file(relaxfile, schema_dict).get_dict()
+
+        previous = {
+            'displacements': [],
+            'energies': full['energies'][:-1],
+            'posforces': full['posforces'][:-1],
+        }
+        assert _parse_relax_file_incremental(relaxfile, schema_dict, previous) == full
+        assert parse_relax_file(relaxfile, schema_dict, previous_relax=previous).get_dict() == full
+
+        #History not matching the file falls back to parsing the whole file
+        previous['energies'] = [energy + 1.0 for energy in previous['energies']]
+        assert _parse_relax_file_incremental(relaxfile, schema_dict, previous) is None
+        assert parse_relax_file(relaxfile, schema_dict, previous_relax=previous).get_dict() == full
+
+
+def test_fleurparse_convergence_arrays(test_file):
+    """Test if the per-iteration convergence information is extracted from an out.xml"""
+    from aiida_fleur.parsers.fleur import parse_convergence_arrays
+    from aiida.orm import ArrayData
+
+    with open(test_file('outxml/all_test/FePt_out.xml'), 'rb') as outfile:
+        result = parse_convergence_arrays(outfile)
+    assert isinstance(result, ArrayData)
+    assert set(result.get_arraynames()) == {'energy_hartree', 'density_convergence'}
+    assert result.get_array('energy_hartree').shape == result.get_array('density_convergence').shape
+    assert result.get_array('energy_hartree')[0] == pytest.approx(-38166.5434176917)
+    assert result.get_array('density_convergence')[0] == pytest.approx(61.1110641131)
+
+    with open(test_file('outxml/all_test/Fe_relax_out.xml'), 'rb') as outfile:
+        result = parse_convergence_arrays(outfile)
+    assert result.get_array('force_atoms').shape == (1, 2, 3)
+    assert math.isnan(result.get_array('density_convergence')[0])
+
+    with open(test_file('outxml/all_test/mae_FT_out.xml'), 'rb') as outfile:
+        assert parse_convergence_arrays(outfile) is None
+
+
+def test_fleurparse_convergence_arrays_ldau(test_file, monkeypatch):
+    """Test that the LDA+U distances are padded with NaN for the iterations before the first distance"""
+    from masci_tools.io.parsers.fleur import outxml_parser
+    import aiida_fleur.parsers.fleur as fleur_parser
+
+    def _outxml_parser_with_distances(*args, **kwargs):
+        output_dict = outxml_parser(*args, **kwargs)
+        #The distance of the density matrix is only written from the third iteration on
+        n_iter = len(output_dict['energy_hartree'])
+        output_dict['ldau_info'] = {'density_matrix_distance': [0.1 * i for i in range(n_iter - 2)]}
+        return output_dict
+
+    monkeypatch.setattr(fleur_parser, 'outxml_parser', _outxml_parser_with_distances)
+
+    with open(test_file('outxml/all_test/GaAs_LDAU_out.xml'), 'rb') as outfile:
+        result = fleur_parser.extract_convergence_arrays(outfile)
+
+    n_iter = len(result['energy_hartree'])
+    assert result['nmmp_distance'].shape == (n_iter, 1)
+    assert all(math.isnan(dist) for dist in result['nmmp_distance'][:2, 0])
+    assert result['nmmp_distance'][2:, 0].tolist() == pytest.approx([0.1 * i for i in range(n_iter - 2)])
+
+
+@pytest.mark.parametrize('filename', ['FePt_out.xml', 'Fe_relax_out.xml', 'mae_FT_out.xml', 'GaAs_LDAU_out.xml'])
+def test_fleurparse_split_output_arrays(test_file, filename):
+    """Test that the array entries are moved to an ArrayData and can be restored"""
+    import json
+    import numpy as np
+    from masci_tools.io.parsers.fleur import outxml_parser
+    from aiida_fleur.parsers.fleur import split_output_arrays, restore_output_arrays
+
+    out_dict = outxml_parser(test_file(f'outxml/all_test/{filename}'), ignore_validation=True)
+    slim_dict, output_arrays = split_output_arrays(out_dict, min_size=1)
+
+    for key in slim_dict.get('slim_output_arrays', {}):
+        assert key.split('.')[0] in out_dict
+    #Only non numeric lists (e.g. strings) stay in the dictionary
+    for value in slim_dict.values():
+        if isinstance(value, list) and value:
+            try:
+                array = np.array(value)
+            except ValueError:  #Inhomogeneous lists
+                continue
+            assert array.dtype.kind not in 'biuf'
+
+    assert json.loads(json.dumps(restore_output_arrays(slim_dict, output_arrays))) == json.loads(json.dumps(out_dict))
+
+    #With the default threshold small lists stay in the dictionary
+    slim_dict, output_arrays = split_output_arrays(out_dict)
+    for key, value in slim_dict.items():
+        if key in out_dict and isinstance(value, list):
+            assert value == out_dict[key]
+    for entry in slim_dict.get('slim_output_arrays', {}).values():
+        assert output_arrays.get_array(entry['array']).size >= 100
+    assert json.loads(json.dumps(restore_output_arrays(slim_dict, output_arrays))) == json.loads(json.dumps(out_dict))
+
+
+def test_get_output_res(fixture_localhost, generate_calc_job_node):
+    """Test the attribute access to the full output parameters of the slim output mode"""
+    from aiida.common.links import LinkType
+    from aiida_fleur.parsers.fleur import split_output_arrays, get_output_res
+
+    out_dict = {'energy_hartree': -1.0, 'magnetic_moments': [2.0, 2.1], 'force_largest': list(range(200))}
+    slim_dict, output_arrays = split_output_arrays(out_dict)
+    assert slim_dict['magnetic_moments'] == [2.0, 2.1]
+    assert 'force_largest' not in slim_dict
+
+    node = generate_calc_job_node('fleur.fleur', fixture_localhost)
+    node.store()
+    orm.Dict(slim_dict).store().base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
+    output_arrays.store().base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_arrays')
+
+    res = get_output_res(node)
+    assert res.magnetic_moments == node.res.magnetic_moments
+    assert res.force_largest == list(range(200))
+    assert res.energy_hartree == -1.0
+
+    #Namespace of outputs exposed by a workchain (e.g. scf.outputs.last_calc)
+    exposed = AttributeDict({
+        'output_parameters': node.outputs.output_parameters,
+        'output_arrays': node.outputs.output_arrays
+    })
+    res = get_output_res(exposed)
+    assert res.force_largest == list(range(200))
+
+
+def test_fleurparse_memory_available(test_file):
+    """Test that the available memory is found in the header of the out.xml"""
+    from aiida_fleur.parsers.fleur import parse_memory_available
+
+    with open(test_file('outxml/all_test/Fe_relax_out.xml'), encoding='utf-8') as outfile:
+        assert parse_memory_available(outfile) == 24676972
+
+    #Tag split between two chunks
+    with open(test_file('outxml/all_test/Fe_relax_out.xml'), encoding='utf-8') as outfile:
+        assert parse_memory_available(outfile, chunk_size=7) == 24676972
+
+    #No memory information before the first iteration
+    with open(test_file('outxml/BeTi_out.xml'), encoding='utf-8') as outfile:
+        assert parse_memory_available(outfile) is None
+
+
 # test the full parser itself. on all kinds of different output files.
 
 # test if the right aiida datastructures are produced for different output
@@ -67,12 +214,133 @@ def test_fleur_parser_default_full(fixture_localhost, generate_parser, generate_
     assert 'output_params_complex' not in results
     assert 'relax_parameters' not in results
     assert 'error_params' not in results
+    assert 'output_convergence' in results
+    n_iterations = results['output_parameters']['number_of_iterations_total']
+    assert results['output_convergence'].get_array('energy_hartree').shape == (n_iterations,)
+    timing = results['output_parameters']['parser_timing']
+    assert set(timing['walltime_stages'].keys()) == {'error_file', 'outxml'}
+    fixture_folder = os.path.join(aiida_path, '../tests/parsers/fixtures/fleur/default')
+    assert timing['bytes_read']['out.xml'] == os.path.getsize(os.path.join(fixture_folder, 'out.xml'))
+    assert timing['bytes_read']['out.error'] == os.path.getsize(os.path.join(fixture_folder, 'out.error'))
 
     data_regression.check({
         'output_parameters': clean_outdict_for_reg_dump(results['output_parameters'].get_dict()),
     })
 
 
+def test_fleur_parser_gzip_outxml(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp):
+    """
+    Test that a compressed out.xml (retrieved with the gzip_outputs setting)
+    gives the same results as the uncompressed file
+    """
+    import json
+
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+
+    results = {}
+    for name, outxml_name in (('default', 'out.xml'), ('default_gzip', 'out.xml.gz')):
+        inputs = AttributeDict({'fleurinp': create_fleurinp(TEST_INP_XML_PATH), 'metadata': {}})
+        node = generate_calc_job_node(entry_point_calc_job,
+                                      fixture_localhost,
+                                      name,
+                                      inputs,
+                                      store=True,
+                                      retrieve_list=[outxml_name, 'shell.out', 'out.error'])
+        parser = generate_parser(entry_point_parser)
+        results[name], calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        assert 'output_parameters' in results[name]
+
+    assert json.loads(json.dumps(clean_outdict_for_reg_dump(results['default_gzip']['output_parameters'].get_dict()))) \
+        == json.loads(json.dumps(clean_outdict_for_reg_dump(results['default']['output_parameters'].get_dict())))
+
+
+def test_fleur_parser_slim_output(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp):
+    """
+    Test that the slim output mode moves the arrays to the output_arrays
+    and that the full output can be restored
+    """
+    import json
+    from aiida_fleur.parsers.fleur import restore_output_arrays
+
+    name = 'relax'
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+
+    results = {}
+    for slim, min_size in ((False, None), ('default', None), (True, 1)):
+        parser_options = {'slim_output': bool(slim)}
+        if min_size is not None:
+            parser_options['slim_output_min_size'] = min_size
+        inputs = AttributeDict({
+            'fleurinp': create_fleurinp(TEST_INP_XML_PATH1),
+            'settings': orm.Dict({'parser_options': parser_options}),
+            'metadata': {}
+        })
+        node = generate_calc_job_node(entry_point_calc_job,
+                                      fixture_localhost,
+                                      name,
+                                      inputs,
+                                      store=True,
+                                      retrieve_list=['out.xml', 'inp.xml', 'relax.xml'])
+        parser = generate_parser(entry_point_parser)
+        results[slim], calcfunction = parser.parse_from_node(node, store_provenance=False)
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+
+    assert 'output_arrays' not in results[False]
+    #The per-atom lists of this small system are below the default threshold
+    assert 'output_arrays' not in results['default']
+    assert results['default']['output_parameters']['force_atoms'] == results[False]['output_parameters']['force_atoms']
+    assert 'output_arrays' in results[True]
+    slim_dict = results[True]['output_parameters'].get_dict()
+    assert 'force_atoms' not in slim_dict
+    assert 'energy_hartree' in slim_dict
+
+    restored = restore_output_arrays(results[True]['output_parameters'], results[True]['output_arrays'])
+    expected = json.loads(json.dumps(results[False]['output_parameters'].get_dict()))
+    assert clean_outdict_for_reg_dump(restored) == clean_outdict_for_reg_dump(expected)
+
+
+def test_fleur_parser_streaming(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp):
+    """
+    Test that the streaming mode for the out.xml gives the same results as the default mode
+    """
+    import numpy as np
+
+    name = 'default'
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+
+    retrieve_list = ['out.xml', 'inp.xml', 'shell.out', 'out.error', 'cdn1']
+    results = {}
+    for streaming in (False, True):
+        inputs = AttributeDict({
+            'fleurinp': create_fleurinp(TEST_INP_XML_PATH),
+            'settings': orm.Dict({'parser_options': {
+                'streaming': streaming
+            }}),
+            'metadata': {}
+        })
+        node = generate_calc_job_node(entry_point_calc_job,
+                                      fixture_localhost,
+                                      name,
+                                      inputs,
+                                      store=True,
+                                      retrieve_list=retrieve_list)
+        parser = generate_parser(entry_point_parser)
+        results[streaming], calcfunction = parser.parse_from_node(node, store_provenance=False)
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+
+    assert clean_outdict_for_reg_dump(results[True]['output_parameters'].get_dict()) == \
+           clean_outdict_for_reg_dump(results[False]['output_parameters'].get_dict())
+    for name in results[False]['output_convergence'].get_arraynames():
+        assert np.allclose(results[True]['output_convergence'].get_array(name),
+                           results[False]['output_convergence'].get_array(name),
+                           equal_nan=True)
+
+
 '''
 def test_fleur_parser_band_dos(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp, data_regression):
     """
@@ -145,6 +413,65 @@ def test_fleur_parser_relax(fixture_localhost, generate_parser, generate_calc_jo
     })
 
 
+def test_fleur_parser_relax_history(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp,
+                                    tmp_path):
+    """
+    Test that the relax_parameters of the parent calculation are merged with the
+    new steps of the relax.xml, if they correspond to the relax.xml of the input
+    """
+    import hashlib
+    from aiida.common import LinkType
+
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+    relax_path = os.path.join(aiida_path, '../tests/parsers/fixtures/fleur/relax/relax.xml')
+
+    #relax.xml of the previous step (only the first step of the relaxation history)
+    with open(relax_path, encoding='utf-8') as relaxfile:
+        content = relaxfile.read()
+    first_step_end = content.index('</step>') + len('</step>')
+    second_step_end = content.index('</step>', first_step_end) + len('</step>')
+    old_relax_path = tmp_path / 'relax.xml'
+    old_relax_path.write_text(content[:first_step_end] + content[second_step_end:], encoding='utf-8')
+
+    parent = generate_calc_job_node(entry_point_calc_job,
+                                    fixture_localhost,
+                                    'relax', {'fleurinp': create_fleurinp(TEST_INP_XML_PATH1)},
+                                    store=True,
+                                    retrieve_list=['out.xml', 'out.error', 'relax.xml'])
+    #Posforces differ from the file to check that the history is used
+    previous_relax = orm.Dict({
+        'displacements': [[0.0, 0.0, 0.0]],
+        'energies': [-1.1623986264],
+        'posforces': [[[0.0, 0.0, -0.75, 0.0, 0.0, 0.5]]],
+        'relax_file_hash': hashlib.sha256(old_relax_path.read_bytes()).hexdigest()
+    })
+    previous_relax.base.links.add_incoming(parent, link_type=LinkType.CREATE, link_label='relax_parameters')
+    previous_relax.store()
+
+    inputs = AttributeDict({
+        'fleurinp': create_fleurinp(TEST_INP_XML_PATH1, additional_files=[str(old_relax_path)]),
+        'parent_folder': parent.outputs.remote_folder,
+        'metadata': {}
+    })
+    node = generate_calc_job_node(entry_point_calc_job,
+                                  fixture_localhost,
+                                  'relax',
+                                  inputs,
+                                  store=True,
+                                  retrieve_list=['out.xml', 'out.error', 'relax.xml'])
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    relax_dict = results['relax_parameters'].get_dict()
+    assert relax_dict['energies'] == pytest.approx([-1.1623986264, -1.1630924497])
+    assert relax_dict['posforces'][0] == [[0.0, 0.0, -0.75, 0.0, 0.0, 0.5]]
+    assert relax_dict['posforces'][1] == [[0.0, 0.0, -0.741699171, 0.0, 0.0, 0.0208293472]]
+    assert relax_dict['displacements'] == [[0.0, 0.0, 0.0246059526]]
+    assert relax_dict['relax_file_hash'] == hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
 def test_fleur_parser_MT_overlap_erroroutput(fixture_localhost, generate_parser, generate_calc_job_node,
                                              create_fleurinp, data_regression):
     """
@@ -212,6 +539,105 @@ def test_fleur_parser_complex_erroroutput(fixture_localhost, generate_parser, ge
     assert 'error_params' not in results
 
 
+def test_fleur_parser_temporary_files(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp,
+                                      tmp_path):
+    """
+    Test that the files only needed for parsing are read from the temporary retrieved folder
+    (retrieve_profile setting)
+    """
+    import shutil
+
+    name = 'complex_errorout'
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+
+    inputs = AttributeDict({'fleurinp': create_fleurinp(TEST_INP_XML_PATH), 'metadata': {}})
+
+    retrieve_list = ['out.xml']
+    node = generate_calc_job_node(entry_point_calc_job,
+                                  fixture_localhost,
+                                  name,
+                                  inputs,
+                                  store=True,
+                                  retrieve_list=retrieve_list)
+    fixture_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'fleur', name)
+    for filename in ('out.error', 'usage.json'):
+        shutil.copy(os.path.join(fixture_folder, filename), tmp_path / filename)
+
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node,
+                                                   store_provenance=False,
+                                                   retrieved_temporary_folder=str(tmp_path))
+
+    assert calcfunction.is_finished, calcfunction.exception
+    assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_FLEUR_CALC_FAILED.status
+    assert 'output_parameters' not in results
+
+
+def test_fleur_parser_memory_usage(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp,
+                                   tmp_path):
+    """
+    Test that the peak memory of a successful calculation is added to the output parameters
+    (used for fitting the performance model)
+    """
+    import shutil
+
+    name = 'default'
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+
+    inputs = AttributeDict({'fleurinp': create_fleurinp(TEST_INP_XML_PATH), 'metadata': {}})
+
+    retrieve_list = ['out.xml', 'inp.xml', 'shell.out', 'out.error']
+    node = generate_calc_job_node(entry_point_calc_job,
+                                  fixture_localhost,
+                                  name,
+                                  inputs,
+                                  store=True,
+                                  retrieve_list=retrieve_list)
+    fixture_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'fleur', 'complex_errorout')
+    shutil.copy(os.path.join(fixture_folder, 'usage.json'), tmp_path / 'usage.json')
+
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node,
+                                                   store_provenance=False,
+                                                   retrieved_temporary_folder=str(tmp_path))
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_status
+    assert results['output_parameters']['memory_used_per_process_kb'] == 3412936
+
+
+@pytest.mark.parametrize('labels,exit_status', ((['band'], 0), (['band', 'dos'], 319)))
+def test_fleur_parser_steps(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp, labels,
+                            exit_status):
+    """
+    Test that the outputs of the follow-up steps (steps input) are parsed from their subfolders
+    and that missing outputs of a step lead to an exit code
+    """
+    name = 'steps'
+    entry_point_calc_job = 'fleur.fleur'
+    entry_point_parser = 'fleur.fleurparser'
+
+    steps = orm.List([{'label': label, 'task_list': []} for label in labels])
+    inputs = AttributeDict({'fleurinp': create_fleurinp(TEST_INP_XML_PATH), 'steps': steps, 'metadata': {}})
+
+    retrieve_list = ['out.xml', 'inp.xml', 'shell.out', 'out.error']
+    node = generate_calc_job_node(entry_point_calc_job,
+                                  fixture_localhost,
+                                  name,
+                                  inputs,
+                                  store=True,
+                                  retrieve_list=retrieve_list)
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished, calcfunction.exception
+    assert calcfunction.exit_status == exit_status
+    assert 'output_parameters' in results
+    assert results['steps']['band']['energy'] == results['output_parameters']['energy']
+    assert 'dos' not in results['steps']
+
+
 def clean_outdict_for_reg_dump(outdict):
     """
     Apparently the regression dumper has problems with
@@ -226,5 +652,6 @@ def clean_outdict_for_reg_dump(outdict):
     outdict.pop('start_date', None)
     outdict.pop('end_date', None)
     outdict.pop('relax_atomtype_info', None)
+    outdict.pop('parser_timing', None)
 
     return outdict
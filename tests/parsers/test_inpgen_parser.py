@@ -27,6 +27,10 @@ def test_inpgen_parser_default(fixture_localhost, generate_parser, generate_calc
     assert calcfunction.is_finished_ok, calcfunction.exit_message
     assert not orm.Log.objects.get_logs_for(node), [log.message for log in orm.Log.objects.get_logs_for(node)]
     assert 'fleurinp' in results
+    timing = results['fleurinp'].parser_info['parser_timing']
+    assert {'error_file', 'fleurinp'} <= set(timing['walltime_stages'].keys())
+    with node.outputs.retrieved.open('inp.xml', 'rb') as inpxml:
+        assert timing['bytes_read']['inp.xml'] == len(inpxml.read())
 
     data_regression.check({
         'fleurinp': results['fleurinp'].inp_dict,
@@ -0,0 +1,84 @@
+''' Contains tests for the timing utility of the parsers. '''
+import logging
+
+
+def test_parser_timer():
+    """
+    Test that the ParserTimer records stages and bytes read and exports them
+    via the hooks, the logger and the summary
+    """
+    from aiida_fleur.parsers.timing import ParserTimer, register_parser_timing_hook, unregister_parser_timing_hook
+    from aiida_fleur.parsers.timing import get_parser_timing_summary, reset_parser_timing_summary
+
+    reset_parser_timing_summary()
+    reported = []
+
+    def hook(parser_name, node, timing):
+        reported.append((parser_name, node, timing))
+
+    register_parser_timing_hook(hook)
+    try:
+        for _ in range(2):
+            timer = ParserTimer('test_parser')
+            with timer.stage('first'):
+                timer.add_bytes_read('file', 100)
+            with timer.stage('second'):
+                pass
+            with timer.stage('second'):
+                timer.add_bytes_read('file', 20)
+            timing = timer.as_dict()
+            timer.report(timing=timing)
+    finally:
+        unregister_parser_timing_hook(hook)
+
+    assert set(timing['walltime_stages'].keys()) == {'first', 'second'}
+    assert timing['bytes_read'] == {'file': 120}
+    assert timing['peak_memory_delta_kb'] >= 0
+    assert timing['walltime_total'] >= sum(timing['walltime_stages'].values())
+
+    assert len(reported) == 2
+    assert reported[-1] == ('test_parser', None, timing)
+
+    summary = get_parser_timing_summary()
+    assert summary['test_parser']['count'] == 2
+    assert summary['test_parser']['bytes_read'] == 240
+    assert set(summary['test_parser']['walltime_stages'].keys()) == {'first', 'second'}
+
+    reset_parser_timing_summary()
+    assert get_parser_timing_summary() == {}
+
+
+def test_parser_timer_file_size(tmp_path):
+    """
+    Test that the size of files opened in text and binary mode is recorded in bytes
+    """
+    from aiida_fleur.parsers.timing import ParserTimer
+
+    path = tmp_path / 'file.txt'
+    path.write_bytes('Jülich\n'.encode('utf-8'))
+
+    timer = ParserTimer('test_parser')
+    with open(path, encoding='utf-8') as handle:
+        assert handle.read() == 'Jülich\n'
+        timer.add_file_size('text', handle)
+    with open(path, 'rb') as handle:
+        timer.add_file_size('binary', handle)
+
+    assert timer.bytes_read == {'text': 8, 'binary': 8}
+
+
+def test_parser_timer_logger(caplog):
+    """
+    Test that the timings are emitted on the performance logger
+    """
+    from aiida_fleur.parsers.timing import ParserTimer, reset_parser_timing_summary
+
+    timer = ParserTimer('test_parser')
+    with caplog.at_level(logging.INFO, logger='aiida_fleur.parsers.performance'):
+        timer.report()
+    reset_parser_timing_summary()
+
+    records = [record for record in caplog.records if record.name == 'aiida_fleur.parsers.performance']
+    assert len(records) == 1
+    assert records[0].parser_name == 'test_parser'
+    assert 'walltime_stages' in records[0].parser_timing
@@ -0,0 +1,165 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+'''
+Contains tests for the schedulers packing many calculations into one job
+'''
+import time
+import pytest
+
+from aiida.common.datastructures import CodeRunMode
+from aiida.schedulers.datastructures import JobTemplate, JobTemplateCodeInfo, JobState
+
+from aiida.schedulers.scheduler import SchedulerError
+
+from aiida_fleur.schedulers.packed import PackedDirectScheduler, PackedSlurmScheduler, PACK_STATUS_FILE, PACK_ID_FILE
+
+
+def generate_job_template(scheduler, num_machines=1, executable='/usr/bin/fleur_MPI', output='result'):
+    """Create a JobTemplate running a shell command instead of a code"""
+    job_tmpl = JobTemplate()
+    job_tmpl.job_resource = scheduler.create_job_resource(num_machines=num_machines, num_mpiprocs_per_machine=1)
+    job_tmpl.max_wallclock_seconds = 600
+    job_tmpl.sched_output_path = '_scheduler-stdout.txt'
+    job_tmpl.sched_error_path = '_scheduler-stderr.txt'
+    job_tmpl.append_text = f'echo "packed" > {output}'
+
+    code_info = JobTemplateCodeInfo()
+    code_info.cmdline_params = [executable]
+    job_tmpl.codes_info = [code_info]
+    job_tmpl.codes_run_mode = CodeRunMode.SERIAL
+    return job_tmpl
+
+
+def test_packed_submit_script_header():
+    """
+    Test that the packing information is added to the submit script and that
+    the key only depends on the codes and resources
+    """
+    scheduler = PackedDirectScheduler()
+
+    script = scheduler.get_submit_script(generate_job_template(scheduler))
+    lines = script.split('\n')
+    key = PackedDirectScheduler.get_pack_key(generate_job_template(scheduler))
+    assert lines[1:5] == [
+        f'#FLEUR_PACK_KEY={key}', '#FLEUR_PACK_WALLTIME=600', '#FLEUR_PACK_OUTPUT=_scheduler-stdout.txt',
+        '#FLEUR_PACK_ERROR=_scheduler-stderr.txt'
+    ]
+    assert lines[5] == 'exec > _scheduler-stdout.txt'
+
+    assert PackedDirectScheduler.get_pack_key(generate_job_template(scheduler, output='other')) == key
+    assert PackedDirectScheduler.get_pack_key(generate_job_template(scheduler, num_machines=2)) != key
+    assert PackedDirectScheduler.get_pack_key(generate_job_template(scheduler, executable='/usr/bin/fleur')) != key
+
+    scheduler = PackedSlurmScheduler()
+    lines = scheduler.get_submit_script(generate_job_template(scheduler)).split('\n')
+    assert lines[1].startswith('#FLEUR_PACK_KEY=')
+    assert '#SBATCH --nodes=1' in lines
+
+
+def test_packed_joblist_output():
+    """Test the parsing of the output of the joblist command"""
+    scheduler = PackedSlurmScheduler()
+
+    jobs = scheduler._parse_joblist_output(0, '/work/ab/cd/ef QUEUED\n/work/gh/ij/kl RUNNING\n', '')
+    assert [(job.job_id, job.job_state) for job in jobs] == [('/work/ab/cd/ef', JobState.QUEUED),
+                                                             ('/work/gh/ij/kl', JobState.RUNNING)]
+
+    command = scheduler._get_joblist_command(jobs=['/work/ab/cd/ef'])
+    assert 'sbatch --parsable' in command
+    assert 'squeue -h -j "$1"' in command
+    with pytest.raises(Exception, match='can only query'):
+        scheduler._get_joblist_command(user='fleur')
+
+
+def _submit(scheduler, workdir, output):
+    """Write the submit script of a job into the given folder and submit it"""
+    workdir.mkdir()
+    (workdir / '_aiidasubmit.sh').write_text(
+        scheduler.get_submit_script(generate_job_template(scheduler, output=output)))
+    return scheduler.submit_job(str(workdir), '_aiidasubmit.sh')
+
+
+def _wait_for_jobs(scheduler, job_ids, timeout=30):
+    """Poll the jobs until all of them are done"""
+    start = time.time()
+    while time.time() - start < timeout:
+        jobs = scheduler.get_jobs(jobs=job_ids, as_dict=True)
+        if all(job.job_state == JobState.DONE for job in jobs.values()):
+            return
+        time.sleep(0.2)
+    raise TimeoutError('Packed jobs did not finish')
+
+
+def test_packed_direct_scheduler_run(tmp_path):
+    """
+    Test the packing with the local stand-in scheduler. The jobs are only
+    launched once the pack is full and each job runs in its own working directory
+    """
+    from aiida.transports.plugins.local import LocalTransport
+
+    scheduler = PackedDirectScheduler()
+    scheduler._pack_root = str(tmp_path / 'packs')
+    scheduler._pack_size = 2
+    scheduler._pack_wait = 3600
+
+    with LocalTransport() as transport:
+        scheduler.set_transport(transport)
+
+        job_ids = [_submit(scheduler, tmp_path / f'calc{index}', f'result{index}') for index in range(3)]
+        assert job_ids == [str(tmp_path / f'calc{index}') for index in range(3)]
+
+        #The first two jobs form a full pack, the third one waits for more jobs
+        jobs = scheduler.get_jobs(jobs=job_ids, as_dict=True)
+        assert jobs[job_ids[2]].job_state == JobState.QUEUED
+        _wait_for_jobs(scheduler, job_ids[:2])
+        assert scheduler.get_jobs(jobs=job_ids, as_dict=True)[job_ids[2]].job_state == JobState.QUEUED
+
+        for index in range(2):
+            assert (tmp_path / f'calc{index}' / f'result{index}').read_text() == 'packed\n'
+            assert (tmp_path / f'calc{index}' / PACK_STATUS_FILE).read_text() == 'DONE\n'
+        assert not (tmp_path / 'calc2' / 'result2').exists()
+
+        #Killed jobs are skipped when the pack is run
+        assert scheduler.kill_job(job_ids[2])
+        scheduler._pack_wait = 0
+        _wait_for_jobs(scheduler, job_ids)
+        assert (tmp_path / 'calc2' / PACK_STATUS_FILE).read_text() == 'KILLED\n'
+        assert not (tmp_path / 'calc2' / 'result2').exists()
+
+
+def test_packed_direct_scheduler_max_walltime(tmp_path):
+    """
+    Test that the job scripts are split into several packs if the summed walltime
+    exceeds the limit and that killing unknown jobs fails
+    """
+    from aiida.transports.plugins.local import LocalTransport
+
+    scheduler = PackedDirectScheduler()
+    scheduler._pack_root = str(tmp_path / 'packs')
+    scheduler._pack_max_walltime = 1000  #Each job requests 600 seconds
+    scheduler._pack_wait = 0
+
+    with LocalTransport() as transport:
+        scheduler.set_transport(transport)
+
+        job_ids = [_submit(scheduler, tmp_path / f'calc{index}', f'result{index}') for index in range(3)]
+        _wait_for_jobs(scheduler, job_ids)
+
+        pack_ids = {(tmp_path / f'calc{index}' / PACK_ID_FILE).read_text() for index in range(3)}
+        assert len(pack_ids) == 3
+        for index in range(3):
+            assert (tmp_path / f'calc{index}' / f'result{index}').read_text() == 'packed\n'
+
+        #Finished jobs can be killed without error, unknown jobs fail
+        assert scheduler.kill_job(job_ids[0])
+        (tmp_path / 'unknown').mkdir()
+        with pytest.raises(SchedulerError, match='No packed job found'):
+            scheduler.kill_job(str(tmp_path / 'unknown'))
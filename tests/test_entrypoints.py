@@ -58,6 +58,22 @@ class TestFleurEntrypoints:
         parser = ParserFactory('fleur.fleurparser')
         assert parser == FleurParser
 
+    # Schedulers
+
+    def test_fleur_packed_direct_scheduler_entry_point(self):
+        from aiida.plugins import SchedulerFactory
+        from aiida_fleur.schedulers.packed import PackedDirectScheduler
+
+        scheduler = SchedulerFactory('fleur.packed_direct')
+        assert scheduler == PackedDirectScheduler
+
+    def test_fleur_packed_slurm_scheduler_entry_point(self):
+        from aiida.plugins import SchedulerFactory
+        from aiida_fleur.schedulers.packed import PackedSlurmScheduler
+
+        scheduler = SchedulerFactory('fleur.packed_slurm')
+        assert scheduler == PackedSlurmScheduler
+
     # Workflows/workchains
 
     def test_fleur_scf_wc_entry_point(self):
@@ -326,8 +326,9 @@ def test_performance_extract_calcs(fixture_localhost, generate_calc_job_node):
     out.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
 
     result = performance_extract_calcs([node.pk])
+    result_lists = {key: value.tolist() for key, value in result.items()}
 
-    assert result == {
+    assert result_lists == {
         'n_symmetries': [8],
         'n_spin_components': [2],
         'n_kpoints': [8],
@@ -357,6 +358,22 @@ def test_performance_extract_calcs(fixture_localhost, generate_calc_job_node):
         }]
     }
 
+    #Calculations without energy are skipped
+    out_incomplete = Dict({key: value for key, value in out.get_dict().items() if key != 'energy'}).store()
+    node_incomplete = generate_calc_job_node('fleur.fleur', fixture_localhost)
+    node_incomplete.store()
+    out_incomplete.add_incoming(node_incomplete, link_type=LinkType.CREATE, link_label='output_parameters')
+
+    #Chunked queries, uuids and the DataFrame give the same result
+    result_df = performance_extract_calcs([node.uuid, node_incomplete.pk], chunk_size=1, as_dataframe=True)
+    assert len(result_df) == 1
+    assert result_df['pk'].tolist() == [node.pk]
+    assert result_df['cost'].tolist() == result['cost'].tolist()
+
+    result_all = performance_extract_calcs()
+    assert node.pk in result_all['pk']
+    assert node_incomplete.pk not in result_all['pk']
+
 
 inputs_optimize = [(4, 8, 3, True, 0.5, None, 720, 0.9, False), (4, 8, 3, True, 2, None, 720, 0.9, False),
                    (4, 8, 3, True, 100, None, 720, 0.9, False), (4, 8, 3, True, 100, None, 720, 0.5, False),
@@ -97,3 +97,52 @@ def test_compress_fleuroutxml(eval_xpath, test_file):
     # cleanup
     os.remove(dest_path)
     os.remove(dest_path2)
+
+
+def test_compress_fleuroutxml_gzip(test_file, tmp_path):
+    """
+    test that compress_fleuroutxml writes gzipped files and reads them transparently
+    """
+    import gzip
+    from lxml import etree
+    from aiida_fleur.tools.io_routines import compress_fleuroutxml
+
+    testfilepath = test_file('outxml/BeTi_out.xml')
+    dest_path = tmp_path / 'out.xml.gz'
+
+    compress_fleuroutxml(testfilepath, dest_file_path=str(dest_path), iterations_to_keep=-1)
+    with gzip.open(dest_path, 'rb') as file:
+        tree = etree.parse(file)
+    assert len(tree.xpath('/fleurOutput/scfLoop/iteration')) == 1
+
+    compress_fleuroutxml(str(dest_path), dest_file_path=str(tmp_path / 'out.xml'))
+    assert len(etree.parse(str(tmp_path / 'out.xml')).xpath('/fleurOutput/scfLoop/iteration')) == 1
+
+
+def test_open_output_file():
+    """
+    test that open_output_file reads compressed and uncompressed files in the same way
+    """
+    import gzip
+    import io
+    from aiida import orm
+    from aiida_fleur.tools.io_routines import get_output_filename, open_output_file
+
+    content = '<fleurOutput>\n</fleurOutput>\n'
+    folder = orm.FolderData()
+    folder.put_object_from_filelike(io.BytesIO(content.encode('utf-8')), 'relax.xml')
+    folder.put_object_from_filelike(io.BytesIO(gzip.compress(content.encode('utf-8'))), 'out.xml.gz')
+
+    assert get_output_filename(folder, 'relax.xml') == 'relax.xml'
+    assert get_output_filename(folder, 'out.xml') == 'out.xml.gz'
+    assert get_output_filename(folder, 'inp.xml') is None
+
+    for name in ('relax.xml', 'out.xml'):
+        with open_output_file(folder, name, 'rb') as file:
+            assert file.read() == content.encode('utf-8')
+        with open_output_file(folder, name, 'r') as file:
+            assert file.read() == content
+
+    with pytest.raises(FileNotFoundError):
+        with open_output_file(folder, 'inp.xml') as file:
+            pass
@@ -0,0 +1,109 @@
+###############################################################################
+# Copyright (c), Forschungszentrum Jülich GmbH, IAS-1/PGI-1, Germany.         #
+#                All rights reserved.                                         #
+# This file is part of the AiiDA-FLEUR package.                               #
+#                                                                             #
+# The code is hosted on GitHub at https://github.com/JuDFTteam/aiida-fleur    #
+# For further information on the license, see the LICENSE.txt file            #
+# For further information please visit http://www.flapw.de or                 #
+# http://aiida-fleur.readthedocs.io/en/develop/                               #
+###############################################################################
+'''Contains tests for the performance model of FLEUR calculations'''
+import os
+import pytest
+
+import aiida_fleur
+
+aiida_path = os.path.dirname(aiida_fleur.__file__)
+TEST_INP_XML_PATH = os.path.join(aiida_path, '../tests/files/inpxml/Si/inp.xml')
+
+
+@pytest.fixture
+def generate_finished_calc(fixture_localhost, generate_calc_job_node):
+    """Generate a finished FleurCalculation node with the given output parameters"""
+
+    def _generate_finished_calc(walltime, number_of_iterations=10, memory=None, resources=None):
+        from plumpy import ProcessState
+        from aiida.common.links import LinkType
+        from aiida.orm import Dict
+
+        node = generate_calc_job_node('fleur.fleur', fixture_localhost)
+        if resources is not None:
+            node.set_option('resources', resources)
+        node.set_process_state(ProcessState.FINISHED)
+        node.set_exit_status(0)
+        node.store()
+
+        res = {
+            'number_of_atoms': 2,
+            'kmax': 3.5,
+            'number_of_kpoints': 10,
+            'number_of_spin_components': 1,
+            'number_of_iterations': number_of_iterations,
+            'walltime': walltime
+        }
+        if memory is not None:
+            res['memory_used_per_process_kb'] = memory
+        out = Dict(res).store()
+        out.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
+        return node
+
+    return _generate_finished_calc
+
+
+def test_fit_performance_model(fixture_localhost, generate_finished_calc):
+    """Test the fit of the cost constants from finished calculations"""
+    from aiida.orm import Dict
+    from aiida_fleur.tools.common_fleur_wf import calc_time_cost_function
+    from aiida_fleur.tools.performance_model import fit_performance_model, calc_memory_cost_function
+    from aiida_fleur.tools.performance_model import PERFORMANCE_MODEL_LABEL
+
+    calcs = [
+        generate_finished_calc(100, memory=1000),
+        generate_finished_calc(200, resources={
+            'num_machines': 1,
+            'num_mpiprocs_per_machine': 2
+        }),
+        generate_finished_calc(900, memory=1500, resources={
+            'num_machines': 1,
+            'num_mpiprocs_per_machine': 2
+        }),
+    ]
+    previous = Dict({'fleur@other': {'time_constant': 1.0}})
+
+    model = fit_performance_model([calc.pk for calc in calcs], previous_model=previous)
+
+    assert model.label == PERFORMANCE_MODEL_LABEL
+    assert model['fleur@other'] == {'time_constant': 1.0}
+    entry = model[f'@{fixture_localhost.label}']
+    assert entry['n_calcs'] == 3
+    assert entry['n_memory_calcs'] == 2
+    assert entry['time_constant'] == pytest.approx(40 / calc_time_cost_function(2, 10, 3.5))
+    #Peak memory per process times the number of MPI processes
+    assert entry['memory_constant'] == pytest.approx(2000 / calc_memory_cost_function(2, 3.5))
+
+
+def test_predict_performance(fixture_localhost, generate_finished_calc, create_fleurinp):
+    """Test the prediction of the cost for a new input"""
+    from aiida_fleur.tools.common_fleur_wf import calc_time_cost_function
+    from aiida_fleur.tools.performance_model import fit_performance_model, predict_performance
+    from aiida_fleur.tools.performance_model import load_performance_model
+
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+
+    model = fit_performance_model([generate_finished_calc(100, memory=1000)])
+    assert predict_performance(model, fleurinp, 'fleur', fixture_localhost.label) is None
+
+    prediction = predict_performance(model, fleurinp, '', fixture_localhost.label)
+    #Si input: 2 atoms, kmax 3.5, 15 iterations
+    time_constant = 10 / calc_time_cost_function(2, 10, 3.5)
+    nkpts = fleurinp.get_nkpts()
+    assert prediction['core_seconds'] == pytest.approx(time_constant * calc_time_cost_function(2, nkpts, 3.5) * 15)
+    assert prediction['memory_kb'] == 1000
+
+    #Without the summary of the input no prediction is possible
+    fleurinp.base.attributes.delete('inp_summary')
+    assert predict_performance(model, fleurinp, '', fixture_localhost.label) is None
+
+    model.store()
+    assert load_performance_model().uuid == model.uuid
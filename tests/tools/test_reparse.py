@@ -0,0 +1,116 @@
+''' Contains tests for the bulk re-parsing of FleurCalculations. '''
+import os
+import json
+import pytest
+
+from aiida import orm
+from aiida.common import AttributeDict
+import aiida_fleur
+
+aiida_path = os.path.dirname(aiida_fleur.__file__)
+TEST_INP_XML_PATH = os.path.join(aiida_path, '../tests/files/inpxml/Si/inp.xml')
+
+
+def test_reparse_calculations(fixture_localhost, generate_parser, generate_calc_job_node, create_fleurinp, tmp_path):
+    """
+    Test that the re-parsing gives the same results as the FleurParser and that
+    already re-parsed calculations are skipped
+    """
+    from aiida_fleur.tools.reparse import reparse_calculations, load_reparse_results, REPARSE_EXTRA_KEY
+
+    nodes = []
+    for name in ('default', 'relax'):
+        inputs = AttributeDict({'fleurinp': create_fleurinp(TEST_INP_XML_PATH), 'metadata': {}})
+        nodes.append(
+            generate_calc_job_node('fleur.fleur',
+                                   fixture_localhost,
+                                   name,
+                                   inputs,
+                                   store=True,
+                                   retrieve_list=['out.xml', 'relax.xml']))
+    filters = {'id': {'in': [node.pk for node in nodes]}}
+    output_file = tmp_path / 'reparsed.jsonl'
+
+    progress = []
+    summary = reparse_calculations(filters=filters,
+                                   num_processes=1,
+                                   output_file=output_file,
+                                   store=True,
+                                   result_group='reparse_test',
+                                   progress_callback=lambda summary: progress.append(dict(summary)))
+
+    assert summary['total'] == 2
+    assert summary['parsed'] == 2
+    assert summary['failed'] == 0
+    assert summary['skipped'] == 0
+    assert progress[-1]['parsed'] == 2
+
+    with open(output_file, encoding='utf-8') as file:
+        records = {record['pk']: record for record in map(json.loads, file)}
+    assert set(records.keys()) == {node.pk for node in nodes}
+
+    for node in nodes:
+        parser = generate_parser('fleur.fleurparser')
+        results, _ = parser.parse_from_node(node, store_provenance=False)
+        expected = results['output_parameters'].get_dict()
+        expected.pop('parser_timing')
+
+        reparsed = node.base.extras.get(REPARSE_EXTRA_KEY)
+        stored = orm.load_node(reparsed['output_parameters']).get_dict()
+        assert stored.keys() == expected.keys()
+        assert stored['energy_hartree'] == pytest.approx(expected['energy_hartree'])
+        assert records[node.pk]['output_parameters'] == json.loads(json.dumps(expected))
+
+        convergence = orm.load_node(reparsed['output_convergence'])
+        assert convergence.get_arraynames() == results['output_convergence'].get_arraynames()
+
+    assert len(orm.load_group('reparse_test').nodes) == 4
+
+    summary = reparse_calculations(filters=filters, num_processes=1, output_file=output_file, store=True)
+    assert summary['skipped'] == 2
+    assert summary['parsed'] == 0
+
+    summary = reparse_calculations(filters=filters, num_processes=1, output_file=output_file, force=True)
+    assert summary['parsed'] == 2
+
+    dataframe = load_reparse_results(output_file, keys=['energy_hartree'])
+    assert len(dataframe) == 4
+    assert 'energy_hartree' in dataframe.columns
+
+
+def test_reparse_candidates_retry_failed(fixture_localhost, generate_calc_job_node, create_fleurinp, tmp_path):
+    """
+    Test that calculations with a failed record in the results file are parsed again
+    """
+    from aiida_fleur.tools.reparse import get_reparse_candidates
+
+    inputs = AttributeDict({'fleurinp': create_fleurinp(TEST_INP_XML_PATH), 'metadata': {}})
+    nodes = [
+        generate_calc_job_node('fleur.fleur',
+                               fixture_localhost,
+                               'default',
+                               inputs,
+                               store=True,
+                               retrieve_list=['out.xml']) for _ in range(2)
+    ]
+    inputs['settings'] = orm.Dict({'parser_options': {'streaming': True}})
+    nodes.append(
+        generate_calc_job_node('fleur.fleur',
+                               fixture_localhost,
+                               'default',
+                               inputs,
+                               store=True,
+                               retrieve_list=['out.xml']))
+    filters = {'id': {'in': [node.pk for node in nodes]}}
+
+    output_file = tmp_path / 'reparsed.jsonl'
+    with open(output_file, 'w', encoding='utf-8') as file:
+        file.write(json.dumps({'pk': nodes[0].pk, 'success': True}) + '\n')
+        file.write(json.dumps({'pk': nodes[1].pk, 'success': False, 'error': 'MemoryError: '}) + '\n')
+        file.write('{"pk": ')  #interrupted write
+
+    candidates, skipped = get_reparse_candidates(filters=filters, output_file=output_file)
+    assert skipped == 1
+    assert [candidate[0] for candidate in candidates] == [nodes[1].pk, nodes[2].pk]
+    #The parser options of the calculations are used for the streaming option by default
+    assert [candidate[3] for candidate in candidates] == [{}, {'streaming': True}]
@@ -178,6 +178,33 @@ def test_handle_not_enough_memory(generate_workchain_base, generate_remote_data,
     assert 'fleurinp' not in process.ctx.inputs
 
 
+def test_handle_not_enough_memory_error_params(generate_workchain_base, generate_remote_data, generate_retrieved_data):
+    """Test `FleurBaseWorkChain._handle_not_enough_memory` using the memory estimate of the parser."""
+    from aiida.common import LinkType
+
+    process = generate_workchain_base(exit_code=FleurCalculation.exit_codes.ERROR_NOT_ENOUGH_MEMORY)
+    process.setup()
+    process.validate_inputs()  #Sets up all the context in order for the memory error handler to work
+
+    code = process.ctx.inputs.code
+
+    calculation = process.ctx.children[-1]
+    calculation.store()
+    remote = generate_remote_data(code.computer, '/tmp')
+    remote.base.links.add_incoming(calculation, link_type=LinkType.CREATE, link_label='remote_folder')
+    remote.store()
+    generate_retrieved_data(calculation, 'default')
+    error_params = Dict({'error_name': 'NOT_ENOUGH_MEMORY', 'memory_usage_ratio': 2.4})
+    error_params.base.links.add_incoming(calculation, link_type=LinkType.CREATE, link_label='error_params')
+    error_params.store()
+
+    result = process._handle_not_enough_memory(calculation)
+    assert isinstance(result, ProcessHandlerReport)
+    assert result.do_break
+    assert result.exit_code.status == 0
+    assert process.ctx.num_machines == 3
+
+
 def test_handle_time_limits(generate_workchain_base, generate_remote_data, generate_retrieved_data):
     """Test `FleurBaseWorkChain._handle_time_limits`."""
     from aiida.common import LinkType
@@ -401,6 +428,85 @@ def test_base_fleur_worlchain_forbid_single_mpi(generate_workchain_base, create_
     assert status == FleurBaseWorkChain.exit_codes.ERROR_NOT_OPTIMAL_RESOURCES
 
 
+def test_base_fleur_workchain_invalid_kpoint_list(generate_workchain_base, create_fleurinp, fixture_code):
+    """
+    Test that an inp.xml selecting a kpoint list, which does not exist, returns
+    the ERROR_NOT_OPTIMAL_RESOURCES exit code instead of raising
+    """
+    from aiida_fleur.common.defaults import default_options
+    from aiida_fleur.data.fleurinpmodifier import FleurinpModifier
+
+    INPXML_PATH = os.path.abspath(os.path.join(aiida_path, '../tests/files/inpxml/Si/inp.xml'))
+    fleurinp = create_fleurinp(INPXML_PATH)
+    fm = FleurinpModifier(fleurinp)
+    fm.set_attrib_value('listName', 'missing', tag_name='kPointListSelection')
+    fleurinp = fm.freeze()
+    assert fleurinp.inp_summary['nkpts'] is None
+
+    inputs = {
+        'code':
+        fixture_code('fleur.fleur'),
+        'fleurinp':
+        fleurinp,
+        'add_comp_para':
+        Dict({
+            'only_even_MPI': False,
+            'forbid_single_mpi': False,
+            'max_queue_nodes': 20,
+            'max_queue_wallclock_sec': 86400
+        }),
+        'options':
+        Dict(default_options)
+    }
+
+    process = generate_workchain_base(inputs=inputs)
+    process.setup()
+    status = process.validate_inputs()
+
+    assert status == FleurBaseWorkChain.exit_codes.ERROR_NOT_OPTIMAL_RESOURCES
+
+
+def test_base_fleur_workchain_performance_model(generate_workchain_base, create_fleurinp, fixture_code):
+    """
+    Test that the resources of the first calculation are chosen based on the
+    prediction of the performance model
+    """
+    from aiida_fleur.common.defaults import default_options
+    from aiida_fleur.tools.common_fleur_wf import calc_time_cost_function
+    from aiida_fleur.tools.performance_model import get_performance_key, calc_memory_cost_function
+
+    fleurinp = create_fleurinp(TEST_INP_XML_PATH)
+    fleur = fixture_code('fleur.fleur')
+    fleur.computer.set_default_memory_per_machine(10000)
+
+    #Chosen so that the Si input needs 24 hours on one core and 24000 kB in total
+    nkpts = fleurinp.get_nkpts()
+    model = Dict({
+        get_performance_key(fleur.label, fleur.computer.label): {
+            'time_constant': 24 * 3600 / (calc_time_cost_function(2, nkpts, 3.5) * 15),
+            'memory_constant': 24000 / calc_memory_cost_function(2, 3.5)
+        }
+    })
+
+    options = {**default_options, 'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 4}}
+    options['resources']['num_cores_per_mpiproc'] = 3
+    options['max_wallclock_seconds'] = 6 * 3600
+    inputs = {'code': fleur, 'fleurinp': fleurinp, 'performance_model': model, 'options': Dict(options)}
+
+    process = generate_workchain_base(inputs=inputs)
+    process.setup()
+    status = process.validate_inputs()
+    assert status is None
+
+    resources = process.ctx.inputs.metadata.options['resources']
+    #24h * 1.5 / 6h / 12 cores -> 1 node, 6000 kB for each of the 4 MPI processes
+    #-> one MPI process per node because of the memory
+    assert resources == {'num_machines': 1, 'num_mpiprocs_per_machine': 1, 'num_cores_per_mpiproc': 12}
+    assert process.ctx.inputs.metadata.options['environment_variables']['OMP_NUM_THREADS'] == '12'
+    #24h * 1.5 / 12 cores
+    assert process.ctx.inputs.metadata.options['max_wallclock_seconds'] == pytest.approx(3 * 3600, abs=1)
+
+
 # tests
 @pytest.mark.usefixtures('aiida_profile', 'clear_database')
 class Test_FleurBaseWorkChain():
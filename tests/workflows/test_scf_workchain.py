@@ -513,3 +513,29 @@ def test_fleur_scf_validation_wrong_inputs(fleur_local_code, inpgen_local_code,
     assert node.is_finished
     assert not node.is_finished_ok
     assert node.exit_status == 231
+
+
+def test_convert_convergence_arrays():
+    """
+    Test the conversion of the convergence arrays from the FleurParser into
+    lists for the context of the scf workchain
+    """
+    import numpy as np
+    from aiida.orm import ArrayData
+    from aiida_fleur.workflows.scf import convert_convergence_arrays
+
+    convergence = ArrayData()
+    convergence.set_array('energy_hartree', np.array([-1.0, -1.5]))
+    convergence.set_array('density_convergence', np.array([np.nan, 0.1]))
+    convergence.set_array('nmmp_distance', np.array([[np.nan, np.nan], [0.2, 0.3]]))
+    convergence.set_array('force_atoms', np.zeros((2, 1, 3)))
+
+    result = convert_convergence_arrays(convergence)
+
+    assert result['energy_hartree'] == [-1.0, -1.5]
+    assert result['density_convergence'] == [None, 0.1]
+    assert result['nmmp_distance'] == [None, [0.2, 0.3]]
+    assert result['force_atoms'] == [[[0.0, 0.0, 0.0]], [[0.0, 0.0, 0.0]]]
+    assert result['torque_x'] == []
+
+    assert convert_convergence_arrays(None)['energy_hartree'] == []